@@ -1,3 +1,10 @@
 """Terminal based fractal explorer, including Mandelbrot, Burning Ship, and Julia."""
 
 __version__ = "2.3.0"
+
+# Imported after the version, which the modules of the package import
+from .renderer import Renderer, RenderResult, render  # noqa: E402
+from .settings import RenderSettings  # noqa: E402
+from .vec import Vec  # noqa: E402
+
+__all__ = ["Renderer", "RenderResult", "RenderSettings", "Vec", "render"]
@@ -4,14 +4,62 @@ from click_extra import STRING, Choice, IntRange, extra_command, option
 from rich.console import Console
 
 from . import __version__
+from .animation import INTERPOLATIONS, VIDEO_FORMATS, FrameWriter, load_keyframe, write_animation
 from .app import FractalisticApp
 from .colors import color_renderers
+from .distributed import serve
 from .fractals import fractal_list
+from .image_writers import IMAGE_WRITERS
 from .settings import Settings
-from .utils import get_color_index_from_name, get_fractal_index_from_name, rich_theme, rule
+from .theme import rich_theme, rule
+from .utils import get_color_index_from_name, get_fractal_index_from_name
 from .vec import Vec
 
 
+def render_animation(
+    state_files: tuple[str, ...],
+    size: Vec[int],
+    frames: int,
+    fps: int,
+    interpolation: str,
+    video_format: str,
+    output: str,
+    threads: int,
+) -> None:
+    # The frames can be written to stdout, messages are printed to stderr
+    console = Console(theme=rich_theme, stderr=True)
+
+    if len(state_files) < 2:
+        console.print("[red]An animation needs at least two state files")
+        quit(1)
+
+    try:
+        keyframes = [load_keyframe(state_file, size) for state_file in state_files]
+    except Exception as e:
+        console.print(f"[red]Cannot load the state files: {e}")
+        quit(1)
+
+    writer = FrameWriter(output, video_format.lower(), size, fps)
+    try:
+        for frame, render_time in enumerate(
+            write_animation(keyframes, size, frames, writer, interpolation.lower(), threads), 1
+        ):
+            console.print(f"Frame [acc]{frame}[/]/{frames} rendered in [acc]{render_time:.2f}s")
+    finally:
+        writer.close()
+
+
+def run_worker(address: str, threads: int) -> None:
+    console = Console(theme=rich_theme, stderr=True)
+    try:
+        serve(address, threads, console.print)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Cannot run the render node: {e}")
+        quit(1)
+
+
 @extra_command(params=[])
 @option("-t", "--threads", help="Number of threads to use for rendering", type=IntRange(1), default=Settings.threads)
 @option(
@@ -43,6 +91,11 @@ from .vec import Vec
     type=IntRange(5),
     default=Settings.render_settings.wanted_numeric_precision,
 )
+@option(
+    "--auto-precision/--fixed-precision",
+    help="Adjust the numeric precision to the zoom level, or always use --decimal-precision.",
+    default=Settings.auto_precision,
+)
 @option(
     "-i",
     "--max-iter",
@@ -69,6 +122,73 @@ from .vec import Vec
     type=IntRange(1),
     default=Settings.screenshot_quality,
 )
+@option(
+    "-sf",
+    "--screenshot-format",
+    help="File format of the screenshots.",
+    type=Choice(list(IMAGE_WRITERS), False),
+    default=Settings.screenshot_format,
+)
+@option(
+    "-aa",
+    "--antialiasing",
+    help="Supersample the pixels of the screenshots on edges with this many points, 0 to disable antialiasing.",
+    type=IntRange(0),
+    default=Settings.antialiasing,
+)
+@option(
+    "-n",
+    "--node",
+    help="Send the tiles of the screenshots to the render node listening on this address, can be repeated.",
+    type=STRING,
+    multiple=True,
+)
+@option(
+    "-w",
+    "--worker",
+    help=(
+        "Run a render node listening on this address (host:port, or the path of a Unix socket) instead of starting "
+        "the program. Uses the number of screenshot threads."
+    ),
+    type=STRING,
+)
+@option(
+    "-mf",
+    "--metrics-file",
+    help="Append the measures of each render of the canvas to this file, as JSON lines.",
+    type=STRING,
+)
+@option(
+    "-a",
+    "--animate",
+    help=(
+        "Render an animation going through the given state files instead of starting the program. "
+        "Uses the size of the screenshots and the number of screenshot threads."
+    ),
+    type=STRING,
+    multiple=True,
+)
+@option("--frames", help="Number of frames of the animation.", type=IntRange(2), default=60)
+@option("--fps", help="Frames per second of Y4M animations.", type=IntRange(1), default=30)
+@option(
+    "--interpolation",
+    help="How the render settings change between the keyframes of the animation.",
+    type=Choice(INTERPOLATIONS, False),
+    default="linear",
+)
+@option(
+    "--video-format",
+    help="Format of the frames of the animation.",
+    type=Choice(VIDEO_FORMATS, False),
+    default="y4m",
+)
+@option(
+    "-o",
+    "--output",
+    help='Where to write the animation: "-" for stdout, a file, or a file name with "{}" for a file per frame.',
+    type=STRING,
+    default="-",
+)
 @option("-v", "--version", help="Show version number and exit", is_flag=True)
 @option("--debug", help="Enable debug mode for developers.", is_flag=True)
 def main(
@@ -79,17 +199,39 @@ def main(
     default_color: str,
     debug: bool,
     decimal_precision: int,
+    auto_precision: bool,
     max_iter: int,
     version: bool,
     load_state: str,
     threads: int,
     screenshot_threads: int,
+    screenshot_format: str,
+    antialiasing: int,
+    node: tuple[str, ...],
+    worker: str | None,
+    metrics_file: str | None,
+    animate: tuple[str, ...],
+    frames: int,
+    fps: int,
+    interpolation: str,
+    video_format: str,
+    output: str,
 ) -> None:
     # If -v or --version is used, show version and exit
     if version:
         print(__version__)
         quit()
 
+    if worker is not None:
+        run_worker(worker, screenshot_threads)
+        quit()
+
+    if len(animate) > 0:
+        render_animation(
+            animate, Vec(size[0], size[1]), frames, fps, interpolation, video_format, output, screenshot_threads
+        )
+        quit()
+
     app = FractalisticApp()
 
     # Set default fractal
@@ -108,9 +250,14 @@ def main(
     app.settings.screenshot_size = Vec(size[0], size[1])
     app.settings.render_settings.max_iter = max_iter
     app.settings.render_settings.wanted_numeric_precision = decimal_precision
+    app.settings.auto_precision = auto_precision
     app.settings.state_file = load_state
     app.settings.threads = threads
     app.settings.screenshot_threads = screenshot_threads
+    app.settings.screenshot_format = screenshot_format.lower()
+    app.settings.antialiasing = antialiasing
+    app.settings.render_nodes = node
+    app.settings.metrics_file = metrics_file
 
     logs = app.run()
     if logs is None:
@@ -0,0 +1,198 @@
+"""Animations interpolating the render settings between keyframes, which are state files saved with `save_state`.
+
+The frames are streamed as they are rendered to stdout or to files, as raw PPM or Y4M frames
+that can be piped into an encoder without writing intermediate images, for example:
+
+    fractalistic --animate start.fc end.fc --frames 240 | ffmpeg -i - animation.mp4
+"""
+
+import pickle
+import sys
+from copy import deepcopy
+from typing import BinaryIO, Generator
+
+import gmpy2
+import numpy as np
+
+from .renderer import Renderer
+from .settings import RenderSettings, StateInfo
+from .vec import Vec
+
+INTERPOLATIONS = ("linear", "smooth", "spline")
+"""Ways to move between the keyframes:
+- linear: at constant speed
+- smooth: slowing down at each keyframe
+- spline: along a Catmull-Rom spline through all the keyframes, without stopping at them"""
+
+INTERPOLATED_SETTINGS = (
+    "screen_pos_on_plane",
+    "julia_click",
+    "mandelbrot_starting_value",
+    "julia_exponent",
+    "mandelbrot_exponent",
+    "burning_ship_exponent",
+    "inv_mandel_numerator",
+    "max_iter",
+)
+"""Render settings that change progressively between the keyframes, along with the cell size.
+The other settings take the value of the previous keyframe."""
+
+VIDEO_FORMATS = ("y4m", "ppm")
+
+
+def load_keyframe(filename: str, size: Vec[int]) -> RenderSettings:
+    """Returns the render settings of a state file, with the cell size scaled so that a frame of the given size
+    shows the same part of the plane as the canvas the state was saved from"""
+    with open(filename, "rb") as f:
+        state_info: StateInfo = pickle.load(f)
+
+    render_settings = state_info.render_settings
+    if state_info.canvas_width is not None:
+        render_settings.cell_size = state_info.canvas_width * render_settings.cell_size / size.x
+
+    return render_settings
+
+
+def interpolate(values: list, t: float, interpolation: str) -> object:
+    """Interpolate between values[1] and values[2] at a fraction `t` of the way,
+    values[0] and values[3] are the previous and next keyframe values, only used by splines"""
+    p0, p1, p2, p3 = values
+
+    if interpolation == "spline":
+        return p1 + 0.5 * t * (p2 - p0 + t * (2 * p0 - 5 * p1 + 4 * p2 - p3 + t * (3 * (p1 - p2) + p3 - p0)))
+
+    if interpolation == "smooth":
+        t = t * t * (3 - 2 * t)
+
+    return p1 + (p2 - p1) * t
+
+
+def get_frame_settings(keyframes: list[RenderSettings], position: float, interpolation: str) -> RenderSettings:
+    """Returns the render settings at a position between the keyframes, 0 is the first keyframe and
+    len(keyframes) - 1 the last one"""
+    index = min(int(position), len(keyframes) - 2)
+    t = position - index
+    # The keyframes before the first one and after the last one are repeated for the splines
+    neighbours = [keyframes[max(0, min(i, len(keyframes) - 1))] for i in range(index - 1, index + 3)]
+
+    render_settings = deepcopy(keyframes[index])
+    precision = max(keyframe.wanted_numeric_precision for keyframe in neighbours)
+
+    with gmpy2.local_context(gmpy2.get_context(), precision=precision):  # type: ignore
+        for name in INTERPOLATED_SETTINGS:
+            values = [getattr(keyframe, name) for keyframe in neighbours]
+            # Settings that don't change between two keyframes stay the same, even with splines
+            if values[1] == values[2]:
+                continue
+
+            value = interpolate(values, t, interpolation)
+            if name == "max_iter":
+                value = round(value)  # type: ignore
+            elif all(isinstance(v, int) for v in values) and float(value).is_integer():  # type: ignore
+                # Integer exponents have faster engines
+                value = int(value)  # type: ignore
+            setattr(render_settings, name, value)
+
+        # The zoom changes at a constant speed, so the cell size is interpolated on a logarithmic scale
+        log_cell_sizes = [gmpy2.log(keyframe.cell_size) for keyframe in neighbours]  # type: ignore
+        render_settings.cell_size = gmpy2.exp(interpolate(log_cell_sizes, t, interpolation))  # type: ignore
+
+    return render_settings
+
+
+def get_animation_settings(
+    keyframes: list[RenderSettings], frames: int, interpolation: str
+) -> Generator[RenderSettings, None, None]:
+    """Yields the render settings of each frame of an animation going through all the keyframes"""
+    if len(keyframes) < 2:
+        raise ValueError("An animation needs at least two keyframes")
+
+    for frame in range(frames):
+        position = frame * (len(keyframes) - 1) / max(1, frames - 1)
+        yield get_frame_settings(keyframes, position, interpolation)
+
+
+def get_yuv444(pixels: np.ndarray) -> bytes:
+    """Returns the Y, Cb and Cr planes of an uint8 RGB array, with the BT.601 limited range used by Y4M files"""
+    r, g, b = (pixels[..., i].astype(np.float32) for i in range(3))
+    planes = [
+        16 + (65.481 * r + 128.553 * g + 24.966 * b) / 255,
+        128 + (-37.797 * r - 74.203 * g + 112.0 * b) / 255,
+        128 + (112.0 * r - 93.786 * g - 18.214 * b) / 255,
+    ]
+    return b"".join(np.clip(np.rint(plane), 0, 255).astype(np.uint8).tobytes() for plane in planes)
+
+
+class FrameWriter:
+    """Writes the frames of an animation to stdout if the output is "-", to a file per frame if the output
+    contains a "{}" replaced with the frame number, or else to a single file"""
+
+    video_format: str
+    output: str
+    size: Vec[int]
+    fps: int
+
+    file: BinaryIO | None = None
+    """Stream the frames are written to, None when writing a file per frame"""
+
+    frames: int = 0
+    """Number of frames written"""
+
+    def __init__(self, output: str, video_format: str, size: Vec[int], fps: int) -> None:
+        if video_format not in VIDEO_FORMATS:
+            raise ValueError(f"Unknown video format: {video_format}")
+
+        self.output = output
+        self.video_format = video_format
+        self.size = size
+        self.fps = fps
+
+        if output == "-":
+            self.file = sys.stdout.buffer
+        elif "{" not in output:
+            self.file = open(output, "wb")  # noqa: SIM115, closed by close()
+
+    def get_header(self) -> bytes:
+        if self.video_format == "y4m":
+            return f"YUV4MPEG2 W{self.size.x} H{self.size.y} F{self.fps}:1 Ip A1:1 C444\n".encode()
+        return b""
+
+    def get_frame(self, pixels: np.ndarray) -> bytes:
+        if self.video_format == "y4m":
+            return b"FRAME\n" + get_yuv444(pixels)
+        return f"P6\n{self.size.x} {self.size.y}\n255\n".encode() + np.ascontiguousarray(pixels).tobytes()
+
+    def write_frame(self, pixels: np.ndarray) -> None:
+        """Write the next frame, an uint8 RGB array of shape (size.y, size.x, 3)"""
+        if self.file is None:
+            with open(self.output.format(self.frames), "wb") as f:
+                f.write(self.get_header() + self.get_frame(pixels))
+        else:
+            if self.frames == 0:
+                self.file.write(self.get_header())
+            self.file.write(self.get_frame(pixels))
+            self.file.flush()
+
+        self.frames += 1
+
+    def close(self) -> None:
+        if self.file is not None and self.file is not sys.stdout.buffer:
+            self.file.close()
+
+
+def write_animation(
+    keyframes: list[RenderSettings],
+    size: Vec[int],
+    frames: int,
+    writer: FrameWriter,
+    interpolation: str = "linear",
+    processes: int | None = None,
+) -> Generator[float, None, None]:
+    """Render an animation going through the keyframes and write its frames,
+    yields the render time of each frame once it is written"""
+    with Renderer(processes) as renderer:
+        settings = get_animation_settings(keyframes, frames, interpolation)
+        for result in renderer.render_sequence(size, settings, rgb=True):
+            if result.rgb is not None:
+                writer.write_frame(result.rgb)
+            yield result.render_time
@@ -0,0 +1,90 @@
+"""Adaptive supersampling: only the pixels on the edges of a rendered frame are supersampled.
+
+Aliasing only shows where neighbouring pixels have different colors, so instead of rendering the whole frame
+at a higher resolution, the pixels whose iteration count differs from one of their neighbours are
+split in a grid of strata, a few of them get a random point, and the colors of the points are averaged
+with the color of the pixel. Uniform areas, like the inside of the sets, cost nothing more.
+
+The points are rendered by the render processes like the tiles of a frame, see RenderPool.render_points().
+"""
+
+from math import ceil, sqrt
+from typing import Callable
+
+import numpy as np
+
+from . import colors
+from .render_pool import RenderPool
+from .settings import RenderSettings
+from .vec import Vec
+
+
+def get_edge_mask(iterations: np.ndarray) -> np.ndarray:
+    """Returns whether each pixel has a neighbour, including the diagonal ones, with a different iteration count"""
+    edges = np.zeros(iterations.shape, dtype=bool)
+    height, width = iterations.shape
+
+    # Each pair of neighbours is compared once, and both are marked if they differ
+    for dy, dx in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        first = (slice(0, height - dy), slice(max(0, -dx), width - max(0, dx)))
+        second = (slice(dy, height), slice(max(0, dx), width - max(0, -dx)))
+        different = iterations[first] != iterations[second]
+        edges[first] |= different
+        edges[second] |= different
+
+    return edges
+
+
+def get_subsample_points(
+    ys: np.ndarray, xs: np.ndarray, samples: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the fractional coordinates of `samples` jittered points in each of the given pixels, pixel after pixel.
+    Each pixel is split in a grid of strata, its points are at random positions in distinct random strata,
+    so that they cover the pixel more evenly than uniformly random points."""
+    grid = ceil(sqrt(samples))
+    strata = rng.permuted(np.tile(np.arange(grid * grid), (ys.size, 1)), axis=1)[:, :samples]
+    jitter = rng.random((2, ys.size, samples))
+
+    sample_ys = ys[:, np.newaxis] + (strata // grid + jitter[0]) / grid - 0.5
+    sample_xs = xs[:, np.newaxis] + (strata % grid + jitter[1]) / grid - 0.5
+    return sample_ys.ravel(), sample_xs.ravel()
+
+
+def supersample_edges(
+    render_pool: RenderPool,
+    render_settings: RenderSettings,
+    size: Vec[int],
+    iterations: np.ndarray,
+    pixels: np.ndarray,
+    palette: np.ndarray,
+    samples: int,
+    processes: int,
+    cancelled: Callable[[], bool] = lambda: False,
+    seed: int = 0,
+    lines: tuple[int, int] | None = None,
+) -> int:
+    """Supersample the pixels on the edges of a rendered frame of the given size, whose iteration counts
+    and colors are given. The colors are replaced in place by the average of the color of the pixel and
+    of `samples` points inside of it. Only the edges of the given range of lines are supersampled,
+    the other lines are only used to find them. Returns the number of supersampled pixels."""
+    if samples == 0:
+        return 0
+
+    edges = get_edge_mask(iterations)
+    if lines is not None:
+        edges[: lines[0]] = False
+        edges[lines[1] :] = False
+
+    ys, xs = np.nonzero(edges)
+    if ys.size == 0:
+        return 0
+
+    sample_ys, sample_xs = get_subsample_points(ys, xs, samples, np.random.default_rng(seed))
+    sample_iterations = render_pool.render_points(render_settings, size, sample_ys, sample_xs, processes, cancelled)
+    if sample_iterations is None:
+        return 0
+
+    sample_colors = colors.colorize(sample_iterations, palette).reshape(ys.size, samples, 3)
+    total = sample_colors.sum(axis=1, dtype=np.uint32) + pixels[ys, xs]
+    pixels[ys, xs] = np.rint(total / (samples + 1)).astype(np.uint8)
+    return int(ys.size)
@@ -2,14 +2,15 @@ import asyncio
 import os
 import pickle
 from copy import deepcopy
+from itertools import zip_longest
 from math import ceil
-from multiprocessing import Manager, Pool
+from threading import Event, Lock
 from time import monotonic, sleep, time
 from typing import Callable, Generator, Optional, TypeAlias
 
 import gmpy2
+import numpy as np
 from gmpy2 import mpc, mpfr  # type: ignore
-from PIL import Image
 from textual import log, on
 from textual.app import App
 from textual.binding import Binding
@@ -18,21 +19,37 @@ from textual.events import Click, Resize
 from textual.widget import Widget
 from textual.widgets import Footer, Input, ProgressBar, RichLog, Static
 
-from . import __version__, colors, fractals
+from . import __version__, colors, fractals, jit
+from .antialiasing import supersample_edges
 from .click_modes import CLICK_MODES
 from .command import Command, CommandIncrement, CommandIncrementArgParseResult
+from .distributed import NodeCluster, parse_address
+from .engines import CROSS_CHECK_MAX_MISMATCHES, ENGINES, REFERENCE_ENGINE, cross_check, get_engine_name, select_engine
 from .fractal_canv import FractalCanv
 from .fractals.fractal_base import FractalBase
-from .line_divergence_result import LineDivergenceResult
+from .image_writers import IMAGE_WRITERS
+from .metrics import METRICS_HISTORY, FrameMetrics, MetricsHistory, get_iteration_counts
+from .render_notices import RenderedTile
+from .render_pool import (
+    PROGRESSIVE_FIRST_STEP,
+    PROGRESSIVE_MAX_STEP,
+    RenderPool,
+)
 from .settings import RenderSettings, Settings, StateInfo
+from .theme import rich_theme, rule
+from .tile import Tile
+from .tile_cache import CacheGrid, TileCache
 from .utils import (
     SRC_DIR,
+    UNRENDERED,
+    get_auto_precision,
+    get_band_settings,
     get_color_index_from_name,
-    get_divergence_matrix,
+    get_exposed_regions,
     get_fractal_index_from_name,
+    get_frame_overlap,
+    get_frame_shift,
     pos_to_c,
-    rich_theme,
-    rule,
     set_precision,
 )
 from .vec import Vec
@@ -42,6 +59,9 @@ from .vec import Vec
 LogLine: TypeAlias = str | None
 LogObj: TypeAlias = LogLine | list[LogLine]
 
+SCREENSHOT_BAND_PIXELS = 2**22
+"""Approximate number of pixels of the bands of lines screenshots are rendered and written by"""
+
 
 class FractalisticApp(App[list[LogObj]]):
     settings: Settings = Settings()
@@ -64,16 +84,65 @@ class FractalisticApp(App[list[LogObj]]):
     average_divergence: float = 0
     """Average divergence of the current canvas render"""
 
+    skipped_iterations: int = 0
+    """Number of iterations skipped with the series approximation during the last render"""
+
     cancel_screenshot: bool = False
     """True when the current screenshot operation must be cancelled as soon as possible"""
 
+    screenshot_running: bool = False
+    """True from the start of a screenshot until it is finished, the app stays not ready in the meantime"""
+
     current_zoom_level: str = "1"
     """[NOT REACTIVE], current zoom level, updated at each render and
     used to show the zoom level in the cavas border subtitle"""
 
     command_list: dict[str, Command | CommandIncrement]
 
-    current_process_pool = None
+    render_pool: RenderPool = RenderPool()
+    """Worker processes used for all renders, started once when the app is ready"""
+
+    cluster: NodeCluster = NodeCluster()
+    """Render nodes the tiles of the screenshots are sent to, see distributed.py"""
+
+    last_frame: np.ndarray | None = None
+    """Iteration counts of the last complete canvas render, reused when the view is only moved or resized"""
+
+    last_frame_settings: RenderSettings | None = None
+    """Render settings used for last_frame"""
+
+    tile_cache: TileCache = TileCache()
+    """Iteration counts of the tiles of the previous renders"""
+
+    cache_hit_rate: float | None = None
+    """Fraction of the tiles of the last render found in the tile cache, None if the cache was not used"""
+
+    render_version: int = 0
+    """Incremented every time the view changes, a render of the canvas is cancelled when it is not the latest"""
+
+    render_version_lock: Lock = Lock()
+    """Makes the check of the render version and the start or end of a canvas render atomic"""
+
+    canvas_idle: Event = Event()
+    """Set when no render of the canvas is running"""
+
+    render_speed: float = 0
+    """Number of pixels per second rendered by the last canvas render, used to plan progressive renders"""
+
+    metrics: MetricsHistory = MetricsHistory()
+    """Measures of the last complete canvas renders, shown by the stats command"""
+
+    engine_name: str | None = None
+    """Engine used to render the current view, see engines.select_engine()"""
+
+    cross_check_mismatches: float | None = None
+    """Fraction of the pixels of the last cross-checked render that disagreed with the reference engine"""
+
+    rng: np.random.Generator = np.random.default_rng()
+    """Picks the pixels that are cross-checked"""
+
+    precision_warning: bool = False
+    """Whether the user was warned that the numeric precision is too low for the current zoom level"""
 
     # ---------- DOM ELEMENTS
     container: Static = Static(id="container")
@@ -101,6 +170,22 @@ class FractalisticApp(App[list[LogObj]]):
 
     # ========== increment type commands
 
+    def command_antialiasing(self, value: int) -> None:
+        self.settings.antialiasing = value
+
+        if value == 0:
+            self.log_success("Screenshot antialiasing disabled")
+        else:
+            self.log_success(f"Edge pixels of the screenshots supersampled with [acc]{value}[/] points")
+
+    def command_latency(self, value: int) -> None:
+        self.settings.render_latency = value
+
+        if value == 0:
+            self.log_success("Progressive rendering disabled")
+        else:
+            self.log_success(f"Render latency set to [acc]{value}ms")
+
     def command_max_iter(self, value: int) -> None:
         self.render_settings.max_iter = value
 
@@ -115,14 +200,28 @@ class FractalisticApp(App[list[LogObj]]):
         self.precision = value
 
         self.log_success(f"Numeric precision set to [acc]{value}")
+        if self.settings.auto_precision:
+            self.settings.auto_precision = False
+            self.log_info("Automatic precision turned [acc]off[/], use [acc]auto_precision on[/] to turn it back on")
+        self.update_canv()
+
+    def command_series_terms(self, value: int) -> None:
+        self.render_settings.series_approximation_terms = value
+
+        if value == 0:
+            self.log_success("Series approximation disabled")
+        else:
+            self.log_success(f"Series approximation terms set to [acc]{value}")
         self.update_canv()
 
     def command_screenshot_threads(self, value: int) -> None:
         self.settings.screenshot_threads = value
+        self.render_pool.resize(self.pool_size)
         self.log_success(f"Screenshot thread count set to [acc]{self.settings.screenshot_threads}")
 
     def command_threads(self, value: int) -> None:
         self.settings.threads = value
+        self.render_pool.resize(self.pool_size)
         self.log_success(f"Rendering thread count set to [acc]{self.settings.threads}")
 
     def command_zoom_lvl(self, value: int) -> None:
@@ -130,6 +229,60 @@ class FractalisticApp(App[list[LogObj]]):
         self.log_success(f"Zoom level set to [acc]{self.settings.zoom_intensity}%")
 
     # ========== other commands
+    def command_auto_precision(self, args: list[str], argc: int) -> None:
+        states = {True: "on", False: "off"}
+
+        if argc == 0:
+            needed = get_auto_precision(self.render_settings, self.settings.canv_size)
+            self.log_write(
+                [
+                    f"Automatic precision: [acc]{states[self.settings.auto_precision]}[/]",
+                    f"Current precision: [acc]{self.precision}[/] bits, "
+                    f"[acc]{needed}[/] bits needed for the current zoom level",
+                ]
+            )
+            return
+
+        if args[0] not in ["on", "off"]:
+            self.log_error("[red]Argument must be 'on' or 'off'")
+            return
+
+        self.settings.auto_precision = args[0] == "on"
+        self.log_success(f"Automatic precision turned [acc]{args[0]}")
+        self.update_canv()
+
+    def command_cache(self, args: list[str], argc: int) -> None:
+        cache = self.tile_cache
+
+        if argc == 0:
+            states = {True: "on", False: "off"}
+            hit_rate = (cache.memory_hits + cache.disk_hits) / cache.lookups if cache.lookups > 0 else 0
+            disk_usage = cache.get_disk_usage()[0] if cache.disk_budget > 0 else 0
+            self.log_write(
+                [
+                    f"Tile cache: [acc]{states[self.settings.tile_cache]}[/]",
+                    f"Memory: [acc]{len(cache.tiles)}[/] tiles, "
+                    f"[acc]{cache.memory_bytes / 2**20:.1f}[/] / {cache.memory_budget / 2**20:.0f} MiB",
+                    f"Disk: [acc]{disk_usage / 2**20:.1f}[/] / {cache.disk_budget / 2**20:.0f} MiB "
+                    f"in {cache.directory}",
+                    f"Hits: [acc]{cache.memory_hits}[/] in memory, [acc]{cache.disk_hits}[/] on disk, "
+                    f"[acc]{cache.misses}[/] misses ([acc]{hit_rate:.0%}[/])",
+                ]
+            )
+            return
+
+        if args[0] == "clear":
+            cache.clear()
+            self.log_success("Tile cache cleared")
+            return
+
+        if args[0] not in ["on", "off"]:
+            self.log_error("[red]Argument must be 'on', 'off' or 'clear'")
+            return
+
+        self.settings.tile_cache = args[0] == "on"
+        self.log_success(f"Tile cache turned [acc]{args[0]}")
+
     def command_capture(self, args: list[str], argc: int) -> None:
         if argc == 0:
             self.action_capture()
@@ -226,6 +379,55 @@ class FractalisticApp(App[list[LogObj]]):
         self.log_success(f"Current color set to [acc]{self.selected_color.__name__}")
         self.update_canv()
 
+    def command_engine(self, args: list[str], argc: int) -> None:
+        demoted = self.render_pool.demoted_engines
+        size = self.settings.canv_size
+
+        if argc == 0:
+            mismatches = self.cross_check_mismatches
+            mismatches_text = "" if mismatches is None else f", [acc]{mismatches:.0%}[/] mismatches in the last one"
+            lines: list[LogLine] = [
+                f"Current engine: [acc]{select_engine(self.render_settings, size, demoted).name}",
+                f"Cross-check: [acc]{self.settings.cross_check_samples}[/] pixels per render{mismatches_text}",
+            ]
+            for name, engine in ENGINES.items():
+                if name in demoted:
+                    state = "[red]demoted[/]"
+                elif engine is REFERENCE_ENGINE or engine.supports(self.render_settings):
+                    cost = engine.get_cost(self.render_settings, size) / 1000
+                    state = f"estimated [acc]{cost:.0f}µs[/] per iteration of every pixel"
+                else:
+                    state = "not supported by the current view"
+                lines.append(f"{name}: {state}")
+            self.log_write(lines)
+            return
+
+        if args[0] == "reset" and argc == 1:
+            demoted.clear()
+            self.log_success("Every engine can be used again")
+            self.update_canv()
+            return
+
+        if args[0] != "check" or argc != 2:
+            self.log_error("[red]Arguments must be 'reset' or 'check \\[pixels]'")
+            return
+
+        try:
+            samples = int(args[1])
+        except ValueError:
+            self.log_error("[red]The number of pixels must be an integer")
+            return
+
+        if samples < 0:
+            self.log_error("[red]The number of pixels must be positive")
+            return
+
+        self.settings.cross_check_samples = samples
+        if samples == 0:
+            self.log_success("Cross-check turned [acc]off")
+        else:
+            self.log_success(f"[acc]{samples}[/] pixels of each render are cross-checked")
+
     def command_exp_type(self, args: list[str], argc: int) -> None:
         if argc == 0:
             self.log_write(
@@ -316,10 +518,107 @@ class FractalisticApp(App[list[LogObj]]):
             ]
         )
 
+    def command_interior_detection(self, args: list[str], argc: int) -> None:
+        fractal_name = self.selected_fractal.__name__
+
+        if argc == 0:
+            states = {True: "on", False: "off"}
+            self.log_write(
+                [
+                    f"{fractal.__name__}: [acc]{states[fractal.interior_detection_enabled(self.render_settings)]}"
+                    for fractal in fractals.fractal_list
+                ]
+            )
+            return
+
+        if args[0] not in ["on", "off"]:
+            self.log_error("[red]Argument must be 'on' or 'off'")
+            return
+
+        disabled = set(self.render_settings.interior_detection_disabled) - {fractal_name}
+        if args[0] == "off":
+            disabled.add(fractal_name)
+        self.render_settings.interior_detection_disabled = tuple(sorted(disabled))
+
+        self.log_success(f"Interior detection turned [acc]{args[0]}[/] for [acc]{fractal_name}")
+        self.update_canv()
+
+    def command_jit(self, args: list[str], argc: int) -> None:
+        states = {True: "on", False: "off"}
+
+        if argc == 0:
+            lines: list[LogLine] = [f"Compiled float64 loops: [acc]{states[self.render_settings.jit]}"]
+            if not jit.JIT_AVAILABLE:
+                lines.append("[red]Numba is not installed, the numpy engine is used instead")
+            elif not jit.jit_is_usable(self.selected_fractal, self.render_settings):
+                lines.append("The current exponent is not supported, the numpy engine is used instead")
+            self.log_write(lines)
+            return
+
+        if args[0] not in ["on", "off"]:
+            self.log_error("[red]Argument must be 'on' or 'off'")
+            return
+
+        self.render_settings.jit = args[0] == "on"
+        self.log_success(f"Compiled float64 loops turned [acc]{args[0]}")
+        if self.render_settings.jit and not jit.JIT_AVAILABLE:
+            self.log_warning("Numba is not installed, the numpy engine is used instead")
+        self.update_canv()
+
     def command_load_state(self, args: list[str], _: int) -> None:
         self.load_state(args[0])
         self.update_canv()
 
+    def command_nodes(self, args: list[str], argc: int) -> None:
+        nodes = self.settings.render_nodes
+
+        if argc == 0:
+            if not nodes:
+                self.log_info("No render node, the screenshots are rendered by the threads of this host")
+                return
+
+            self.cluster.set_addresses(nodes)
+            lines: list[LogLine] = []
+            for node in self.cluster.nodes:
+                if node.connection is not None:
+                    state = f"connected, [acc]{node.processes}[/] processes"
+                elif node.error is not None:
+                    state = f"[red]lost: {node.error}[/]"
+                else:
+                    state = "not connected yet"
+                lines.append(f"{node.address}: {state}")
+            self.log_write(lines)
+            return
+
+        if args[0] == "clear" and argc == 1:
+            self.settings.render_nodes = ()
+            self.cluster.set_addresses(())
+            self.log_success("Render nodes removed, the screenshots are rendered by the threads of this host")
+            return
+
+        if args[0] not in ["add", "remove"] or argc != 2:
+            self.log_error("[red]Arguments must be 'add \\[address]', 'remove \\[address]' or 'clear'")
+            return
+
+        address = args[1]
+        if args[0] == "add":
+            try:
+                parse_address(address)
+            except ValueError as e:
+                self.log_error(f"[red]{e}")
+                return
+            if address not in nodes:
+                self.settings.render_nodes = nodes + (address,)
+            self.log_success(f"Render node [acc]{address}[/] added")
+        else:
+            if address not in nodes:
+                self.log_error(f"[red]'{address}' is not a render node")
+                return
+            self.settings.render_nodes = tuple(node for node in nodes if node != address)
+            self.log_success(f"Render node [acc]{address}[/] removed")
+
+        self.cluster.set_addresses(self.settings.render_nodes)
+
     def command_pos(self, args: list[str], argc: int) -> None:
         # If no args are provided, just show the current position
         if argc == 0:
@@ -352,6 +651,7 @@ class FractalisticApp(App[list[LogObj]]):
             with open(filename, "wb") as f:
                 state_info = StateInfo()
                 state_info.render_settings = self.render_settings
+                state_info.canvas_width = self.settings.canv_size.x
                 pickle.dump(state_info, f)
         except OSError as e:
             self.log_error(f"Cannot write to file '{filename}'. [red]Errno {e.errno}: {e.strerror}.")
@@ -359,6 +659,23 @@ class FractalisticApp(App[list[LogObj]]):
 
         self.log_success(f"State saved to [acc]{filename}")
 
+    def command_screenshot_format(self, args: list[str], argc: int) -> None:
+        if argc == 0:
+            self.log_write(
+                [
+                    f"Current screenshot format: [acc]{self.settings.screenshot_format}[/]",
+                    f"Available formats: {', '.join([f'[acc]{name}[/]' for name in IMAGE_WRITERS])}",
+                ]
+            )
+            return
+
+        if args[0] not in IMAGE_WRITERS:
+            self.log_error(f"[red]Format must be one of: {', '.join(IMAGE_WRITERS)}")
+            return
+
+        self.settings.screenshot_format = args[0]
+        self.log_success(f"Screenshot format set to [acc]{args[0]}")
+
     def command_set_exp(self, args: list[str], argc: int) -> None:
         if argc == 0:
             self.log_write(
@@ -423,6 +740,91 @@ class FractalisticApp(App[list[LogObj]]):
                     self.render_settings.burning_ship_exponent = exp_type(real_parsed)
         self.update_canv()
 
+    def command_stats(self, args: list[str], argc: int) -> None:
+        if argc == 0:
+            history = self.metrics
+            if len(history.frames) == 0:
+                self.log_info("No render of the canvas was completed yet")
+                return
+
+            last = history.frames[-1]
+            render_time = history.get_mean("render_time")
+
+            # Frames reused from the tile cache or the last frame can take no measurable time
+            def per_second(value: float) -> float:
+                return value / render_time if render_time > 0 else 0
+
+            def share(name: str) -> str:
+                return f"[acc]{history.get_mean(name) * 1000:.1f}ms[/] ({per_second(history.get_mean(name)):.0%})"
+
+            rendered_pixels = history.get_mean("rendered_pixels")
+            max_iter_share = history.get_mean("max_iter_pixels") / rendered_pixels if rendered_pixels > 0 else 0
+            compute_text = ", ".join(f"{t * 1000:.0f}" for t in last.compute_time)
+            utilisation_text = ", ".join(f"{u:.0%}" for u in last.utilisation)
+            self.log_write(
+                [
+                    f"Averages over the last [acc]{len(history.frames)}[/] renders:",
+                    f"Render time: [acc]{render_time * 1000:.1f}ms[/], "
+                    f"[acc]{per_second(rendered_pixels) / 1e6:.2f}[/] Mpx/s, "
+                    f"[acc]{per_second(history.get_mean('iterations')) / 1e6:.1f}[/] Miter/s",
+                    f"Rendered pixels: [acc]{rendered_pixels:.0f}[/], [acc]{max_iter_share:.0%}[/] reached max_iter",
+                    f"IPC wait: {share('ipc_wait')}",
+                    f"Coloring: {share('color_time')}",
+                    f"Painting: {share('paint_time')}",
+                    f"Last render: [acc]{last.fractal}[/] with the [acc]{last.engine}[/] engine, "
+                    f"{last.max_iter} iter, {last.processes} threads",
+                    f"Compute time of the threads: [acc]{compute_text}[/] ms",
+                    f"Utilisation of the threads: [acc]{utilisation_text}",
+                ]
+            )
+            return
+
+        if args[0] == "clear" and argc == 1:
+            self.metrics.clear()
+            self.log_success("Render statistics cleared")
+            return
+
+        if args[0] != "file" or argc != 2:
+            self.log_error("[red]Arguments must be 'clear', 'file \\[path]' or 'file off'")
+            return
+
+        if args[1] == "off":
+            self.settings.metrics_file = None
+            self.log_success("Render metrics are no longer written to a file")
+        else:
+            self.settings.metrics_file = args[1]
+            self.log_success(f"Render metrics are appended to [acc]{args[1]}")
+
+    def command_subdivision(self, args: list[str], argc: int) -> None:
+        states = {True: "on", False: "off"}
+
+        if argc == 0:
+            self.log_write(
+                [
+                    f"Subdivision: [acc]{states[self.render_settings.subdivision]}[/]",
+                    f"Subdivision guard: [acc]{states[self.render_settings.subdivision_guard]}",
+                ]
+            )
+            return
+
+        value = args[-1]
+        if value not in ["on", "off"]:
+            self.log_error("[red]Last argument must be 'on' or 'off'")
+            return
+
+        if argc == 2:
+            if args[0] != "guard":
+                self.log_error("[red]First argument must be 'guard'")
+                return
+
+            self.render_settings.subdivision_guard = value == "on"
+            self.log_success(f"Subdivision guard turned [acc]{value}")
+        else:
+            self.render_settings.subdivision = value == "on"
+            self.log_success(f"Subdivision turned [acc]{value}")
+
+        self.update_canv()
+
     def command_version(self, args: list[str], argc: int) -> None:
         del args, argc
         self.log_info(f"Fractalistic version: [bg_acc]{__version__}")
@@ -431,6 +833,36 @@ class FractalisticApp(App[list[LogObj]]):
     # Please order the commands alphabetically
     def set_command_list(self) -> None:
         self.command_list = {
+            "antialiasing": CommandIncrement(
+                funct=self.command_antialiasing,
+                hlp="Change the number of points computed inside of the pixels of the screenshots on edges.",
+                app_attribute="settings.antialiasing",
+                min_value=0,
+            ),
+            "auto_precision": Command(
+                funct=self.command_auto_precision,
+                hlp="Adjust the numeric precision to the zoom level automatically.",
+                accepted_arg_counts=[0, 1],
+                extra_help=(
+                    "[green]Usage : \\[on/off]\nUsage : no args[/]\n"
+                    "If no argument is given, print out the current precision and the one needed for the zoom level. "
+                    "When turned on, the precision is set before each render to the lowest number of bits that "
+                    "can tell the pixels apart, with a margin for rounding errors, and shallow views use the "
+                    "float64 engine. Setting the precision with the precision command turns it off."
+                ),
+            ),
+            "cache": Command(
+                funct=self.command_cache,
+                hlp="Show the statistics of the tile cache, turn it on or off, or clear it.",
+                accepted_arg_counts=[0, 1],
+                extra_help=(
+                    "[green]Usage : \\[on/off/clear]\nUsage : no args[/]\n"
+                    "If no argument is given, print out the usage and the hit rate of the cache. "
+                    "The tiles of the previous renders are kept in memory, and on disk so that they are "
+                    "available the next time the program is run. Tiles are only reused by renders "
+                    "with the same settings, cell size and alignment of the pixels."
+                ),
+            ),
             "capture": Command(
                 funct=self.command_capture,
                 hlp="Take a high quality screenshot",
@@ -470,6 +902,19 @@ class FractalisticApp(App[list[LogObj]]):
                     "Else, select the specified color."
                 ),
             ),
+            "engine": Command(
+                funct=self.command_engine,
+                hlp="Show the render engines, cross-check them with the reference engine, or reset the demoted ones.",
+                accepted_arg_counts=[0, 1, 2],
+                extra_help=(
+                    "[green]Usage : check \\[pixels]\nUsage : reset\nUsage : no args[/]\n"
+                    "If no argument is given, print out the engine of the current view, and the estimated cost of "
+                    "each engine that supports it. Each frame is rendered with the cheapest one.\n"
+                    "- check: after each render, compute this many random pixels with the arbitrary precision "
+                    "engine, and stop using the engine of the render if too many of them disagree. 0 turns it off.\n"
+                    "- reset: use the demoted engines again."
+                ),
+            ),
             "exp_type": Command(
                 funct=self.command_exp_type,
                 hlp="Set the data type used for Julia and Mandelbrot exponents.",
@@ -495,6 +940,35 @@ class FractalisticApp(App[list[LogObj]]):
                 ),
             ),
             "help": Command(funct=self.command_help, hlp="Show the help message", accepted_arg_counts=[0, 1]),
+            "interior_detection": Command(
+                funct=self.command_interior_detection,
+                hlp="Turn on or off the early classification of the points inside the current fractal.",
+                accepted_arg_counts=[0, 1],
+                extra_help=(
+                    "[green]Usage : \\[on/off]\nUsage : no args[/]\n"
+                    "If no argument is given, print out the state of each fractal. "
+                    "When on, points are classified as convergent as soon as their orbit becomes periodic, "
+                    "or lies in the main cardioid or bulb of the Mandelbrot set, instead of after max_iter iterations."
+                ),
+            ),
+            "jit": Command(
+                funct=self.command_jit,
+                hlp="Turn on or off the float64 loops compiled with Numba.",
+                accepted_arg_counts=[0, 1],
+                extra_help=(
+                    "[green]Usage : \\[on/off]\nUsage : no args[/]\n"
+                    "If no argument is given, print out whether the compiled loops are used. "
+                    "When on and Numba is installed, shallow views of fractals with integer exponents are rendered "
+                    "with escape time loops compiled to native code instead of the numpy engine. "
+                    "They are compiled the first time they are used, then cached on disk."
+                ),
+            ),
+            "latency": CommandIncrement(
+                funct=self.command_latency,
+                hlp="Change the time in milliseconds after which a first coarse preview of a render is shown.",
+                app_attribute="settings.render_latency",
+                min_value=0,
+            ),
             "load_state": Command(
                 funct=self.command_load_state,
                 hlp="Load a state from a file.",
@@ -513,6 +987,20 @@ class FractalisticApp(App[list[LogObj]]):
                 app_attribute="settings.move_distance",
                 min_value=1,
             ),
+            "nodes": Command(
+                funct=self.command_nodes,
+                hlp="Show, add or remove the render nodes the tiles of the screenshots are sent to.",
+                accepted_arg_counts=[0, 1, 2],
+                extra_help=(
+                    "[green]Usage : add \\[address]\nUsage : remove \\[address]\nUsage : clear\nUsage : no args[/]\n"
+                    "If no argument is given, print out the render nodes and whether they are connected. "
+                    "A render node is started on another host with `fractalistic --worker host:port`, or on this "
+                    "host with the path of a Unix socket. The tiles of the screenshots are split between the nodes, "
+                    "and rendered by the threads of this host when no node can be reached. "
+                    "The nodes and the app must share the key of the FRACTALISTIC_AUTHKEY environment variable, "
+                    "a node started without it prints the random key it generated."
+                ),
+            ),
             "pos": Command(
                 funct=self.command_pos,
                 hlp="Set the position to a specific point in the complex plane.",
@@ -530,6 +1018,19 @@ class FractalisticApp(App[list[LogObj]]):
                 min_value=5,
             ),
             "quit": Command(funct=self.command_quit, hlp="Exit the app", accepted_arg_counts=[0]),
+            "screenshot_format": Command(
+                funct=self.command_screenshot_format,
+                hlp="List the available screenshot file formats or select the specified one.",
+                accepted_arg_counts=[0, 1],
+                extra_help=(
+                    "[green]Usage : \\[png/tiff/raw]\nUsage : no args[/]\n"
+                    "If no argument is given, print out the current format and the available formats. "
+                    "Screenshots are written to the file as they are rendered, so that their size is not limited "
+                    "by the available memory.\n"
+                    "- \\[tiff] files are tiled BigTIFF files, for images larger than 4GiB.\n"
+                    "- \\[raw] files are uncompressed numpy .npy arrays of shape (height, width, 3)."
+                ),
+            ),
             "screenshot_threads": CommandIncrement(
                 funct=self.command_screenshot_threads,
                 hlp="Change the number of threads used for rendering screenshots",
@@ -545,6 +1046,15 @@ class FractalisticApp(App[list[LogObj]]):
                     "If no filename is specified, one will be generated automatically."
                 ),
             ),
+            "series_terms": CommandIncrement(
+                funct=self.command_series_terms,
+                hlp=(
+                    "Change the number of terms of the series approximation used to skip iterations at deep zooms. "
+                    "0 disables it."
+                ),
+                app_attribute="settings.render_settings.series_approximation_terms",
+                min_value=0,
+            ),
             "set_exp": Command(
                 funct=self.command_set_exp,
                 hlp="Set the julia/mandel exponent value.",
@@ -556,6 +1066,33 @@ class FractalisticApp(App[list[LogObj]]):
                     "Providing the imaginary part is only required if the exponent type is \\[mpc]."
                 ),
             ),
+            "stats": Command(
+                funct=self.command_stats,
+                hlp="Show where the time of the last renders went, or write the measures of each render to a file.",
+                accepted_arg_counts=[0, 1, 2],
+                extra_help=(
+                    "[green]Usage : clear\nUsage : file \\[path/off]\nUsage : no args[/]\n"
+                    f"If no argument is given, print out the averages over the last {METRICS_HISTORY} renders "
+                    "of the canvas, and the measures of the last one: time spent computing by each thread, "
+                    "iterations, pixels that reached max_iter, time lost waiting between the threads and the app, "
+                    "and time spent coloring and painting the canvas.\n"
+                    "- file: append the measures of every render to a file, one JSON object per line. "
+                    "'off' stops writing them."
+                ),
+            ),
+            "subdivision": Command(
+                funct=self.command_subdivision,
+                hlp="Render frames by recursively subdividing rectangles with a uniform border (Mariani-Silver).",
+                accepted_arg_counts=[0, 1, 2],
+                extra_help=(
+                    "[green]Usage : \\[on/off]\nUsage : guard \\[on/off]\nUsage : no args[/]\n"
+                    "If no argument is given, print out the current subdivision settings. "
+                    "Rectangles whose border has a uniform iteration count are filled without computing their pixels, "
+                    "which is much faster for views with large uniform areas.\n"
+                    "- The guard also requires the center lines of a rectangle to be uniform before filling it, "
+                    "to avoid missing thin filaments."
+                ),
+            ),
             "threads": CommandIncrement(
                 funct=self.command_threads,
                 hlp="Change the number of threads used for rendering",
@@ -634,12 +1171,17 @@ class FractalisticApp(App[list[LogObj]]):
         if not self.ready:
             return
 
+        # Set before starting the screenshot so that no other screenshot can start until it is finished
+        self.ready = False
+        self.screenshot_running = True
+
         # I dont know why this is working
         # Execute action_capture_2 in a non-blocking way
         asyncio.get_event_loop().run_in_executor(None, self.action_capture_2, (screenshot_size))
 
     def action_capture_2(self, screenshot_size: Vec | None) -> None:
-        self.ready = False
+        # The render pool is used by one render at a time, no canvas render can start once the app is not ready
+        self.canvas_idle.wait()
 
         # Dynamically bind the escape key to the cancel_screenshot action
         self.app.bind("escape", "cancel_screenshot", description="Cancel Screenshot")
@@ -655,37 +1197,102 @@ class FractalisticApp(App[list[LogObj]]):
 
         self.progress_bar.update(total=screenshot_height // 10, progress=0)
 
-        image = Image.new("RGB", (screenshot_width, screenshot_height), (0, 0, 0))
+        # The settings can be changed by commands during the screenshot
+        render_settings = deepcopy(self.render_settings)
+        palette = colors.get_palette(self.get_color(render_settings), render_settings.max_iter)
+        writer_class = IMAGE_WRITERS[self.settings.screenshot_format]
+        save_to = f"{self.selected_fractal.__name__}_screenshot_{int(time())}.{writer_class.extension}"
+        writer = writer_class(save_to, screenshot_size)
 
         # The size in the complex plane, of a pixel of the screenshot
-        pixel_size = self.settings.canv_size.x * self.render_settings.cell_size / screenshot_width
-        result = self.get_divergence_matrix(
-            cell_size=pixel_size,
-            size=screenshot_size,
-            update_loading_bar=True,
-            threads=self.settings.screenshot_threads,
-        )
+        pixel_size = self.settings.canv_size.x * render_settings.cell_size / screenshot_width
+        render_settings.cell_size = pixel_size
+
+        # The screenshot is rendered and written one band of lines at a time, so that the memory used
+        # doesn't depend on its size. Bands are a multiple of 10 lines for the progress bar.
+        band_height = max(10, SCREENSHOT_BAND_PIXELS // screenshot_width // 10 * 10)
+        # With antialiasing, the lines around a band are also rendered to find the edges on its first and last lines
+        margin = 1 if self.settings.antialiasing > 0 else 0
+        skipped_iterations = 0
+        supersampled_pixels = 0
+        utilisation: list[float] = []
+
+        # The tiles of the screenshot are sent to the render nodes, if there are any
+        self.cluster.set_addresses(self.settings.render_nodes)
+        self.cluster.reset_stats()
+        distributed = len(self.cluster.nodes) > 0
+        if distributed:
+            self.render_pool.cluster = self.cluster
+
+        for y_start in range(0, screenshot_height, band_height):
+            y_stop = min(y_start + band_height, screenshot_height)
+            render_start = max(0, y_start - margin)
+            render_stop = min(screenshot_height, y_stop + margin)
+            band_size = Vec(screenshot_width, render_stop - render_start)
+            band_settings = get_band_settings(render_settings, screenshot_size, render_start, render_stop)
+            iterations = np.zeros((band_size.y, band_size.x), dtype=np.int32)
+
+            result = self.get_divergence_matrix(
+                cell_size=pixel_size,
+                size=band_size,
+                update_loading_bar=True,
+                threads=self.settings.screenshot_threads,
+                render_settings=band_settings,
+            )
 
-        for line in result:
-            # None is returned if the screenshot was cancelled
-            if line is None:
+            for notice, values in result:
+                skipped_iterations += notice.skipped_iterations
+                iterations[notice.tile.slices] = values
+
+            pixels = colors.colorize(iterations, palette)
+            supersampled_pixels += supersample_edges(
+                self.render_pool,
+                band_settings,
+                band_size,
+                iterations,
+                pixels,
+                palette,
+                self.settings.antialiasing,
+                self.settings.screenshot_threads,
+                lambda: self.cancel_screenshot,
+                y_start,
+                (y_start - render_start, y_stop - render_start),
+            )
+
+            if self.cancel_screenshot:
                 break
 
-            for x, divergence in enumerate(line.values):
-                # Get a color from the result
-                color = Color.parse("black") if divergence == -1 else self.selected_color(divergence)
+            writer.write_lines(pixels[y_start - render_start : y_stop - render_start])
+            if not distributed:
+                utilisation = [a + b for a, b in zip_longest(utilisation, self.render_pool.utilisation, fillvalue=0)]
 
-                image.putpixel((x, line.y), color.rgb)
+        self.render_pool.cluster = None
 
-        # If the screenshot wasn't cancelled, save the screenshot to a file,
+        # If the screenshot wasn't cancelled, finish writing the file,
         # put a message in the log panel and wait one second to
         # allow the user to see that the operation is finished successfully.
-        if not self.cancel_screenshot:
-            save_to = f"{self.selected_fractal.__name__}_screenshot_{int(time())}.png"
-            image.save(save_to)
+        if self.cancel_screenshot:
+            writer.abort()
+        else:
+            writer.close()
             self.call_after_refresh(
                 self.log_success, f"Screenshot [{screenshot_width}x{screenshot_height}] saved to [bg_acc]{save_to}"
             )
+            if skipped_iterations > 0:
+                self.call_after_refresh(
+                    self.log_info, f"[acc]{skipped_iterations}[/] iterations skipped with the series approximation"
+                )
+            if supersampled_pixels > 0:
+                share = supersampled_pixels / (screenshot_width * screenshot_height)
+                self.call_after_refresh(
+                    self.log_info, f"[acc]{supersampled_pixels}[/] edge pixels ([acc]{share:.0%}[/]) supersampled"
+                )
+            if utilisation:
+                bands = ceil(screenshot_height / band_height)
+                utilisation_text = ", ".join(f"{x / bands:.0%}" for x in utilisation)
+                self.call_after_refresh(self.log_info, f"Utilisation of the rendering threads: [acc]{utilisation_text}")
+            if distributed:
+                self.call_after_refresh(self.log_write, self.get_node_stats())
 
             # Wait one second to allow the user to see that the operation is finished successfully
             sleep(1)
@@ -693,6 +1300,7 @@ class FractalisticApp(App[list[LogObj]]):
         self.progress_bar.add_class("hidden")
         self.container.remove_class("hidden")
 
+        self.screenshot_running = False
         self.ready = True
 
         # Unbind the escape key by attrbuting a non-existing action
@@ -709,11 +1317,28 @@ class FractalisticApp(App[list[LogObj]]):
         # Set cancel_screenshot back to false so that the next screenshot isn't unwantedly cancelled
         self.cancel_screenshot = False
 
+    def get_node_stats(self) -> list[LogLine]:
+        """Throughput of each render node during the last screenshot"""
+        lines: list[LogLine] = ["Throughput of the render nodes:"]
+        for node in self.cluster.nodes:
+            text = (
+                f"{node.address}: [acc]{node.tiles}[/] tiles, [acc]{node.pixels_per_second / 1e6:.2f}[/] Mpx/s, "
+                f"[acc]{node.busy_time:.1f}s[/] of compute"
+            )
+            if node.failures > 0:
+                text += f", [red]lost {node.failures} times: {node.error}[/]"
+            lines.append(text)
+        return lines
+
     def action_quit_(self) -> None:
         """We don't use the builtin quit action because it doesn't work during screenshots"""
 
         # Cancel any ongoing screenshots before leaving
         self.action_cancel_screenshot()
+        self.render_pool.terminate()
+        self.render_pool.release_frame()
+        self.cluster.disconnect()
+        self.tile_cache.flush()
 
         self.exit(self.logs)
 
@@ -764,7 +1389,7 @@ class FractalisticApp(App[list[LogObj]]):
         if self.settings.marker_pos is not None:
             c_num = self.pos_to_c(self.settings.marker_pos)
             divergence = self.get_divergence(c_num)
-            color = Color.parse("black") if divergence == -1 else self.selected_color(divergence)
+            color = Color(*self.get_palette(self.render_settings)[divergence].tolist())
             self.canv.set_pixel(self.settings.marker_pos.x, self.settings.marker_pos.y, color)
 
         self.settings.marker_pos = pos
@@ -776,7 +1401,17 @@ class FractalisticApp(App[list[LogObj]]):
         size: Vec[int] | None = None,
         threads: int | None = None,
         update_loading_bar: bool = False,
-    ) -> Generator[LineDivergenceResult, None, None]:
+        regions: list[Tile] | None = None,
+        start_step: int = 1,
+        skip_rendered: bool = False,
+        render_settings: RenderSettings | None = None,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> Generator[tuple[RenderedTile, np.ndarray], None, None]:
+        """Render a frame with the render pool, or only the given regions of it,
+        and yield the notices of the rendered tiles with the corresponding pixels of the frame buffer.
+        If `start_step` is greater than 1, the frame is rendered progressively, see get_progressive_tiles().
+        With `skip_rendered`, only the pixels of the regions that are UNRENDERED in the frame buffer are rendered.
+        The generator stops early when `cancelled` returns True, by default when the screenshot is cancelled."""
         if threads is None:
             threads = self.settings.threads
         if cell_size is None:
@@ -784,52 +1419,28 @@ class FractalisticApp(App[list[LogObj]]):
         if size is None:
             size = self.settings.canv_size
 
-        # Number of lines to render per thread
-        chunk_size = ceil(size.y / threads)
-        # List of tuples (start, end) of the lines to render for each thread
-        # start is inclusive, end is exclusive
-        chunks = [[x * chunk_size, min((x + 1) * chunk_size, size.y)] for x in range(0, threads)]
-
-        render_settings = deepcopy(self.render_settings)
+        render_settings = deepcopy(self.render_settings if render_settings is None else render_settings)
         render_settings.cell_size = cell_size
 
-        manager = Manager()
-        queue = manager.Queue()
-
-        self.current_process_pool = Pool(processes=threads)
-
-        # Start the rendering processes
-        self.current_process_pool.starmap_async(
-            get_divergence_matrix, [(chunk[0], chunk[1], render_settings, size, queue) for chunk in chunks], chunksize=1
-        )
-
-        rendered_lines = 0
-        finished_process_count = 0
-        while finished_process_count != threads:
-            # Return None if the screenshot was cancelled, and terminate the processes
-            if self.cancel_screenshot:
-                self.current_process_pool.terminate()
-                return None
-
-            rendered_lines += 1
-
-            # A message is added to the queue everytime a line is rendered
-            line = queue.get()
-
-            # None is added to the queue when a process is finished
-            if line is None:
-                finished_process_count += 1
-                continue
-
-            yield line
-
-            # Make the progress bar advance every 10 lines
-            if rendered_lines % 10 == 0 and update_loading_bar:
-                self.progress_bar.advance()
-
-        # Close the pool of processes
-        self.current_process_pool.close()
-        self.current_process_pool = None
+        rendered_pixels = 0
+        # Make the progress bar advance every 10 lines
+        progress_step = 10 * max(1, size.x)
+
+        for notice, values in self.render_pool.render_frame(
+            render_settings,
+            size,
+            threads,
+            cancelled or (lambda: self.cancel_screenshot),
+            regions,
+            start_step,
+            skip_rendered,
+        ):
+            yield notice, values
+
+            previous_progress = rendered_pixels // progress_step
+            rendered_pixels += notice.tile.pixel_count
+            if update_loading_bar:
+                self.progress_bar.advance(rendered_pixels // progress_step - previous_progress)
 
     def load_state(self, filename: str) -> None:
         try:
@@ -858,6 +1469,11 @@ class FractalisticApp(App[list[LogObj]]):
         self.render_settings.cell_size = 4 / self.settings.canv_size.x
         self.render_settings.screen_pos_on_plane = mpc(0, 0)
 
+    @property
+    def pool_size(self) -> int:
+        """The same worker processes are used for renders and screenshots, renders only use `threads` of them"""
+        return max(self.settings.threads, self.settings.screenshot_threads)
+
     @property
     def precision(self) -> int:
         return gmpy2.get_context().precision  # type: ignore
@@ -964,12 +1580,19 @@ class FractalisticApp(App[list[LogObj]]):
             command.funct(args, len(args))
 
     @property
-    def selected_fractal(self) -> FractalBase:
+    def selected_fractal(self) -> type[FractalBase]:
         return fractals.fractal_list[self.render_settings.fractal_index]
 
     @property
     def selected_color(self) -> Callable:
-        return colors.color_renderers[self.render_settings.color_renderer_index]
+        return self.get_color(self.render_settings)
+
+    def get_color(self, render_settings: RenderSettings) -> Callable:
+        return colors.color_renderers[render_settings.color_renderer_index]
+
+    def get_palette(self, render_settings: RenderSettings) -> np.ndarray:
+        """Returns the colors of the iteration counts of a render with the given settings, see colors.get_palette()"""
+        return colors.get_palette(self.get_color(render_settings), render_settings.max_iter)
 
     def rewrite_logs(self) -> None:
         """Rewrite the logs so that they fit the new log panel size when the terminal is resized"""
@@ -1064,48 +1687,267 @@ class FractalisticApp(App[list[LogObj]]):
         if not self.ready:
             return
 
-        self.ready = False
+        self.update_precision()
+
+        # The views requested during a render cancel it, and are merged in a single render of the latest one
+        with self.render_version_lock:
+            self.render_version += 1
+            if not self.canvas_idle.is_set():
+                return
+            self.canvas_idle.clear()
+
         asyncio.get_event_loop().run_in_executor(None, self.update_canv_)
 
+    def update_precision(self) -> None:
+        """Adjust the numeric precision to the zoom level of the view about to be rendered if the automatic
+        precision is on, else warn when it is too low. Log when the engine used to render the view changes."""
+        needed = get_auto_precision(self.render_settings, self.settings.canv_size)
+
+        if self.settings.auto_precision:
+            if needed != self.precision:
+                self.precision = needed
+                self.log_info(f"Numeric precision set to [acc]{needed}[/] bits for the current zoom level")
+        elif self.precision < needed:
+            if not self.precision_warning:
+                self.precision_warning = True
+                self.log_warning(
+                    f"The numeric precision is too low for this zoom level, at least [acc]{needed}[/] bits are "
+                    "needed. Use [acc]auto_precision on[/] or the [acc]precision[/] command."
+                )
+        else:
+            self.precision_warning = False
+
+        engine_name = get_engine_name(self.render_settings, self.settings.canv_size, self.render_pool.demoted_engines)
+        if self.engine_name is not None and engine_name != self.engine_name:
+            self.log_info(f"Now rendering with the [acc]{engine_name}[/] engine")
+        self.engine_name = engine_name
+
     def update_canv_(self) -> None:
+        """Render the canvas until it shows the latest requested view"""
+        while True:
+            version = self.render_version
+            self.render_canv(version)
+
+            with self.render_version_lock:
+                if self.render_version == version:
+                    self.canvas_idle.set()
+                    return
+
+    def render_canv(self, version: int) -> None:
+        """Render the canvas, the render stops as soon as the render version is not `version` anymore"""
         self.renders += 1
         start = monotonic()
 
-        # Used to get the average divergence of the current render
-        divergence_sum = 0
-        term_count = 0
+        def cancelled() -> bool:
+            return self.render_version != version
+
+        # The settings can be changed by commands during the render
+        render_settings = deepcopy(self.render_settings)
+        palette = self.get_palette(render_settings)
+        size = self.settings.canv_size
+        frame = self.render_pool.get_frame(size).array
+        regions = [Tile(0, size.y, 0, size.x)]
+        skipped_iterations = 0
+        rendered_pixels = 0
+        metrics = FrameMetrics(
+            fractals.fractal_list[render_settings.fractal_index].__name__,
+            get_engine_name(render_settings, size, self.render_pool.demoted_engines),
+            render_settings.max_iter,
+            self.render_pool.wanted_processes,
+            size.x * size.y,
+        )
 
         with self.batch_update():
-            for line in self.get_divergence_matrix():
-                # If none is returned, most likely the program is exiting
-                if line is None:
-                    return
+            # Only render the parts of the frame that were not visible in the last one
+            reused = self.reuse_last_frame(frame, render_settings, size)
+            if reused is not None:
+                self.paint_tile(reused, frame[reused.slices], palette, metrics)
+                regions = get_exposed_regions(reused, size)
+
+            # Then copy the tiles of the exposed regions that were already rendered by a previous render
+            grid = None
+            cached_pixels = 0
+            cached_tiles: list[Tile] = []
+            self.cache_hit_rate = None
+            if self.settings.tile_cache:
+                grid = CacheGrid(render_settings, size)
+                for region in regions:
+                    frame[region.slices] = UNRENDERED
+
+                cached_tiles, lookups, hits = self.tile_cache.load(frame, grid, regions)
+                for tile in cached_tiles:
+                    self.paint_tile(tile, frame[tile.slices], palette, metrics)
+                    cached_pixels += tile.pixel_count
+                if lookups > 0:
+                    self.cache_hit_rate = hits / lookups
+
+        pixels = sum(region.pixel_count for region in regions)
+        latency = self.settings.render_latency / 1000
+        notices = self.get_divergence_matrix(
+            size=size,
+            regions=regions,
+            start_step=self.get_progressive_start_step(pixels - cached_pixels),
+            skip_rendered=cached_pixels > 0,
+            render_settings=render_settings,
+            cancelled=cancelled,
+        )
 
-                for x, divergence in enumerate(line.values):
-                    # If there is a marker and the current x and y corresponds the its position
-                    # make the pixel red and go to the next pixel
-                    if (
-                        self.settings.marker_pos is not None
-                        and x == self.settings.marker_pos.x
-                        and line.y == self.settings.marker_pos.y
-                    ):
-                        self.canv.set_pixel(x, line.y, Color.parse("red"))
+        while True:
+            # The canvas is only refreshed at the end of a batch update,
+            # so end it regularly to never leave the canvas stale for longer than the latency
+            with self.batch_update():
+                refresh_at = monotonic() + latency if latency > 0 else float("inf")
+                for notice, values in notices:
+                    # The canvas may already have been replaced, the generator stops at the next notice
+                    if cancelled():
                         continue
 
-                    if divergence != -1:
-                        divergence_sum += divergence
-                        term_count += 1
+                    skipped_iterations += notice.skipped_iterations
+                    # Coarse tiles are refined later, only the final tiles count towards the rendered pixels
+                    if notice.tile.step == 1:
+                        rendered_pixels += notice.tile.pixel_count
+                    self.paint_tile(notice.tile, values, palette, metrics)
+
+                    if monotonic() > refresh_at:
+                        break
+                else:
+                    break
+
+        # The render can be cancelled, or interrupted when the program is exiting,
+        # the last complete frame is then kept to be reused by the next render
+        if rendered_pixels != pixels:
+            return
 
-                    # Get a color from the result
-                    color = Color.parse("black") if divergence == -1 else self.selected_color(divergence)
-                    self.canv.set_pixel(x, line.y, color)
+        self.last_frame = frame.copy()
+        self.last_frame_settings = render_settings
+        if grid is not None:
+            self.tile_cache.save(frame, grid)
 
-        self.average_divergence = divergence_sum / term_count if term_count > 0 else 0
-        self.current_zoom_level = f"{4 / (self.render_settings.cell_size * self.settings.canv_size.x):.4e}"
+        escaped = frame[frame != -1]
+        self.average_divergence = float(escaped.mean()) if escaped.size > 0 else 0
+        self.skipped_iterations = skipped_iterations
+        self.current_zoom_level = f"{4 / (render_settings.cell_size * size.x):.4e}"
         self.last_render_time = monotonic() - start
+        if pixels > 0:
+            self.render_speed = pixels / self.last_render_time
 
         self.update_border_info()
-        self.ready = True
+        self.add_metrics(metrics, frame, regions, cached_tiles, start)
+        if self.settings.cross_check_samples > 0 and not render_settings.subdivision:
+            self.cross_check(frame, render_settings, size)
+
+    def cross_check(self, frame: np.ndarray, render_settings: RenderSettings, size: Vec[int]) -> None:
+        """Compare some random pixels of a complete frame with the reference engine,
+        and stop using the engine that rendered it if too many of them disagree"""
+        engine = select_engine(render_settings, size, self.render_pool.demoted_engines)
+        if engine is REFERENCE_ENGINE:
+            return
+
+        mismatches = cross_check(frame, engine.name, render_settings, size, self.settings.cross_check_samples, self.rng)
+        self.cross_check_mismatches = mismatches
+        if mismatches <= CROSS_CHECK_MAX_MISMATCHES:
+            return
+
+        self.render_pool.demoted_engines.add(engine.name)
+        # The frames and tiles rendered by the engine can't be trusted either
+        self.last_frame = None
+        self.tile_cache.clear()
+        self.call_after_refresh(
+            self.log_warning,
+            f"[acc]{mismatches:.0%}[/] of the cross-checked pixels disagree with the [acc]{REFERENCE_ENGINE.name}[/] "
+            f"engine, the [acc]{engine.name}[/] engine is not used anymore. Use [acc]engine reset[/] to use it again.",
+        )
+        self.call_after_refresh(self.update_canv)
+
+    def add_metrics(
+        self, metrics: FrameMetrics, frame: np.ndarray, regions: list[Tile], cached: list[Tile], start: float
+    ) -> None:
+        """Complete the measures of a canvas render that rendered the given regions of the frame,
+        except the given cached tiles, and add them to the history"""
+        for region in regions:
+            iterations, max_iter_pixels = get_iteration_counts(frame[region.slices], metrics.max_iter)
+            metrics.iterations += iterations
+            metrics.max_iter_pixels += max_iter_pixels
+            metrics.rendered_pixels += region.pixel_count
+
+        for tile in cached:
+            iterations, max_iter_pixels = get_iteration_counts(frame[tile.slices], metrics.max_iter)
+            metrics.iterations -= iterations
+            metrics.max_iter_pixels -= max_iter_pixels
+            metrics.rendered_pixels -= tile.pixel_count
+
+        metrics.timestamp = time()
+        metrics.render_time = monotonic() - start
+        metrics.processes = self.render_pool.render_processes
+        metrics.compute_time = self.render_pool.busy_time
+        metrics.utilisation = self.render_pool.utilisation
+        metrics.ipc_wait = max(0, self.render_pool.render_duration - max(metrics.compute_time, default=0))
+
+        try:
+            self.metrics.add(metrics, self.settings.metrics_file)
+        except OSError as error:
+            self.settings.metrics_file = None
+            self.call_after_refresh(self.log_error, f"Cannot write the render metrics: {error}")
+
+    def reuse_last_frame(self, frame: np.ndarray, render_settings: RenderSettings, size: Vec[int]) -> Tile | None:
+        """Copy the pixels of the last frame that are still visible to their new position in the frame buffer,
+        and return the tile they were copied to, or None if the last frame cannot be reused"""
+        if self.last_frame is None or self.last_frame_settings is None:
+            return None
+
+        previous_size = Vec(self.last_frame.shape[1], self.last_frame.shape[0])
+        shift = get_frame_shift(self.last_frame_settings, previous_size, render_settings, size)
+        if shift is None:
+            return None
+
+        overlap = get_frame_overlap(shift, previous_size, size)
+        if overlap is None:
+            return None
+
+        tile, previous_tile = overlap
+        frame[tile.slices] = self.last_frame[previous_tile.slices]
+        return tile
+
+    def get_progressive_start_step(self, pixels: int) -> int:
+        """Returns the spacing between the pixels of the first pass of a render of the given number of pixels,
+        so that it is expected to be shown within the render latency, given the speed of the last render.
+        Returns 1 if the whole render is expected to fit in it."""
+        if self.settings.render_latency == 0:
+            return 1
+        if self.render_speed == 0:
+            return PROGRESSIVE_FIRST_STEP
+
+        budget = self.render_speed * self.settings.render_latency / 1000
+        step = 1
+        while step < PROGRESSIVE_MAX_STEP and pixels / step**2 > budget:
+            step *= 2
+
+        return step
+
+    def paint_tile(
+        self, tile: Tile, values: np.ndarray, palette: np.ndarray, metrics: FrameMetrics | None = None
+    ) -> None:
+        """Draw the iteration counts of a tile of the canvas, using a palette from get_palette().
+        Each pixel of a coarse tile is drawn as a block covering the pixels up to the next one.
+        The time spent coloring and painting is added to the metrics if given."""
+        started = monotonic()
+        if tile.step > 1:
+            values = np.repeat(np.repeat(values, tile.step, 0), tile.step, 1)
+            values = values[: tile.y_stop - tile.y_start, : tile.x_stop - tile.x_start]
+
+        pixels = colors.colorize(values, palette)
+        colored = monotonic()
+
+        # The marker stays red
+        marker = self.settings.marker_pos
+        if marker is not None and tile.y_start <= marker.y < tile.y_stop and tile.x_start <= marker.x < tile.x_stop:
+            pixels[marker.y - tile.y_start, marker.x - tile.x_start] = Color.parse("red").rgb
+
+        self.canv.set_pixels_array(tile.x_start, tile.y_start, pixels)
+
+        if metrics is not None:
+            metrics.color_time += colored - started
+            metrics.paint_time += monotonic() - colored
 
     def update_border_info(self) -> None:
         self.canv.border_title = (
@@ -1118,6 +1960,15 @@ class FractalisticApp(App[list[LogObj]]):
             f"Zoom: {self.current_zoom_level} | " f"{self.last_render_time:.4f}s | {self.render_settings.max_iter} iter"
         )
 
+        if self.engine_name is not None:
+            self.canv.border_subtitle += f" | {self.engine_name}"
+
+        if self.skipped_iterations > 0:
+            self.canv.border_subtitle += f" | {self.skipped_iterations:.2e} skipped"
+
+        if self.cache_hit_rate is not None:
+            self.canv.border_subtitle += f" | {self.cache_hit_rate:.0%} cached"
+
     # ---------- TEXTUAL APP METHODS
 
     @on(FractalCanv.CanvClick)
@@ -1194,6 +2045,9 @@ class FractalisticApp(App[list[LogObj]]):
         # Just so that pyright doesn't complain about log() being unused
         log("Hellooo <3")
 
+        # Start the render processes while the interface is being mounted
+        asyncio.get_event_loop().run_in_executor(None, self.render_pool.start, self.pool_size)
+
         self.set_command_list()
 
         # Mount the log panel and the command input in the right container
@@ -1215,6 +2069,7 @@ class FractalisticApp(App[list[LogObj]]):
         self.precision = self.render_settings.wanted_numeric_precision
         self.set_canv_size()
 
+        self.canvas_idle.set()
         self.ready = True
         self.reset_position()
 
@@ -1246,6 +2101,11 @@ class FractalisticApp(App[list[LogObj]]):
         self.call_after_refresh(self.after_resize)
 
     async def after_resize(self) -> None:
+        # The canvas is hidden during a screenshot, and must not be rendered since the screenshot uses the same
+        # render pool. The screenshot sends a resize event when it is finished.
+        if self.screenshot_running:
+            return
+
         self.set_canv_size()
         self.ready = True
         await self.update_canvas_size()
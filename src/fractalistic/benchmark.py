@@ -0,0 +1,264 @@
+"""Benchmark of the render engines over canonical scenes, to catch performance regressions:
+
+    fractalistic-benchmark --output results.json
+    fractalistic-benchmark --baseline results.json
+
+Each scene is rendered at several max_iter and precision values with the render pool, the best of a few runs
+is kept. The results are written as JSON, and compared with a baseline written by a previous run:
+the command fails if a case got slower than the baseline by more than the tolerance.
+"""
+
+import json
+import os
+import pickle
+import platform
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+from click_extra import STRING, FloatRange, IntRange, extra_command, option
+from gmpy2 import mpc  # type: ignore
+from rich.console import Console
+from rich.table import Table
+from textual.color import Color
+
+from . import __version__, colors
+from .engines import get_engine_name
+from .fractal_canv import FractalCanv
+from .fractals import fractal_list
+from .fractals.fractal_base import get_kernel_name
+from .renderer import Renderer, get_render_settings
+from .settings import RenderSettings, StateInfo
+from .theme import rich_theme
+from .utils import SRC_DIR
+from .vec import Vec
+
+COOL_LOCATION = os.path.join(SRC_DIR, os.pardir, os.pardir, "cool_locations", "1.fc")
+"""State file of a view that is rendered with each fractal, only available in the repository"""
+
+
+class Scene:
+    """A view rendered by the benchmark, at max_iter and 4 * max_iter, and at each precision"""
+
+    name: str
+    settings: dict[str, object]
+    """Render settings of the view, the cell size is given for a frame 1 pixel wide"""
+
+    precisions: tuple[int, ...]
+
+    def __init__(self, name: str, settings: dict[str, object], precisions: tuple[int, ...] = (64,)) -> None:
+        self.name = name
+        self.settings = settings
+        self.precisions = precisions
+
+
+SCENES = [
+    Scene("full_view", {"cell_size": 4, "max_iter": 128}),
+    Scene("seahorse_valley", {"screen_pos_on_plane": "(-0.75+0.1j)", "cell_size": 0.1, "max_iter": 256}),
+    # Mostly inside of the main cardioid and bulb, where the points are iterated until max_iter
+    Scene("interior", {"screen_pos_on_plane": "(-0.4+0j)", "cell_size": 1.2, "max_iter": 256}),
+    Scene(
+        "deep_zoom",
+        {
+            "screen_pos_on_plane": "(-0.743643887037158704752191506114774+0.131825904205311970493132056385139j)",
+            "cell_size": "1e-20",
+            "max_iter": 1000,
+        },
+        (128, 256),
+    ),
+    # The kernels used for exponents other than 2, see fractal_base.get_power()
+    Scene("exponent_3", {"cell_size": 3, "max_iter": 128, "mandelbrot_exponent": 3}),
+    Scene("exponent_2.5", {"cell_size": 3, "max_iter": 128, "mandelbrot_exponent": 2.5}),
+    Scene("complex_exponent", {"cell_size": 3, "max_iter": 128, "mandelbrot_exponent": mpc(2, 0.1)}),
+]
+
+
+def get_cool_location_scenes() -> list[Scene]:
+    """Returns a scene per fractal showing the view of COOL_LOCATION, if it exists"""
+    if not os.path.exists(COOL_LOCATION):
+        return []
+
+    with open(COOL_LOCATION, "rb") as f:
+        state_info: StateInfo = pickle.load(f)
+
+    render_settings = state_info.render_settings
+    settings = {
+        "screen_pos_on_plane": render_settings.screen_pos_on_plane,
+        # The cell size of the state is for the width of the canvas it was saved from
+        "cell_size": render_settings.cell_size * (state_info.canvas_width or 1),
+        "max_iter": render_settings.max_iter,
+    }
+    return [
+        Scene(f"cool_location_{fractal.__name__.lower()}", {**settings, "fractal_index": i})
+        for i, fractal in enumerate(fractal_list)
+    ]
+
+
+def get_cases(scenes: list[Scene], size: Vec[int]) -> list[tuple[str, RenderSettings]]:
+    """Returns the name and render settings of every case of the benchmark"""
+    cases = []
+    for scene in scenes:
+        for precision in scene.precisions:
+            for factor in (1, 4):
+                render_settings = get_render_settings(None, size, {"wanted_numeric_precision": precision})
+                render_settings = get_render_settings(render_settings, size, scene.settings)
+                render_settings.cell_size /= size.x
+                render_settings.max_iter *= factor
+                name = f"{scene.name}/max_iter={render_settings.max_iter}/precision={precision}"
+                cases.append((name, render_settings))
+
+    return cases
+
+
+def get_paint_time(pixels: np.ndarray) -> float:
+    """Returns the time taken to draw colored pixels on a canvas, and build the lines shown in the terminal"""
+    canvas = FractalCanv(pixels.shape[1], pixels.shape[0], Color(0, 0, 0))
+    started = perf_counter()
+    canvas.set_pixels_array(0, 0, pixels)
+    for line in range(len(canvas.strips)):
+        canvas.build_strip(line)
+    return perf_counter() - started
+
+
+def run_case(renderer: Renderer, size: Vec[int], render_settings: RenderSettings, repeat: int) -> dict[str, object]:
+    """Render a case `repeat` times and return the measures of the fastest run"""
+    best = None
+    utilisation: list[float] = []
+    for _ in range(repeat):
+        result = renderer.render(size, render_settings)
+        if best is None or result.render_time < best.render_time:
+            best = result
+            utilisation = renderer.render_pool.utilisation
+
+    if best is None:
+        raise ValueError("The benchmark must be repeated at least once")
+
+    started = perf_counter()
+    color_renderer = colors.color_renderers[render_settings.color_renderer_index]
+    pixels = colors.colorize(best.iterations, colors.get_palette(color_renderer, render_settings.max_iter))
+    color_time = perf_counter() - started
+
+    pixel_count = size.x * size.y
+    # The points that don't diverge are counted as max_iter iterations, even if they were classified earlier
+    iterations = int(np.where(best.iterations >= 0, best.iterations, render_settings.max_iter).sum(dtype=np.int64))
+    busy = float(np.mean(utilisation)) if utilisation else 1
+
+    fractal = fractal_list[render_settings.fractal_index]
+    return {
+        "fractal": fractal.__name__,
+        "engine": get_engine_name(render_settings, size),
+        "kernel": get_kernel_name(fractal.get_exponent(render_settings)),
+        "max_iter": render_settings.max_iter,
+        "precision": render_settings.wanted_numeric_precision,
+        "pixels": pixel_count,
+        "render_time": best.render_time,
+        "pixels_per_second": pixel_count / best.render_time,
+        "iterations": iterations,
+        "iterations_per_second": iterations / best.render_time,
+        "skipped_iterations": best.skipped_iterations,
+        # Part of the render during which the processes were not computing pixels: waiting for tiles,
+        # loading the render context, sending notices, and preparing the frame in the main process
+        "ipc_overhead": best.render_time * (1 - busy),
+        "utilisation": utilisation,
+        "color_time": color_time,
+        "paint_time": get_paint_time(pixels),
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]) -> list[tuple[str, float]]:
+    """Returns the speed of each case relative to the baseline, for the cases that are in both"""
+    return [
+        (name, result["pixels_per_second"] / baseline[name]["pixels_per_second"])
+        for name, result in results.items()
+        if name in baseline
+    ]
+
+
+@extra_command(params=[])
+@option("-o", "--output", help="Write the results to this JSON file.", type=STRING)
+@option("-b", "--baseline", help="Compare the results with a JSON file written by a previous run.", type=STRING)
+@option(
+    "-t",
+    "--tolerance",
+    help="Fail if a case is slower than the baseline by more than this fraction.",
+    type=FloatRange(0),
+    default=0.1,
+)
+@option("-s", "--size", nargs=2, help="Width and height of the frames.", type=IntRange(16), default=(320, 240))
+@option("-p", "--processes", help="Number of render processes.", type=IntRange(1), default=os.cpu_count() or 1)
+@option("-r", "--repeat", help="Number of runs of each case, the fastest is kept.", type=IntRange(1), default=3)
+@option("--scene", help="Only run the scenes whose name contains this text.", type=STRING, multiple=True)
+def main(
+    output: str | None,
+    baseline: str | None,
+    tolerance: float,
+    size: tuple[int, int],
+    processes: int,
+    repeat: int,
+    scene: tuple[str, ...],
+) -> None:
+    console = Console(theme=rich_theme)
+    frame_size = Vec(size[0], size[1])
+
+    scenes = SCENES + get_cool_location_scenes()
+    if len(scene) > 0:
+        scenes = [s for s in scenes if any(text in s.name for text in scene)]
+
+    baseline_results = {}
+    if baseline is not None:
+        with open(baseline) as f:
+            baseline_results = json.load(f)["results"]
+
+    results: dict[str, dict] = {}
+    with Renderer(processes) as renderer:
+        # Start the render processes and import the engines before measuring anything
+        run_case(renderer, Vec(16, 16), get_cases(SCENES[:1], Vec(16, 16))[0][1], 1)
+        for name, render_settings in get_cases(scenes, frame_size):
+            console.print(f"Running [acc]{name}[/]...")
+            results[name] = run_case(renderer, frame_size, render_settings, repeat)
+
+    table = Table("Case", "Engine", "Kernel", "Mpx/s", "Miter/s", "IPC overhead", "Color", "Paint", "vs baseline")
+    speeds = dict(compare(results, baseline_results))
+    for name, result in results.items():
+        speed = speeds.get(name)
+        speed_text = "" if speed is None else f"[{'red' if speed < 1 - tolerance else 'green'}]{speed:.0%}"
+        table.add_row(
+            name,
+            result["engine"],
+            result["kernel"],
+            f"{result['pixels_per_second'] / 1e6:.2f}",
+            f"{result['iterations_per_second'] / 1e6:.1f}",
+            f"{result['ipc_overhead'] * 1000:.0f}ms",
+            f"{result['color_time'] * 1000:.1f}ms",
+            f"{result['paint_time'] * 1000:.0f}ms",
+            speed_text,
+        )
+    console.print(table)
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(
+                {
+                    "version": __version__,
+                    "date": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count(),
+                    "processes": processes,
+                    "size": [frame_size.x, frame_size.y],
+                    "repeat": repeat,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        console.print(f"Results written to [acc]{output}")
+
+    regressions = [name for name, speed in speeds.items() if speed < 1 - tolerance]
+    if regressions:
+        console.print(f"[red]{len(regressions)} cases are slower than the baseline: {', '.join(regressions)}")
+        quit(1)
+
+
+if __name__ == "__main__":
+    main()  # type: ignore
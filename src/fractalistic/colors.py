@@ -1,6 +1,12 @@
-from typing import Callable
+from colorsys import hls_to_rgb
+from functools import lru_cache
+from typing import Callable, TypeAlias
 
-from textual.color import Color
+import numpy as np
+
+Color: TypeAlias = tuple[int, int, int]
+"""Red, green and blue components of a color, from 0 to 255.
+Plain tuples are used so that rendering doesn't depend on the terminal user interface."""
 
 
 def get_intensity(i: int) -> int:
@@ -10,22 +16,22 @@ def get_intensity(i: int) -> int:
 # These colors are picked from UF6
 # https://www.ultrafractal.com/
 BLUE_BROWN = [
-    Color(12, 4, 50),
-    Color(7, 7, 76),
-    Color(3, 10, 103),
-    Color(15, 47, 141),
-    Color(27, 85, 180),
-    Color(60, 128, 212),
-    Color(137, 184, 232),
-    Color(214, 239, 251),
-    Color(244, 236, 194),
-    Color(251, 204, 97),
-    Color(255, 173, 3),
-    Color(207, 131, 3),
-    Color(156, 90, 3),
-    Color(109, 55, 6),
-    Color(69, 33, 19),
-    Color(28, 10, 29),
+    (12, 4, 50),
+    (7, 7, 76),
+    (3, 10, 103),
+    (15, 47, 141),
+    (27, 85, 180),
+    (60, 128, 212),
+    (137, 184, 232),
+    (214, 239, 251),
+    (244, 236, 194),
+    (251, 204, 97),
+    (255, 173, 3),
+    (207, 131, 3),
+    (156, 90, 3),
+    (109, 55, 6),
+    (69, 33, 19),
+    (28, 10, 29),
 ]
 
 
@@ -33,47 +39,69 @@ def blue_brown(i: int) -> Color:
     return BLUE_BROWN[i % len(BLUE_BROWN)]
 
 
+def from_hsl(h: float, s: float, lightness: float) -> Color:
+    r, g, b = hls_to_rgb(h, lightness, s)
+    return (int(r * 255 + 0.5), int(g * 255 + 0.5), int(b * 255 + 0.5))
+
+
 def hsl_wheel(i: int) -> Color:
-    return Color.from_hsl((0.0 + i / 80) % 1, 1, 0.4)
+    return from_hsl((0.0 + i / 80) % 1, 1, 0.4)
 
 
 def blue(i: int) -> Color:
-    return Color(0, 0, get_intensity(i))
+    return (0, 0, get_intensity(i))
 
 
 def green(i: int) -> Color:
-    return Color(0, get_intensity(i), 0)
+    return (0, get_intensity(i), 0)
 
 
 def emerald(i: int) -> Color:
     intensity = get_intensity(i)
-    return Color(0, intensity, intensity)
+    return (0, intensity, intensity)
 
 
 def red(i: int) -> Color:
-    return Color(get_intensity(i), 0, 0)
+    return (get_intensity(i), 0, 0)
 
 
 def violet(i: int) -> Color:
     intensity = get_intensity(i)
-    return Color(intensity, 0, intensity)
+    return (intensity, 0, intensity)
 
 
 def yellow(i: int) -> Color:
     intensity = get_intensity(i)
-    return Color(intensity, intensity, 0)
+    return (intensity, intensity, 0)
 
 
 def gray(i: int) -> Color:
     intensity = get_intensity(i)
-    return Color(intensity, intensity, intensity)
+    return (intensity, intensity, intensity)
 
 
 def black_and_white(_: int) -> Color:
-    return Color(255, 255, 255)
+    return (255, 255, 255)
 
 
 basic_colors = [blue, green, emerald, red, violet, yellow, gray]
 
 # Every color function should be referenced here
 color_renderers: list[Callable] = [blue_brown, hsl_wheel, *basic_colors, black_and_white]
+
+
+@lru_cache(maxsize=8)
+def get_palette(color_renderer: Callable, max_iter: int) -> np.ndarray:
+    """Returns the colors of the iteration counts from 0 to max_iter - 1 as an uint8 RGB array of shape
+    (max_iter + 1, 3), the color renderer is only called once per iteration count.
+    The last color is black, so that indexing the palette with -1, the iteration count of the points
+    that don't diverge, gives black."""
+    palette = np.zeros((max_iter + 1, 3), dtype=np.uint8)
+    palette[:max_iter] = [color_renderer(i) for i in range(max_iter)]
+
+    return palette
+
+
+def colorize(values: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Returns the uint8 RGB array of the colors of an array of iteration counts, using a palette from get_palette()"""
+    return palette[values]
@@ -0,0 +1,496 @@
+"""Rendering of screenshots split between several hosts.
+
+A render node is a fractalistic process started with `--worker ADDRESS`, that listens on a TCP address (host:port)
+or a Unix socket (a path), and renders the tiles it receives with its own render pool:
+
+    fractalistic --worker 0.0.0.0:7340 -st 16
+    fractalistic --node render1:7340 --node render2:7340
+
+The app sends the tiles of screenshots to the nodes of a NodeCluster, through RenderPool.render(), instead of its
+own processes. Each node is sent the render context of a frame once, then one tile at a time, with a few tiles
+in flight so that it doesn't wait for the network between them. It splits each tile between its processes, and
+sends back the iteration counts, which are written into the frame buffer of the app as if they were rendered locally.
+
+The tiles of a node that is lost (closed connection, error, or no answer for NODE_TIMEOUT seconds) are sent again to
+the other nodes, and the tiles left when no node is connected anymore are rendered by the processes of the app.
+
+Messages are pickled, and the connections authenticated with the key of the FRACTALISTIC_AUTHKEY environment
+variable: anyone who has the key can run code on the nodes. A node started without it generates a random key and
+prints it, to be set in the environment of the app. Unix sockets can only be opened by their owner.
+"""
+
+import os
+import secrets
+import signal
+import socket
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener, answer_challenge, deliver_challenge
+from queue import Empty, SimpleQueue
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable, Generator
+
+import numpy as np
+
+from . import jit
+from .render_notices import RenderedTile
+from .render_pool import QUEUE_POLL_INTERVAL, RenderContext, RenderPool, get_tiles
+from .tile import Tile
+
+AUTHKEY_BYTES = 16
+"""Number of random bytes of the key generated by a node when FRACTALISTIC_AUTHKEY is not set"""
+
+CONNECT_TIMEOUT = 3
+"""How long, in seconds, connecting to a node is waited for"""
+
+NODE_TIMEOUT = 60
+"""Time, in seconds, after which a node that doesn't send back any tile is considered lost"""
+
+NODE_RETRY_INTERVAL = 30
+"""Time, in seconds, before connecting again to a node that was lost"""
+
+JOBS_IN_FLIGHT = 2
+"""Number of tiles sent to a node before waiting for the first one, so that it never waits for the network"""
+
+
+def get_authkey() -> bytes | None:
+    """Returns the key of the FRACTALISTIC_AUTHKEY environment variable, None if it isn't set"""
+    return os.environ.get("FRACTALISTIC_AUTHKEY", "").encode() or None
+
+
+def parse_address(address: str) -> tuple[str, int] | str:
+    """Returns the (host, port) of a TCP address, or the path of a Unix socket if the address contains a slash"""
+    if "/" in address:
+        return address
+
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise ValueError(f"'{address}' is neither host:port nor the path of a Unix socket")
+    return host or "127.0.0.1", int(port)
+
+
+class NodeInfo:
+    """Message sent by a node when a connection is opened"""
+
+    processes: int
+    """Number of render processes of the node"""
+
+    jit: bool
+    """Whether the node can render with the compiled loops, see jit.py"""
+
+    def __init__(self, processes: int, jit: bool) -> None:
+        self.processes = processes
+        self.jit = jit
+
+
+class TileJob:
+    """Tile sent to a node, with the render context of its frame if the node didn't receive it yet"""
+
+    context_id: int
+    context: RenderContext | None
+    tile: Tile
+
+    def __init__(self, context_id: int, context: RenderContext | None, tile: Tile) -> None:
+        self.context_id = context_id
+        self.context = context
+        self.tile = tile
+
+
+class TileResult:
+    """Iteration counts of a tile, sent back by a node"""
+
+    values: np.ndarray
+    skipped_iterations: int
+
+    busy_time: float
+    """Time, in seconds, the processes of the node spent rendering the tile"""
+
+    def __init__(self, values: np.ndarray, skipped_iterations: int, busy_time: float) -> None:
+        self.values = values
+        self.skipped_iterations = skipped_iterations
+        self.busy_time = busy_time
+
+
+class TileError:
+    """Sent back by a node instead of a TileResult when rendering the tile failed"""
+
+    message: str
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+class NodeLostError(Exception):
+    pass
+
+
+# ---------- NODE SIDE
+
+
+def render_job(render_pool: RenderPool, context: RenderContext, tile: Tile, processes: int) -> TileResult:
+    """Render a tile split between the processes of the render pool"""
+    started = monotonic()
+    skipped_iterations = 0
+    rendered_pixels = 0
+    try:
+        for notice in render_pool.render(context, get_tiles([tile], processes), lambda: False):
+            skipped_iterations += notice.skipped_iterations
+            rendered_pixels += notice.tile.pixel_count
+
+        # The render stops early when the processes are terminated
+        if rendered_pixels != tile.pixel_count:
+            raise RuntimeError("The render processes were stopped")
+        values = render_pool.get_frame(context.buffer_size).array[tile.slices].copy()
+    finally:
+        # Each frame buffer is only used by one tile, it must not be left behind when the node is stopped
+        render_pool.release_frame()
+
+    return TileResult(values, skipped_iterations, sum(render_pool.busy_time) or monotonic() - started)
+
+
+def serve_connection(
+    connection: Connection, authkey: bytes, render_pool: RenderPool, lock: Lock, processes: int
+) -> None:
+    """Render the tiles received on a connection until it is closed. The render pool renders one tile at a time.
+    The connection is authenticated here rather than by the listener, so that a slow client doesn't block the others."""
+    contexts: dict[int, RenderContext] = {}
+    try:
+        deliver_challenge(connection, authkey)
+        answer_challenge(connection, authkey)
+        connection.send(NodeInfo(processes, jit.JIT_AVAILABLE))
+        while True:
+            job: TileJob = connection.recv()
+            if job.context is not None:
+                # The coordinator only renders one frame at a time
+                contexts = {job.context_id: job.context}
+
+            context = contexts.get(job.context_id)
+            if context is None:
+                connection.send(TileError(f"Unknown render context {job.context_id}"))
+                continue
+
+            try:
+                with lock:
+                    result: TileResult | TileError = render_job(render_pool, context, job.tile, processes)
+            except Exception as e:
+                result = TileError(f"{type(e).__name__}: {e}")
+            connection.send(result)
+    except (EOFError, OSError, AuthenticationError):
+        pass
+    finally:
+        connection.close()
+
+
+def serve(address: str, processes: int, log: Callable[[str], None] = print) -> None:
+    """Listen for connections on the given address and render the tiles they send, until interrupted.
+    Must be called from the main thread, SIGTERM interrupts it like Ctrl+C so that the shared memory blocks
+    and the socket file are cleaned up."""
+    parsed_address = parse_address(address)
+    authkey = get_authkey()
+    if authkey is None:
+        key = secrets.token_hex(AUTHKEY_BYTES)
+        authkey = key.encode()
+        log("FRACTALISTIC_AUTHKEY is not set, the app must be started with the generated key:")
+        log(f"FRACTALISTIC_AUTHKEY={key}")
+
+    render_pool = RenderPool()
+    render_pool.start(processes)
+    lock = Lock()
+    # Set after starting the processes, which are stopped with SIGTERM
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    try:
+        # The socket file of a Unix socket is created without permissions for the group and the others
+        umask = os.umask(0o177) if isinstance(parsed_address, str) else None
+        try:
+            listener = Listener(parsed_address)
+        finally:
+            if umask is not None:
+                os.umask(umask)
+
+        with listener:
+            log(f"Render node listening on {address} with {processes} processes")
+            while True:
+                try:
+                    connection = listener.accept()
+                except OSError as e:
+                    log(f"Cannot accept a connection: {e}")
+                    continue
+
+                log(f"Connection from {listener.last_accepted or 'a local process'}")
+                Thread(
+                    target=serve_connection, args=(connection, authkey, render_pool, lock, processes), daemon=True
+                ).start()
+    finally:
+        render_pool.terminate()
+        # The tile being rendered stops once the processes are terminated, and releases its shared memory blocks
+        if lock.acquire(timeout=CONNECT_TIMEOUT):
+            lock.release()
+        render_pool.release_frame()
+
+
+# ---------- APP SIDE
+
+
+def connect(address: str, authkey: bytes) -> Connection:
+    """Opens an authenticated connection to a node, like multiprocessing.connection.Client() with a timeout"""
+    parsed_address = parse_address(address)
+    sock = socket.socket(socket.AF_UNIX if isinstance(parsed_address, str) else socket.AF_INET)
+
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(parsed_address)
+        sock.settimeout(None)
+    except OSError:
+        sock.close()
+        raise
+
+    connection = Connection(sock.detach())
+    try:
+        answer_challenge(connection, authkey)
+        deliver_challenge(connection, authkey)
+    except Exception:
+        connection.close()
+        raise
+    return connection
+
+
+class RenderNode:
+    """Connection to a render node, and measures of the tiles it rendered since the last reset_stats()"""
+
+    address: str
+    connection: Connection | None = None
+
+    info: NodeInfo | None = None
+    """Sent by the node when connecting"""
+
+    context_id: int = 0
+    """Id of the last render context sent to the node"""
+
+    lost_at: float | None = None
+    """When the node was lost, it is not connected again for NODE_RETRY_INTERVAL seconds"""
+
+    error: str | None = None
+    """Why the node was lost"""
+
+    tiles: int = 0
+    pixels: int = 0
+
+    busy_time: float = 0
+    """Time, in seconds, the processes of the node spent rendering"""
+
+    wait_time: float = 0
+    """Time, in seconds, between sending tiles to the node and receiving them, while it was sent tiles"""
+
+    failures: int = 0
+    """Number of times the node was lost"""
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+
+    @property
+    def processes(self) -> int:
+        return 0 if self.info is None else self.info.processes
+
+    @property
+    def pixels_per_second(self) -> float:
+        return self.pixels / self.wait_time if self.wait_time > 0 else 0
+
+    def connect(self, authkey: bytes | None) -> bool:
+        """Connect to the node if it isn't connected, returns whether it is connected"""
+        if self.connection is not None:
+            return True
+        if self.lost_at is not None and monotonic() - self.lost_at < NODE_RETRY_INTERVAL:
+            return False
+        if authkey is None:
+            self.lose("FRACTALISTIC_AUTHKEY is not set, it must be the key of the node")
+            return False
+
+        try:
+            connection = connect(self.address, authkey)
+            if not connection.poll(CONNECT_TIMEOUT):
+                connection.close()
+                raise TimeoutError("The node didn't answer")
+            self.info = connection.recv()
+        except Exception as e:
+            self.lose(f"{type(e).__name__}: {e}")
+            return False
+
+        self.connection = connection
+        self.context_id = 0
+        self.lost_at = None
+        self.error = None
+        return True
+
+    def disconnect(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def lose(self, error: str) -> None:
+        self.disconnect()
+        self.lost_at = monotonic()
+        self.error = error
+        self.failures += 1
+
+    def reset_stats(self) -> None:
+        self.tiles = 0
+        self.pixels = 0
+        self.busy_time = 0
+        self.wait_time = 0
+        self.failures = 0
+
+    def render(
+        self, context_id: int, context: RenderContext, jobs: deque[Tile], lock: Lock, results: SimpleQueue, stop: Event
+    ) -> None:
+        """Send the tiles taken from `jobs` to the node and put the results in `results`, until there are no
+        more tiles or `stop` is set. If the node is lost, the tiles it was rendering are put back in `jobs`.
+        The node itself is put in `results` when it is done."""
+        connection = self.connection
+        in_flight: deque[Tile] = deque()
+        try:
+            if connection is None:
+                return
+
+            last_answer = monotonic()
+            while not stop.is_set():
+                while len(in_flight) < JOBS_IN_FLIGHT:
+                    with lock:
+                        if not jobs:
+                            break
+                        tile = jobs.popleft()
+                    if not in_flight:
+                        last_answer = monotonic()
+                    connection.send(TileJob(context_id, context if self.context_id != context_id else None, tile))
+                    self.context_id = context_id
+                    in_flight.append(tile)
+
+                if not in_flight:
+                    break
+
+                if not connection.poll(QUEUE_POLL_INTERVAL):
+                    if monotonic() - last_answer > NODE_TIMEOUT:
+                        raise NodeLostError(f"No answer for {NODE_TIMEOUT} seconds")
+                    continue
+
+                result: TileResult | TileError = connection.recv()
+                if isinstance(result, TileError):
+                    raise NodeLostError(result.message)
+
+                tile = in_flight.popleft()
+                self.tiles += 1
+                self.pixels += tile.pixel_count
+                self.busy_time += result.busy_time
+                self.wait_time += monotonic() - last_answer
+                last_answer = monotonic()
+                results.put((tile, result))
+
+            # The answers to the tiles of a cancelled render would be read by the next one
+            if in_flight:
+                self.disconnect()
+                in_flight.clear()
+        except (NodeLostError, EOFError, OSError) as e:
+            self.lose(f"{type(e).__name__}: {e}")
+        finally:
+            with lock:
+                jobs.extendleft(reversed(in_flight))
+            results.put(self)
+
+
+class NodeCluster:
+    """Render nodes that the tiles of the screenshots are sent to, see RenderPool.render()"""
+
+    nodes: list[RenderNode]
+
+    context_id: int = 0
+    """Id of the last render context, so that each node only receives it once"""
+
+    def __init__(self, addresses: tuple[str, ...] = ()) -> None:
+        self.nodes = [RenderNode(address) for address in addresses]
+
+    @property
+    def addresses(self) -> tuple[str, ...]:
+        return tuple(node.address for node in self.nodes)
+
+    @property
+    def processes(self) -> int:
+        """Number of render processes of the connected nodes"""
+        return sum(node.processes for node in self.nodes if node.connection is not None)
+
+    def set_addresses(self, addresses: tuple[str, ...]) -> None:
+        """Keep the connections to the nodes that are still in the list"""
+        nodes = {node.address: node for node in self.nodes}
+        for address, node in nodes.items():
+            if address not in addresses:
+                node.disconnect()
+        self.nodes = [nodes.get(address) or RenderNode(address) for address in addresses]
+
+    def connect(self) -> list[RenderNode]:
+        """Connect to the nodes that aren't connected, and returns the connected ones"""
+        authkey = get_authkey()
+        return [node for node in self.nodes if node.connect(authkey)]
+
+    def disconnect(self) -> None:
+        for node in self.nodes:
+            node.disconnect()
+
+    def reset_stats(self) -> None:
+        for node in self.nodes:
+            node.reset_stats()
+
+    def get_unsupported_engines(self) -> set[str]:
+        """Names of the engines that some connected node cannot render with"""
+        if any(node.info is not None and not node.info.jit for node in self.connect()):
+            return {"jit"}
+        return set()
+
+    def render(
+        self, context: RenderContext, tiles: list[Tile], cancelled: Callable[[], bool], frame: np.ndarray
+    ) -> Generator[RenderedTile, None, list[Tile]]:
+        """Render the tiles with the nodes into the frame array, and yield a notice for each tile.
+        Returns the tiles that could not be rendered because no node is connected anymore,
+        and no tiles if the render was cancelled."""
+        self.context_id += 1
+        jobs = deque(tiles)
+        lock = Lock()
+        results: SimpleQueue = SimpleQueue()
+        stop = Event()
+
+        # The nodes take the tiles that the lost nodes put back, until there are none left
+        while True:
+            nodes = self.connect()
+            if not nodes or not jobs:
+                break
+
+            for node in nodes:
+                args = (self.context_id, context, jobs, lock, results, stop)
+                Thread(target=node.render, args=args, daemon=True).start()
+
+            running = len(nodes)
+            try:
+                while running > 0:
+                    if cancelled():
+                        stop.set()
+
+                    try:
+                        result = results.get(timeout=QUEUE_POLL_INTERVAL)
+                    except Empty:
+                        continue
+
+                    if isinstance(result, RenderNode):
+                        running -= 1
+                        continue
+
+                    tile, tile_result = result
+                    frame[tile.slices] = tile_result.values
+                    yield RenderedTile(tile, tile_result.skipped_iterations)
+            finally:
+                # Stop the threads if the generator is closed early
+                stop.set()
+
+            if cancelled():
+                return []
+            stop = Event()
+
+        return list(jobs)
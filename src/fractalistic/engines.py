@@ -0,0 +1,467 @@
+"""Engines computing the iteration counts of the pixels of a frame.
+
+Each engine declares the fractals, exponents and views it can render, and an estimate of its cost.
+The engine of a frame is chosen once, in the main process, as the cheapest engine that supports the view
+and wasn't demoted, and sent to the render processes with the render context.
+
+The mpc engine iterates every point with arbitrary precision: it supports every view, and is the reference
+the other engines are cross-checked against, see cross_check().
+"""
+
+from abc import ABC, abstractmethod
+from math import inf
+from multiprocessing import Queue
+
+import numpy as np
+
+from . import jit
+from .fractals import fractal_list
+from .fractals.fractal_base import PerturbationFractal, get_integer_exponent
+from .perturbation import PERTURBATION_MIN_CELL_SIZE, ReferenceOrbit
+from .render_notices import RenderedTile
+from .settings import RenderSettings
+from .subdivision import render_subdivided
+from .tile import Tile
+from .utils import (
+    FLOAT64_MAX_VIEW_PRECISION,
+    FLOAT64_PIXELS_PER_BATCH,
+    UNRENDERED,
+    get_batches,
+    get_frame_radius,
+    get_offsets_array,
+    get_pixel_offsets,
+    get_view_precision,
+    pos_to_c,
+    set_precision,
+)
+from .vec import Vec
+
+MPC_ITERATION_COST = 2000
+"""Estimated time of an arbitrary precision iteration, in nanoseconds, at the lowest precision"""
+
+MPC_BIT_COST = 3.5
+"""Estimated time added to an arbitrary precision iteration by each bit of precision, in nanoseconds"""
+
+CROSS_CHECK_MAX_MISMATCHES = 0.1
+"""Largest fraction of the cross-checked pixels that can differ from the reference engine. The orbits of the points
+close to the boundary of the fractals are chaotic, so a few pixels differ because of rounding errors alone."""
+
+
+class Engine(ABC):
+    """Base class for engines"""
+
+    name: str
+
+    fractals: tuple[str, ...] | None = None
+    """Names of the fractals the engine supports, None for all of them"""
+
+    integer_exponents_only: bool = False
+
+    min_view_precision: float = 0
+    max_view_precision: float = inf
+    """Range of precisions, in bits, needed to tell the pixels of a view apart that the engine can render,
+    see utils.get_view_precision()"""
+
+    iteration_cost: float
+    """Estimated time of an iteration, in nanoseconds, measured with fractalistic-benchmark"""
+
+    pixels_per_batch: int = FLOAT64_PIXELS_PER_BATCH
+    """Approximate number of pixels computed at once, a notice is sent to the app after each batch"""
+
+    @classmethod
+    def supports(cls, render_settings: RenderSettings) -> bool:
+        """Whether the engine can render a view with the given settings"""
+        fractal = fractal_list[render_settings.fractal_index]
+        if cls.fractals is not None and fractal.__name__ not in cls.fractals:
+            return False
+        if cls.integer_exponents_only and get_integer_exponent(fractal.get_exponent(render_settings)) is None:
+            return False
+
+        return cls.min_view_precision <= get_view_precision(render_settings) < cls.max_view_precision
+
+    @classmethod
+    def get_cost(cls, render_settings: RenderSettings, size: Vec[int]) -> float:
+        """Returns the estimated time, in nanoseconds, of an iteration of all the pixels of a frame"""
+        del render_settings
+        return cls.iteration_cost * size.x * size.y
+
+    @staticmethod
+    def prepare(render_settings: RenderSettings) -> None:
+        """Set up the process before rendering pixels"""
+        del render_settings
+
+    @staticmethod
+    def get_reference_orbit(render_settings: RenderSettings, size: Vec[int]) -> ReferenceOrbit | None:
+        """Returns the reference orbit needed by the engine, computed once per frame"""
+        del render_settings, size
+        return None
+
+    @classmethod
+    @abstractmethod
+    def get_tile(
+        cls, tile: Tile, render_settings: RenderSettings, size: Vec[int], reference_orbit: ReferenceOrbit | None
+    ) -> np.ndarray:
+        """Returns the iteration counts of the pixels of a tile, as an int32 array of shape (tile.height, tile.width)"""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def get_pixels(
+        cls,
+        ys: np.ndarray,
+        xs: np.ndarray,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        reference_orbit: ReferenceOrbit | None,
+    ) -> np.ndarray:
+        """Returns the iteration counts of the pixels with the given coordinates"""
+        pass
+
+    @classmethod
+    def render_tile(
+        cls,
+        tile: Tile,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        frame: np.ndarray,
+        queue: Queue,
+        reference_orbit: ReferenceOrbit | None,
+    ) -> None:
+        """Render a tile into the frame buffer one batch of lines at a time"""
+        for batch in get_batches(tile, cls.pixels_per_batch):
+            skipped_before = get_skipped_iterations(reference_orbit)
+            frame[batch.slices] = cls.get_tile(batch, render_settings, size, reference_orbit)
+            queue.put(RenderedTile(batch, get_skipped_iterations(reference_orbit) - skipped_before))
+
+
+class Float64Engine(Engine):
+    """Iterates whole arrays of points at once with numpy"""
+
+    name = "float64"
+    max_view_precision = FLOAT64_MAX_VIEW_PRECISION
+    iteration_cost = 12
+
+    @staticmethod
+    def get_array(points: np.ndarray, render_settings: RenderSettings) -> np.ndarray:
+        """Returns the iteration counts of an array of complex128 points"""
+        return fractal_list[render_settings.fractal_index].get_array(points, render_settings)
+
+    @classmethod
+    def get_tile(
+        cls, tile: Tile, render_settings: RenderSettings, size: Vec[int], reference_orbit: ReferenceOrbit | None
+    ) -> np.ndarray:
+        points = get_offsets_array(tile, render_settings, size) + complex(render_settings.screen_pos_on_plane)
+        return cls.get_array(points, render_settings)
+
+    @classmethod
+    def get_pixels(
+        cls,
+        ys: np.ndarray,
+        xs: np.ndarray,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        reference_orbit: ReferenceOrbit | None,
+    ) -> np.ndarray:
+        points = get_pixel_offsets(ys, xs, render_settings, size) + complex(render_settings.screen_pos_on_plane)
+        return cls.get_array(points, render_settings)
+
+
+class JitEngine(Float64Engine):
+    """Same as the float64 engine, with the loops compiled by Numba, see jit.py"""
+
+    name = "jit"
+    fractals = tuple(jit.FRACTAL_CODES)
+    integer_exponents_only = True
+    iteration_cost = 6
+
+    @classmethod
+    def supports(cls, render_settings: RenderSettings) -> bool:
+        return jit.JIT_AVAILABLE and render_settings.jit and super().supports(render_settings)
+
+    @staticmethod
+    def get_array(points: np.ndarray, render_settings: RenderSettings) -> np.ndarray:
+        return jit.get_array(fractal_list[render_settings.fractal_index], points, render_settings)
+
+
+class PerturbationEngine(Engine):
+    """Only computes one arbitrary precision orbit, at the center of the screen,
+    and iterates the difference of the pixels with it in float64"""
+
+    name = "perturbation"
+    # The reference orbit of a shallow view escapes too early to be used by most of its pixels
+    min_view_precision = FLOAT64_MAX_VIEW_PRECISION
+    iteration_cost = 25
+
+    @classmethod
+    def supports(cls, render_settings: RenderSettings) -> bool:
+        fractal = fractal_list[render_settings.fractal_index]
+        return (
+            render_settings.cell_size > PERTURBATION_MIN_CELL_SIZE
+            and issubclass(fractal, PerturbationFractal)
+            and fractal.supports_perturbation(render_settings)
+            and super().supports(render_settings)
+        )
+
+    @staticmethod
+    def get_fractal(render_settings: RenderSettings) -> type[PerturbationFractal]:
+        fractal = fractal_list[render_settings.fractal_index]
+        if not issubclass(fractal, PerturbationFractal):
+            raise ValueError(f"{fractal.__name__} cannot be rendered with perturbation")
+        return fractal
+
+    @classmethod
+    def get_cost(cls, render_settings: RenderSettings, size: Vec[int]) -> float:
+        # The reference orbit is iterated with arbitrary precision once per frame
+        return super().get_cost(render_settings, size) + MpcEngine.get_cost(render_settings, Vec(1, 1))
+
+    @staticmethod
+    def prepare(render_settings: RenderSettings) -> None:
+        set_precision(render_settings.wanted_numeric_precision)
+
+    @staticmethod
+    def get_reference_orbit(render_settings: RenderSettings, size: Vec[int]) -> ReferenceOrbit | None:
+        set_precision(render_settings.wanted_numeric_precision)
+        fractal = PerturbationEngine.get_fractal(render_settings)
+        return fractal.get_reference_orbit(render_settings, get_frame_radius(render_settings, size))
+
+    @classmethod
+    def get_tile(
+        cls, tile: Tile, render_settings: RenderSettings, size: Vec[int], reference_orbit: ReferenceOrbit | None
+    ) -> np.ndarray:
+        if reference_orbit is None:
+            raise ValueError("The perturbation engine needs a reference orbit")
+
+        fractal = cls.get_fractal(render_settings)
+        offsets = get_offsets_array(tile, render_settings, size)
+        return fractal.get_array_perturbation(offsets, reference_orbit, render_settings)
+
+    @classmethod
+    def get_pixels(
+        cls,
+        ys: np.ndarray,
+        xs: np.ndarray,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        reference_orbit: ReferenceOrbit | None,
+    ) -> np.ndarray:
+        if reference_orbit is None:
+            raise ValueError("The perturbation engine needs a reference orbit")
+
+        fractal = cls.get_fractal(render_settings)
+        # The series approximation works on 2D arrays of pixels
+        offsets = get_pixel_offsets(ys, xs, render_settings, size)
+        return fractal.get_array_perturbation(offsets[np.newaxis], reference_orbit, render_settings)[0]
+
+
+class MpcEngine(Engine):
+    """Iterates every point with arbitrary precision"""
+
+    name = "mpc"
+    iteration_cost = MPC_ITERATION_COST
+    # Each line takes a while, they are sent to the app one by one
+    pixels_per_batch = 1
+
+    @classmethod
+    def get_cost(cls, render_settings: RenderSettings, size: Vec[int]) -> float:
+        bit_cost = MPC_BIT_COST * render_settings.wanted_numeric_precision
+        return (cls.iteration_cost + bit_cost) * size.x * size.y
+
+    @staticmethod
+    def prepare(render_settings: RenderSettings) -> None:
+        set_precision(render_settings.wanted_numeric_precision)
+
+    @classmethod
+    def get_tile(
+        cls, tile: Tile, render_settings: RenderSettings, size: Vec[int], reference_orbit: ReferenceOrbit | None
+    ) -> np.ndarray:
+        ys, xs = np.mgrid[tile.y_start : tile.y_stop : tile.step, tile.x_start : tile.x_stop : tile.step]
+        return cls.get_pixels(ys.ravel(), xs.ravel(), render_settings, size, reference_orbit).reshape(ys.shape)
+
+    @classmethod
+    def get_pixels(
+        cls,
+        ys: np.ndarray,
+        xs: np.ndarray,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        reference_orbit: ReferenceOrbit | None,
+    ) -> np.ndarray:
+        fractal = fractal_list[render_settings.fractal_index]
+        pos_on_plane = render_settings.screen_pos_on_plane
+        return np.array(
+            [
+                fractal.get(pos_to_c(Vec(x, y), render_settings.cell_size, pos_on_plane, size), render_settings)
+                for y, x in zip(ys.tolist(), xs.tolist())
+            ],
+            dtype=np.int32,
+        )
+
+
+ENGINES: dict[str, type[Engine]] = {
+    engine.name: engine for engine in (JitEngine, Float64Engine, PerturbationEngine, MpcEngine)
+}
+
+REFERENCE_ENGINE = MpcEngine
+
+
+def get_skipped_iterations(reference_orbit: ReferenceOrbit | None) -> int:
+    return 0 if reference_orbit is None else reference_orbit.skipped_iterations
+
+
+def select_engine(render_settings: RenderSettings, size: Vec[int], demoted: set[str] | None = None) -> type[Engine]:
+    """Returns the cheapest engine that supports the view and isn't demoted,
+    the reference engine if every other engine is demoted"""
+    engines = [
+        engine
+        for engine in ENGINES.values()
+        if engine is REFERENCE_ENGINE or (engine.name not in (demoted or ()) and engine.supports(render_settings))
+    ]
+    return min(engines, key=lambda engine: engine.get_cost(render_settings, size))
+
+
+def get_engine_name(render_settings: RenderSettings, size: Vec[int], demoted: set[str] | None = None) -> str:
+    """Returns the name of the engine used to render a frame, prefixed when it is rendered with subdivision"""
+    name = select_engine(render_settings, size, demoted).name
+    return f"subdivision/{name}" if render_settings.subdivision else name
+
+
+def get_pixels(
+    engine: type[Engine],
+    ys: np.ndarray,
+    xs: np.ndarray,
+    render_settings: RenderSettings,
+    size: Vec[int],
+    reference_orbit: ReferenceOrbit | None,
+) -> np.ndarray:
+    """Returns the iteration counts of the pixels with the given coordinates, computed by batches of pixels
+    so that the vectorized engines never allocate huge temporary arrays"""
+    result = np.empty(ys.size, dtype=np.int32)
+    for batch_start in range(0, ys.size, FLOAT64_PIXELS_PER_BATCH):
+        batch = slice(batch_start, batch_start + FLOAT64_PIXELS_PER_BATCH)
+        result[batch] = engine.get_pixels(ys[batch], xs[batch], render_settings, size, reference_orbit)
+
+    return result
+
+
+def get_divergence_matrix_remaining(
+    engine: type[Engine],
+    tile: Tile,
+    render_settings: RenderSettings,
+    size: Vec[int],
+    frame: np.ndarray,
+    queue: Queue,
+    reference_orbit: ReferenceOrbit | None,
+) -> None:
+    """Same as get_divergence_matrix() but only computes the pixels of the tile that are still UNRENDERED,
+    so that the refining passes of a progressive render reuse the pixels of the coarser ones"""
+    for batch in get_batches(tile, engine.pixels_per_batch):
+        skipped_before = get_skipped_iterations(reference_orbit)
+        values = frame[batch.slices]
+        ys, xs = np.nonzero(values == UNRENDERED)
+        if ys.size > 0:
+            ys_on_frame = ys * batch.step + batch.y_start
+            xs_on_frame = xs * batch.step + batch.x_start
+            values[ys, xs] = get_pixels(engine, ys_on_frame, xs_on_frame, render_settings, size, reference_orbit)
+
+        queue.put(RenderedTile(batch, get_skipped_iterations(reference_orbit) - skipped_before))
+
+
+def get_divergence_matrix_subdivision(
+    engine: type[Engine],
+    tile: Tile,
+    render_settings: RenderSettings,
+    size: Vec[int],
+    frame: np.ndarray,
+    queue: Queue,
+    reference_orbit: ReferenceOrbit | None,
+) -> None:
+    """Same as get_divergence_matrix() but uses Mariani-Silver subdivision to only compute
+    the borders of the rectangles of pixels that have the same iteration count"""
+    skipped_before = get_skipped_iterations(reference_orbit)
+
+    def get_tile_pixels(ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        ys_on_frame = ys * tile.step + tile.y_start
+        xs_on_frame = xs * tile.step + tile.x_start
+        return get_pixels(engine, ys_on_frame, xs_on_frame, render_settings, size, reference_orbit)
+
+    render_subdivided(frame[tile.slices], get_tile_pixels, render_settings.subdivision_guard)
+    queue.put(RenderedTile(tile, get_skipped_iterations(reference_orbit) - skipped_before))
+
+
+def get_divergence_matrix(
+    tile: Tile,
+    render_settings: RenderSettings,
+    size: Vec,
+    frame: np.ndarray,
+    queue: Queue,
+    reference_orbit: ReferenceOrbit | None = None,
+    engine_name: str | None = None,
+) -> None:
+    """Render a tile into the frame buffer, an int32 array of shape (size.y, size.x).
+    A RenderedTile notice is put in the queue every time some pixels are written.
+    The tile is rendered with the given engine, by default with the one chosen by select_engine().
+    `reference_orbit` can be given to avoid computing it again when the engine needs one."""
+    engine = select_engine(render_settings, size) if engine_name is None else ENGINES[engine_name]
+    engine.prepare(render_settings)
+    if reference_orbit is None:
+        reference_orbit = engine.get_reference_orbit(render_settings, size)
+
+    if tile.skip_rendered:
+        get_divergence_matrix_remaining(engine, tile, render_settings, size, frame, queue, reference_orbit)
+    elif render_settings.subdivision:
+        get_divergence_matrix_subdivision(engine, tile, render_settings, size, frame, queue, reference_orbit)
+    else:
+        engine.render_tile(tile, render_settings, size, frame, queue, reference_orbit)
+
+
+def get_divergence_matrix_points(
+    tile: Tile,
+    points: np.ndarray,
+    render_settings: RenderSettings,
+    size: Vec,
+    frame: np.ndarray,
+    queue: Queue,
+    reference_orbit: ReferenceOrbit | None = None,
+    engine_name: str | None = None,
+) -> None:
+    """Same as get_divergence_matrix() but renders the points with the fractional (y, x) coordinates, in pixels
+    of a frame of the given size, of the tile of `points` instead of the pixels of the tile"""
+    engine = select_engine(render_settings, size) if engine_name is None else ENGINES[engine_name]
+    engine.prepare(render_settings)
+    if reference_orbit is None:
+        reference_orbit = engine.get_reference_orbit(render_settings, size)
+
+    skipped_before = get_skipped_iterations(reference_orbit)
+    ys = points[0][tile.slices].ravel()
+    xs = points[1][tile.slices].ravel()
+    values = get_pixels(engine, ys, xs, render_settings, size, reference_orbit)
+    frame[tile.slices] = values.reshape(tile.height, tile.width)
+    queue.put(RenderedTile(tile, get_skipped_iterations(reference_orbit) - skipped_before))
+
+
+def pixels_agree(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Returns whether the iteration counts of some pixels are the same as the ones of the reference engine,
+    within one iteration since float64 and arbitrary precision don't round the bailout test the same way"""
+    both_inside = (values == -1) & (reference == -1)
+    both_outside = (values >= 0) & (reference >= 0)
+    return both_inside | (both_outside & (np.abs(values - reference) <= 1))
+
+
+def cross_check(
+    frame: np.ndarray,
+    engine_name: str,
+    render_settings: RenderSettings,
+    size: Vec[int],
+    samples: int,
+    rng: np.random.Generator,
+) -> float:
+    """Render some random pixels of a frame rendered by the given engine with the reference engine,
+    and returns the fraction of them that disagree"""
+    if engine_name == REFERENCE_ENGINE.name or samples == 0:
+        return 0
+
+    ys = rng.integers(0, size.y, samples)
+    xs = rng.integers(0, size.x, samples)
+    REFERENCE_ENGINE.prepare(render_settings)
+    reference = get_pixels(REFERENCE_ENGINE, ys, xs, render_settings, size, None)
+    return float(np.mean(~pixels_agree(frame[ys, xs], reference)))
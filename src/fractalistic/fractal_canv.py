@@ -1,9 +1,41 @@
+from functools import lru_cache
+from math import ceil
+from typing import Iterable
+
+import numpy as np
+from rich.color import Color as RichColor
+from rich.segment import Segment
+from rich.style import Style
 from textual.binding import Binding
+from textual.color import Color
 from textual.events import MouseEvent
+from textual.geometry import Region
+from textual.strip import Strip
 from textual_canvas import Canvas
+from typing_extensions import Self
+
+
+@lru_cache(maxsize=2**16)
+def get_cell_style(colors: int) -> Style:
+    """Returns the style of a cell whose top and bottom pixel colors are packed in an integer,
+    as returned by pack_colors()"""
+    top, bottom = colors >> 24, colors & 0xFFFFFF
+    return Style(
+        color=RichColor.from_rgb(bottom >> 16, (bottom >> 8) & 0xFF, bottom & 0xFF),
+        bgcolor=RichColor.from_rgb(top >> 16, (top >> 8) & 0xFF, top & 0xFF),
+    )
+
+
+def pack_colors(pixels: np.ndarray) -> np.ndarray:
+    """Returns the colors of an uint8 RGB array as integers"""
+    pixels = pixels.astype(np.int64)
+    return (pixels[..., 0] << 16) | (pixels[..., 1] << 8) | pixels[..., 2]
 
 
 class FractalCanv(Canvas):
+    """Canvas whose pixels are stored in a numpy array, so that whole tiles can be drawn at once,
+    and the lines of the terminal are only rebuilt when their pixels change"""
+
     class CanvClick(MouseEvent):
         pass
 
@@ -20,5 +52,89 @@ class FractalCanv(Canvas):
         Binding("p", "capture", "HD Screenshot"),
     ]
 
+    pixels: np.ndarray
+    """Uint8 RGB array of shape (height, width, 3) of the colors of the pixels"""
+
+    strips: list[Strip | None]
+    """Rendered lines of the terminal, each line shows two lines of pixels. None if the line must be rebuilt."""
+
     def on_click(self, event: MouseEvent) -> None:
         self.post_message(self.CanvClick.from_event(event))
+
+    def _blank_canvas(self) -> None:
+        self.pixels = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self.pixels[:] = self._colour.rgb
+        self.strips = [None] * ceil(self.height / 2)
+
+    def set_pixels(self, locations: Iterable[tuple[int, int]], color: Color) -> Self:
+        for x, y in locations:
+            self._pixel_check(x, y)
+            self.set_pixels_array(x, y, np.array([[color.rgb]], dtype=np.uint8))
+
+        return self
+
+    def get_pixel(self, x: int, y: int) -> Color:
+        self._pixel_check(x, y)
+        return Color(*self.pixels[y, x].tolist())
+
+    def set_pixels_array(self, x: int, y: int, pixels: np.ndarray) -> None:
+        """Draw an uint8 RGB array of shape (height, width, 3), with its top left pixel at (x, y) on the canvas.
+        Only the cells of the terminal whose colors changed are refreshed."""
+        target = self.pixels[y : y + pixels.shape[0], x : x + pixels.shape[1]]
+        changed = (target != pixels).any(axis=2)
+        if not changed.any():
+            return
+
+        target[:] = pixels
+
+        rows = np.flatnonzero(changed.any(axis=1))
+        columns = np.flatnonzero(changed.any(axis=0))
+        first_line = (y + int(rows[0])) // 2
+        last_line = (y + int(rows[-1])) // 2
+        for line in range(first_line, last_line + 1):
+            self.strips[line] = None
+
+        scroll_x, scroll_y = self.scroll_offset
+        self.refresh(
+            Region(
+                x + int(columns[0]) - scroll_x,
+                first_line - scroll_y,
+                int(columns[-1]) - int(columns[0]) + 1,
+                last_line - first_line + 1,
+            )
+        )
+
+    def build_strip(self, line: int) -> Strip:
+        """Build the line of the terminal showing the lines of pixels 2 * line and 2 * line + 1"""
+        top = pack_colors(self.pixels[2 * line])
+        if 2 * line + 1 < self.height:
+            bottom = pack_colors(self.pixels[2 * line + 1])
+        else:
+            bottom = np.full(self.width, pack_colors(np.array(self._colour.rgb)))
+
+        cells = (top << 24) | bottom
+        # Neighbouring cells with the same colors are drawn with a single segment
+        starts = [0, *(np.flatnonzero(cells[1:] != cells[:-1]) + 1).tolist()]
+        stops = [*starts[1:], self.width]
+        colors = cells[starts].tolist()
+
+        return Strip(
+            [
+                Segment(self._CELL * (stop - start), get_cell_style(cell_colors))
+                for start, stop, cell_colors in zip(starts, stops, colors)
+            ],
+            self.width,
+        )
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        line = scroll_y + y
+        if line >= len(self.strips) or self.width == 0:
+            return Strip([])
+
+        strip = self.strips[line]
+        if strip is None:
+            strip = self.build_strip(line)
+            self.strips[line] = strip
+
+        return strip.crop(scroll_x, scroll_x + self.scrollable_content_region.width)
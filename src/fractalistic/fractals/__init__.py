@@ -1,6 +1,7 @@
 from .burning_ship import BurningShip
+from .fractal_base import FractalBase
 from .inv_mandel import InverseMandelbrot
 from .julia import Julia
 from .mandelbrot import Mandelbrot
 
-fractal_list = [Mandelbrot, BurningShip, Julia, InverseMandelbrot]
+fractal_list: list[type[FractalBase]] = [Mandelbrot, BurningShip, Julia, InverseMandelbrot]
@@ -1,7 +1,8 @@
+import numpy as np
 from gmpy2 import mpc  # type: ignore
 
 from ..settings import RenderSettings
-from .fractal_base import FractalBase
+from .fractal_base import FractalBase, PeriodicityChecker, escape_time, get_power
 
 
 class BurningShip(FractalBase):
@@ -14,14 +15,37 @@ class BurningShip(FractalBase):
 
     @staticmethod
     def get(point: mpc, settings: RenderSettings) -> int:
+        periodicity = PeriodicityChecker() if BurningShip.interior_detection_enabled(settings) else None
+        power = get_power(settings.burning_ship_exponent)
         i = 0
         z = mpc(0, 0)
         while abs(z) < 5 and i < settings.max_iter:
+            if periodicity is not None and periodicity.is_periodic(z, i):
+                return -1
+
             z = mpc(abs(z.real), abs(z.imag))
-            z = z.__pow__(settings.burning_ship_exponent) - point
+            z = power(z) - point
             i += 1
 
         if i == settings.max_iter:
             return -1
 
         return i
+
+    @staticmethod
+    def get_array(points: np.ndarray, settings: RenderSettings) -> np.ndarray:
+        power = get_power(settings.burning_ship_exponent, True)
+        z = np.zeros(points.shape, dtype=np.complex128)
+
+        return escape_time(
+            z,
+            points,
+            lambda z, c: power(np.abs(np.real(z)) + 1j * np.abs(np.imag(z))) - c,
+            5,
+            settings.max_iter,
+            BurningShip.interior_detection_enabled(settings),
+        )
+
+    @staticmethod
+    def get_exponent(settings: RenderSettings) -> float | int | mpc:
+        return settings.burning_ship_exponent
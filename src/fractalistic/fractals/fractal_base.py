@@ -1,17 +1,232 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Callable, TypeAlias, TypeVar
 
-from gmpy2 import mpc  # type: ignore
+import gmpy2
+import numpy as np
+from gmpy2 import mpc, mpfr  # type: ignore
 
+from ..perturbation import ReferenceOrbit
 from ..settings import RenderSettings
 
+StepFunction: TypeAlias = Callable[[np.ndarray, np.ndarray], np.ndarray]
+"""Takes the current values of the sequence and the points, and returns the next values of the sequence"""
+
+PERIODICITY_MARGIN_BITS = 4
+"""Number of low bits of the mantissa ignored when comparing two values of an orbit, to absorb rounding errors"""
+
+FLOAT64_PERIODICITY_TOLERANCE = 2.0 ** -(53 - PERIODICITY_MARGIN_BITS)
+"""Distance under which two float64 values of an orbit are considered equal"""
+
+MAX_SQUARING_EXPONENT = 64
+"""Largest integer exponent computed with multiplications by get_power(), larger ones use the generic power"""
+
+Number = TypeVar("Number", mpc, np.ndarray)
+
 
 class FractalBase(ABC):
     """Base class for fractals."""
 
     message: str | None
 
+    @classmethod
+    def interior_detection_enabled(cls, settings: RenderSettings) -> bool:
+        """Whether points can be classified as convergent before max_iter is reached"""
+        return cls.__name__ not in settings.interior_detection_disabled
+
     @staticmethod
     @abstractmethod
     def get(point: mpc, settings: RenderSettings) -> int:
         """Returns the number of iterations required to classify a point as convergent (or -1 if it diverges)."""
         pass
+
+    @staticmethod
+    @abstractmethod
+    def get_array(points: np.ndarray, settings: RenderSettings) -> np.ndarray:
+        """Vectorized version of get() using float64 arithmetic.
+        Takes an array of complex128 points and returns an int32 array of the same shape."""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def get_exponent(settings: RenderSettings) -> float | int | mpc:
+        """Returns the exponent of the render settings used by the fractal"""
+        pass
+
+
+class PerturbationFractal(FractalBase):
+    """Base class for fractals that can be rendered with perturbation theory, see perturbation.py"""
+
+    @staticmethod
+    @abstractmethod
+    def supports_perturbation(settings: RenderSettings) -> bool:
+        """Whether the fractal can be rendered with perturbation theory using the given settings"""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def get_reference_orbit(settings: RenderSettings, radius: float) -> ReferenceOrbit:
+        """Returns the reference orbit of the center of the screen, used for perturbation.
+        `radius` is the largest distance between a point and the center of the screen."""
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def get_array_perturbation(
+        offsets: np.ndarray, reference_orbit: ReferenceOrbit, settings: RenderSettings
+    ) -> np.ndarray:
+        """Same as get_array(), but takes the offsets of the points from the center of the screen,
+        and only iterates their difference with the reference orbit."""
+        pass
+
+
+class PeriodicityChecker:
+    """Brent's cycle detection: the orbit is compared to a value saved at every power of two iterations.
+    Once an orbit comes back to a previous value, it will cycle forever and never escape."""
+
+    tolerance: mpfr
+    saved: mpc | None = None
+    next_save: int = 0
+
+    def __init__(self) -> None:
+        """Must be created after the precision of the render is set"""
+        precision = gmpy2.get_context().precision  # type: ignore
+        self.tolerance = mpfr(2) ** -(precision - PERIODICITY_MARGIN_BITS)
+
+    def is_periodic(self, z: mpc, i: int) -> bool:
+        """Must be called with every value z of the orbit, i being its index"""
+        if self.saved is not None and abs(z - self.saved) <= self.tolerance:
+            return True
+
+        if i == self.next_save:
+            self.saved = z
+            self.next_save = max(1, self.next_save * 2)
+
+        return False
+
+
+def to_numpy_exponent(exponent: float | int | mpc) -> float | int | complex:
+    """Convert an exponent from the render settings to a type numpy can work with"""
+    if isinstance(exponent, int):
+        return exponent
+    if isinstance(exponent, mpc):
+        return complex(exponent)
+    return float(exponent)
+
+
+def get_integer_exponent(exponent: float | int | mpc) -> int | None:
+    """Returns the exponent as an int if it is an integer between 1 and MAX_SQUARING_EXPONENT, whatever its type"""
+    if isinstance(exponent, mpc):
+        if exponent.imag != 0 or not gmpy2.is_integer(exponent.real):  # type: ignore
+            return None
+        exponent = int(exponent.real)
+    elif isinstance(exponent, float):
+        if not exponent.is_integer():
+            return None
+        exponent = int(exponent)
+
+    return exponent if 1 <= exponent <= MAX_SQUARING_EXPONENT else None
+
+
+def get_kernel_name(exponent: float | int | mpc) -> str:
+    """Returns the name of the power function returned by get_power() for the exponent"""
+    n = get_integer_exponent(exponent)
+    if n == 2:
+        return "square"
+    if n is not None:
+        return "squaring"
+    return "generic"
+
+
+def power_by_squaring(z: Number, n: int) -> Number:
+    """Returns z^n for n >= 1, computed by repeated squaring with about 2 * log2(n) multiplications"""
+    result = None
+    while True:
+        if n & 1:
+            result = z if result is None else result * z
+        n >>= 1
+        if n == 0:
+            return result  # type: ignore
+        z = z * z  # type: ignore
+
+
+@lru_cache(maxsize=16, typed=True)
+def get_power(exponent: float | int | mpc, vectorized: bool = False) -> Callable:
+    """Returns the function used by the fractals to raise their values to the exponent of the render settings:
+    mpc numbers, or complex128 arrays if `vectorized`. The function is built once per exponent.
+
+    Integer exponents, whatever their type, are computed with multiplications, which are much faster than the
+    generic power that goes through a logarithm and an exponential. Squares are correctly rounded either way,
+    so they give the exact same results. Each multiplication of a higher power rounds, while the mpc power is
+    correctly rounded, so mpc numbers only use multiplications for squares to keep the same iteration counts.
+    Other exponents use the generic power."""
+    n = get_integer_exponent(exponent)
+    if n == 1:
+        return lambda z: z
+    if n == 2:
+        return lambda z: z * z
+    if n is not None and vectorized:
+        return lambda z: power_by_squaring(z, n)
+
+    if vectorized:
+        numpy_exponent = to_numpy_exponent(exponent)
+        return lambda z: z**numpy_exponent
+    return lambda z: z.__pow__(exponent)
+
+
+def escape_time(
+    z: np.ndarray,
+    c: np.ndarray,
+    step: StepFunction,
+    bailout: float,
+    max_iter: int,
+    detect_periodicity: bool = False,
+) -> np.ndarray:
+    """Iterate `step` on every value of `z` at once, and return the iteration count of each point,
+    with the exact same semantics as the scalar get() methods.
+
+    Points are removed from the active set as soon as they escape, or as soon as their orbit is found to be periodic
+    if `detect_periodicity` is True (same as PeriodicityChecker), so that the cost of each iteration
+    only depends on the number of points still being iterated."""
+
+    shape = c.shape
+    z = np.broadcast_to(z, shape).ravel().copy()
+    c = np.broadcast_to(c, shape).ravel().copy()
+
+    result = np.full(c.size, -1, dtype=np.int32)
+    # Indices in result of the points that are still being iterated
+    active = np.arange(c.size)
+
+    # Value of the orbits saved at the last power of two iterations
+    saved = z
+    next_save = 1
+
+    # Overflows and divisions by zero produce inf/nan values, which are treated as escaped
+    with np.errstate(all="ignore"):
+        for i in range(max_iter):
+            # Written this way so that nan values are considered as escaped, like in the scalar version
+            escaped = ~(np.abs(z) < bailout)
+            done = escaped
+            if detect_periodicity and i > 0:
+                # Periodic points are left to -1
+                done = escaped | (np.abs(z - saved) <= FLOAT64_PERIODICITY_TOLERANCE)
+
+            if done.any():
+                result[active[escaped]] = i
+                still_active = ~done
+                active = active[still_active]
+                z = z[still_active]
+                c = c[still_active]
+                if detect_periodicity:
+                    saved = saved[still_active]
+
+                if active.size == 0:
+                    break
+
+            if detect_periodicity and i == next_save:
+                saved = z
+                next_save *= 2
+
+            z = step(z, c)
+
+    return result.reshape(shape)
@@ -1,7 +1,8 @@
+import numpy as np
 from gmpy2 import mpc  # type: ignore
 
 from ..settings import RenderSettings
-from .fractal_base import FractalBase
+from .fractal_base import FractalBase, PeriodicityChecker, escape_time, get_power
 
 
 class InverseMandelbrot(FractalBase):
@@ -14,13 +15,37 @@ class InverseMandelbrot(FractalBase):
 
     @staticmethod
     def get(point: mpc, settings: RenderSettings) -> int:
+        periodicity = PeriodicityChecker() if InverseMandelbrot.interior_detection_enabled(settings) else None
+        power = get_power(settings.mandelbrot_exponent)
         i = 0
         z = settings.mandelbrot_starting_value
         while abs(z) < 2 and i < settings.max_iter:
-            z = settings.inv_mandel_numerator / (z.__pow__(settings.mandelbrot_exponent) + point)
+            if periodicity is not None and periodicity.is_periodic(z, i):
+                return -1
+
+            z = settings.inv_mandel_numerator / (power(z) + point)
             i += 1
 
         if i == settings.max_iter:
             return -1
 
         return i
+
+    @staticmethod
+    def get_array(points: np.ndarray, settings: RenderSettings) -> np.ndarray:
+        power = get_power(settings.mandelbrot_exponent, True)
+        numerator = complex(settings.inv_mandel_numerator)
+        z = np.full(points.shape, complex(settings.mandelbrot_starting_value))
+
+        return escape_time(
+            z,
+            points,
+            lambda z, c: numerator / (power(z) + c),
+            2,
+            settings.max_iter,
+            InverseMandelbrot.interior_detection_enabled(settings),
+        )
+
+    @staticmethod
+    def get_exponent(settings: RenderSettings) -> float | int | mpc:
+        return settings.mandelbrot_exponent
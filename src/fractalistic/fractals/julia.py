@@ -1,10 +1,12 @@
+import numpy as np
 from gmpy2 import mpc  # type: ignore
 
+from ..perturbation import ReferenceOrbit, SeriesApproximation, get_orbit, perturbed_escape_time
 from ..settings import RenderSettings
-from .fractal_base import FractalBase
+from .fractal_base import PeriodicityChecker, PerturbationFractal, escape_time, get_power
 
 
-class Julia(FractalBase):
+class Julia(PerturbationFractal):
     """
     With U0 being the point in the complex plane,
     Un+1 = Un² - C
@@ -14,13 +16,64 @@ class Julia(FractalBase):
 
     @staticmethod
     def get(point: mpc, settings: RenderSettings) -> int:
+        periodicity = PeriodicityChecker() if Julia.interior_detection_enabled(settings) else None
+        power = get_power(settings.julia_exponent)
         i = 0
 
         while abs(point) < 4 and i < settings.max_iter:
-            point = point.__pow__(settings.julia_exponent) - settings.julia_click
+            if periodicity is not None and periodicity.is_periodic(point, i):
+                return -1
+
+            point = power(point) - settings.julia_click
             i += 1
 
         if i == settings.max_iter:
             return -1
 
         return i
+
+    @staticmethod
+    def get_array(points: np.ndarray, settings: RenderSettings) -> np.ndarray:
+        power = get_power(settings.julia_exponent, True)
+        c = np.full(points.shape, complex(settings.julia_click))
+
+        return escape_time(
+            points, c, lambda z, c: power(z) - c, 4, settings.max_iter, Julia.interior_detection_enabled(settings)
+        )
+
+    @staticmethod
+    def get_exponent(settings: RenderSettings) -> float | int | mpc:
+        return settings.julia_exponent
+
+    @staticmethod
+    def supports_perturbation(settings: RenderSettings) -> bool:
+        return isinstance(settings.julia_exponent, int) and settings.julia_exponent >= 2
+
+    @staticmethod
+    def get_reference_orbit(settings: RenderSettings, radius: float) -> ReferenceOrbit:
+        exponent = settings.julia_exponent
+        power = get_power(exponent)
+
+        def step(z: mpc, c: mpc) -> mpc:
+            return power(z) - c
+
+        center = get_orbit(settings.screen_pos_on_plane, settings.julia_click, step, 4, settings.max_iter)
+        critical = get_orbit(mpc(0, 0), settings.julia_click, step, 4, settings.max_iter)
+
+        series = None
+        if settings.series_approximation_terms > 0:
+            series = SeriesApproximation(center, int(exponent), settings.series_approximation_terms, radius, 4, False)
+
+        return ReferenceOrbit(center, critical, series)
+
+    @staticmethod
+    def get_array_perturbation(
+        offsets: np.ndarray, reference_orbit: ReferenceOrbit, settings: RenderSettings
+    ) -> np.ndarray:
+        # Every point has the same constant, only the starting value differs
+        delta_c = np.zeros(offsets.shape, dtype=np.complex128)
+        skipped, delta_z = reference_orbit.skip_iterations(offsets, offsets)
+
+        return perturbed_escape_time(
+            reference_orbit, delta_z, delta_c, int(settings.julia_exponent), 4, settings.max_iter, skipped
+        )
@@ -1,10 +1,19 @@
-from gmpy2 import mpc  # type: ignore
+import numpy as np
+from gmpy2 import mpc, mpfr  # type: ignore
 
+from ..perturbation import ReferenceOrbit, SeriesApproximation, get_orbit, perturbed_escape_time
 from ..settings import RenderSettings
-from .fractal_base import FractalBase
+from .fractal_base import PeriodicityChecker, PerturbationFractal, escape_time, get_power
 
 
-class Mandelbrot(FractalBase):
+def in_main_cardioid_or_bulb(real: mpfr | np.ndarray, imag: mpfr | np.ndarray) -> bool | np.ndarray:
+    """Closed-form test of the main cardioid and the period-2 bulb of the Mandelbrot set with exponent 2.
+    Works with both scalars and numpy arrays."""
+    q = (real - 0.25) ** 2 + imag**2
+    return (q * (q + real - 0.25) <= imag**2 / 4) | ((real + 1) ** 2 + imag**2 <= 1 / 16)
+
+
+class Mandelbrot(PerturbationFractal):
     """
     With U0 = 0 and c being the point in the complex plane,
     Un+1 = Un² + c
@@ -14,13 +23,88 @@ class Mandelbrot(FractalBase):
 
     @staticmethod
     def get(point: mpc, settings: RenderSettings) -> int:
+        periodicity = None
+        if Mandelbrot.interior_detection_enabled(settings):
+            if Mandelbrot.has_closed_form_interior(settings) and in_main_cardioid_or_bulb(point.real, point.imag):
+                return -1
+            periodicity = PeriodicityChecker()
+
+        power = get_power(settings.mandelbrot_exponent)
         i = 0
         z = settings.mandelbrot_starting_value
         while abs(z) < 2 and i < settings.max_iter:
-            z = z.__pow__(settings.mandelbrot_exponent) + point
+            if periodicity is not None and periodicity.is_periodic(z, i):
+                return -1
+
+            z = power(z) + point
             i += 1
 
         if i == settings.max_iter:
             return -1
 
         return i
+
+    @staticmethod
+    def get_array(points: np.ndarray, settings: RenderSettings) -> np.ndarray:
+        power = get_power(settings.mandelbrot_exponent, True)
+        z = np.full(points.shape, complex(settings.mandelbrot_starting_value))
+        detect_periodicity = Mandelbrot.interior_detection_enabled(settings)
+
+        if not (detect_periodicity and Mandelbrot.has_closed_form_interior(settings)):
+            return escape_time(z, points, lambda z, c: power(z) + c, 2, settings.max_iter, detect_periodicity)
+
+        # Only iterate the points outside of the main cardioid and bulb, the other ones are left to -1
+        result = np.full(points.shape, -1, dtype=np.int32)
+        outside = ~in_main_cardioid_or_bulb(np.real(points), np.imag(points))
+        result[outside] = escape_time(
+            z[outside], points[outside], lambda z, c: power(z) + c, 2, settings.max_iter, True
+        )
+
+        return result
+
+    @staticmethod
+    def get_exponent(settings: RenderSettings) -> float | int | mpc:
+        return settings.mandelbrot_exponent
+
+    @staticmethod
+    def has_closed_form_interior(settings: RenderSettings) -> bool:
+        """Whether in_main_cardioid_or_bulb() can be used with the given settings"""
+        exponent = settings.mandelbrot_exponent
+        return isinstance(exponent, int) and exponent == 2 and settings.mandelbrot_starting_value == 0
+
+    @staticmethod
+    def supports_perturbation(settings: RenderSettings) -> bool:
+        return isinstance(settings.mandelbrot_exponent, int) and settings.mandelbrot_exponent >= 2
+
+    @staticmethod
+    def get_reference_orbit(settings: RenderSettings, radius: float) -> ReferenceOrbit:
+        exponent = settings.mandelbrot_exponent
+        power = get_power(exponent)
+        c = settings.screen_pos_on_plane
+
+        def step(z: mpc, c: mpc) -> mpc:
+            return power(z) + c
+
+        center = get_orbit(settings.mandelbrot_starting_value, c, step, 2, settings.max_iter)
+        # With the default starting value, the orbit of the center already starts at the critical point
+        critical = (
+            center if settings.mandelbrot_starting_value == 0 else get_orbit(mpc(0, 0), c, step, 2, settings.max_iter)
+        )
+
+        series = None
+        if settings.series_approximation_terms > 0:
+            series = SeriesApproximation(center, int(exponent), settings.series_approximation_terms, radius, 2, True)
+
+        return ReferenceOrbit(center, critical, series)
+
+    @staticmethod
+    def get_array_perturbation(
+        offsets: np.ndarray, reference_orbit: ReferenceOrbit, settings: RenderSettings
+    ) -> np.ndarray:
+        # Every point has the same starting value, only c differs
+        delta_z = np.zeros(offsets.shape, dtype=np.complex128)
+        skipped, delta_z = reference_orbit.skip_iterations(offsets, delta_z)
+
+        return perturbed_escape_time(
+            reference_orbit, delta_z, offsets, int(settings.mandelbrot_exponent), 2, settings.max_iter, skipped
+        )
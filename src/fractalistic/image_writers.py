@@ -0,0 +1,218 @@
+"""Image files written one band of lines at a time, so that screenshots of any size can be saved
+without keeping the whole image in memory. The lines already rendered are on disk if the program crashes.
+
+The PNG and raw files can be read up to the last written line even if they were not closed.
+The TIFF files are BigTIFF files, that can be larger than 4GiB, split in square tiles so that viewers can load
+only the visible parts of gigapixel images. Their tile offsets are only written when they are closed.
+"""
+
+import os
+import struct
+import zlib
+from math import ceil
+from typing import BinaryIO
+
+import numpy as np
+
+from .vec import Vec
+
+
+def get_sub_filtered(pixels: np.ndarray) -> np.ndarray:
+    """Returns the difference between each byte of the lines of an uint8 RGB array and the same byte of the
+    previous pixel, modulo 256. Neighbouring pixels have close colors, so the differences compress better."""
+    filtered = pixels.copy()
+    filtered[:, 1:] -= pixels[:, :-1]
+    return filtered
+
+
+class ImageWriter:
+    """Writes the lines of an image of a given size to a file, in order, from top to bottom"""
+
+    extension: str
+    """Extension of the files written, without the dot"""
+
+    path: str
+    size: Vec[int]
+    file: BinaryIO
+
+    written_lines: int = 0
+
+    def __init__(self, path: str, size: Vec[int]) -> None:
+        self.path = path
+        self.size = size
+        self.file = open(path, "wb")  # noqa: SIM115, closed by close() or abort()
+        self.write_header()
+
+    def write_header(self) -> None:
+        pass
+
+    def write_lines(self, pixels: np.ndarray) -> None:
+        """Write the next lines of the image, an uint8 RGB array of shape (lines, size.x, 3)"""
+        if self.written_lines + pixels.shape[0] > self.size.y:
+            raise Exception("Cannot write more lines than the height of the image")
+
+        self.write_pixels(pixels)
+        self.written_lines += pixels.shape[0]
+
+    def write_pixels(self, pixels: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Finish writing the file, all the lines of the image must have been written"""
+        if self.written_lines != self.size.y:
+            raise Exception(f"Only {self.written_lines} of the {self.size.y} lines of the image were written")
+
+        self.write_footer()
+        self.file.close()
+
+    def write_footer(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        """Close and remove the file, when the image will not be completed"""
+        self.file.close()
+        os.remove(self.path)
+
+
+class PngWriter(ImageWriter):
+    """PNG image, the lines are compressed as a single stream written in chunks as the lines are received"""
+
+    extension = "png"
+
+    compressor: "zlib._Compress"
+
+    def write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)) + chunk_type + data)
+        self.file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+    def write_header(self) -> None:
+        self.compressor = zlib.compressobj()
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits per channel, RGB, deflate compression, adaptive filtering, no interlacing
+        self.write_chunk(b"IHDR", struct.pack(">IIBBBBB", self.size.x, self.size.y, 8, 2, 0, 0, 0))
+
+    def write_pixels(self, pixels: np.ndarray) -> None:
+        # Each line starts with the type of its filter, 1 is the sub filter
+        lines = np.empty((pixels.shape[0], 1 + self.size.x * 3), dtype=np.uint8)
+        lines[:, 0] = 1
+        lines[:, 1:] = get_sub_filtered(pixels).reshape(pixels.shape[0], -1)
+
+        data = self.compressor.compress(lines.tobytes())
+        if data:
+            self.write_chunk(b"IDAT", data)
+
+    def write_footer(self) -> None:
+        self.write_chunk(b"IDAT", self.compressor.flush())
+        self.write_chunk(b"IEND", b"")
+
+
+# Types of the values of the TIFF tags
+TIFF_SHORT = 3
+TIFF_LONG = 4
+TIFF_LONG8 = 16
+
+
+class TiffWriter(ImageWriter):
+    """Tiled BigTIFF image, with deflate compression.
+    The lines are buffered until a whole line of tiles can be written."""
+
+    extension = "tiff"
+
+    tile_size: int = 256
+    """Width and height of the tiles, must be a multiple of 16"""
+
+    buffer: np.ndarray
+    """Lines of the line of tiles being received, padded to a whole number of tiles"""
+
+    buffered_lines: int = 0
+
+    tile_offsets: list[int]
+    tile_byte_counts: list[int]
+
+    def write_header(self) -> None:
+        columns = ceil(self.size.x / self.tile_size)
+        self.buffer = np.zeros((self.tile_size, columns * self.tile_size, 3), dtype=np.uint8)
+        self.tile_offsets = []
+        self.tile_byte_counts = []
+        # Little endian BigTIFF, the offset of the directory of the image is only known at the end
+        self.file.write(b"II" + struct.pack("<HHHQ", 43, 8, 0, 0))
+
+    def write_pixels(self, pixels: np.ndarray) -> None:
+        while pixels.shape[0] > 0:
+            lines = min(pixels.shape[0], self.tile_size - self.buffered_lines)
+            self.buffer[self.buffered_lines : self.buffered_lines + lines, : self.size.x] = pixels[:lines]
+            self.buffered_lines += lines
+            pixels = pixels[lines:]
+
+            if self.buffered_lines == self.tile_size:
+                self.write_tiles()
+
+    def write_tiles(self) -> None:
+        """Write the buffered line of tiles, the missing lines of the last one are left black"""
+        self.buffer[self.buffered_lines :] = 0
+        for x in range(0, self.buffer.shape[1], self.tile_size):
+            # The pixels are stored as differences with the previous pixel of the line of the tile (predictor 2)
+            data = zlib.compress(get_sub_filtered(self.buffer[:, x : x + self.tile_size]).tobytes())
+            self.tile_offsets.append(self.file.tell())
+            self.tile_byte_counts.append(len(data))
+            self.file.write(data)
+
+        self.buffered_lines = 0
+
+    def write_array(self, values: list[int]) -> int:
+        """Write the values of a tag that don't fit in its entry, and return their offset"""
+        offset = self.file.tell()
+        self.file.write(struct.pack(f"<{len(values)}Q", *values))
+        return offset
+
+    def write_footer(self) -> None:
+        if self.buffered_lines > 0:
+            self.write_tiles()
+
+        # The entries of the directory must be sorted by tag, a value is stored in its entry if it fits in 8 bytes
+        entries = [
+            (256, TIFF_LONG, [self.size.x]),  # ImageWidth
+            (257, TIFF_LONG, [self.size.y]),  # ImageLength
+            (258, TIFF_SHORT, [8, 8, 8]),  # BitsPerSample
+            (259, TIFF_SHORT, [8]),  # Compression: deflate
+            (262, TIFF_SHORT, [2]),  # PhotometricInterpretation: RGB
+            (277, TIFF_SHORT, [3]),  # SamplesPerPixel
+            (284, TIFF_SHORT, [1]),  # PlanarConfiguration: contiguous
+            (317, TIFF_SHORT, [2]),  # Predictor: horizontal differencing
+            (322, TIFF_LONG, [self.tile_size]),  # TileWidth
+            (323, TIFF_LONG, [self.tile_size]),  # TileLength
+            (324, TIFF_LONG8, self.tile_offsets),  # TileOffsets
+            (325, TIFF_LONG8, self.tile_byte_counts),  # TileByteCounts
+        ]
+        formats = {TIFF_SHORT: "H", TIFF_LONG: "I", TIFF_LONG8: "Q"}
+
+        packed_entries = []
+        for tag, value_type, values in entries:
+            data = struct.pack(f"<{len(values)}{formats[value_type]}", *values)
+            if len(data) > 8:
+                data = struct.pack("<Q", self.write_array(values))
+            packed_entries.append(struct.pack("<HHQ", tag, value_type, len(values)) + data.ljust(8, b"\0"))
+
+        directory_offset = self.file.tell()
+        self.file.write(struct.pack("<Q", len(packed_entries)) + b"".join(packed_entries) + struct.pack("<Q", 0))
+
+        self.file.seek(8)
+        self.file.write(struct.pack("<Q", directory_offset))
+
+
+class RawWriter(ImageWriter):
+    """Uncompressed uint8 RGB array of shape (height, width, 3) in the numpy .npy format,
+    that can be memory mapped with numpy.load(path, mmap_mode="r")"""
+
+    extension = "npy"
+
+    def write_header(self) -> None:
+        header = {"descr": "|u1", "fortran_order": False, "shape": (self.size.y, self.size.x, 3)}
+        np.lib.format.write_array_header_2_0(self.file, header)  # type: ignore
+
+    def write_pixels(self, pixels: np.ndarray) -> None:
+        self.file.write(np.ascontiguousarray(pixels).tobytes())
+
+
+IMAGE_WRITERS: dict[str, type[ImageWriter]] = {"png": PngWriter, "tiff": TiffWriter, "raw": RawWriter}
+"""Image writers by name of the screenshot format"""
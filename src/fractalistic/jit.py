@@ -0,0 +1,86 @@
+"""Float64 escape time loops compiled to native code with Numba, when it is installed.
+
+The vectorized numpy engine goes through the whole array of points at every iteration, and allocates temporary
+arrays for each operation. The compiled loops iterate each point in registers until it escapes, and split
+the points between threads with prange. The compiled code is cached on disk, so it is only compiled
+the first time it is used.
+
+Only the Mandelbrot set, Julia sets and Burning Ship with integer exponents are supported, raised with the same
+multiplications as fractal_base.get_power().
+The other renders use the numpy engine, as well as every render when Numba is not installed.
+"""
+
+from importlib.util import find_spec
+
+import numpy as np
+
+from .fractals.fractal_base import FractalBase, get_integer_exponent
+from .fractals.mandelbrot import Mandelbrot
+from .settings import RenderSettings
+
+JIT_AVAILABLE = find_spec("numba") is not None
+"""Whether Numba is installed, it is only imported by the processes that render with it"""
+
+# Same codes as jit_kernels.py, which can't be imported without Numba
+MANDELBROT = 0
+JULIA = 1
+BURNING_SHIP = 2
+
+FRACTAL_CODES = {
+    "Mandelbrot": MANDELBROT,
+    "Julia": JULIA,
+    "BurningShip": BURNING_SHIP,
+}
+"""Code of each fractal, by name of its class. The inverse Mandelbrot set is left to numpy: its loop is bound by
+complex divisions, that are no faster once compiled."""
+
+BAILOUTS = {MANDELBROT: 2.0, JULIA: 4.0, BURNING_SHIP: 5.0}
+"""Same bailouts as the get_array() methods of the fractals"""
+
+
+def jit_is_usable(fractal: type[FractalBase], render_settings: RenderSettings) -> bool:
+    """Whether float64 renders of the fractal with the given settings can use the compiled loops"""
+    return (
+        JIT_AVAILABLE
+        and render_settings.jit
+        and fractal.__name__ in FRACTAL_CODES
+        and get_integer_exponent(fractal.get_exponent(render_settings)) is not None
+    )
+
+
+def set_threads(threads: int) -> None:
+    """Set the number of threads the compiled loops of this process are split between"""
+    if JIT_AVAILABLE:
+        import numba  # type: ignore # noqa: PLC0415, only imported by the processes that render with it
+
+        numba.set_num_threads(max(1, min(threads, numba.config.NUMBA_NUM_THREADS)))  # type: ignore
+
+
+def get_array(fractal: type[FractalBase], points: np.ndarray, render_settings: RenderSettings) -> np.ndarray:
+    """Same as the get_array() method of the fractal, with the compiled loops. jit_is_usable() must be True."""
+    exponent = get_integer_exponent(fractal.get_exponent(render_settings))
+    if exponent is None:
+        raise ValueError(f"The compiled loops don't support the exponent of {fractal.__name__}")
+
+    code = FRACTAL_CODES[fractal.__name__]
+    detect_periodicity = fractal.interior_detection_enabled(render_settings)
+    closed_form_interior = (
+        code == MANDELBROT and detect_periodicity and Mandelbrot.has_closed_form_interior(render_settings)
+    )
+    start = 0j if code == BURNING_SHIP else complex(render_settings.mandelbrot_starting_value)
+
+    # Only imported when used, importing Numba takes a while
+    from .jit_kernels import escape_time_array  # noqa: PLC0415
+
+    result = escape_time_array(
+        np.ascontiguousarray(points, dtype=np.complex128).ravel(),
+        start,
+        complex(render_settings.julia_click),
+        code,
+        exponent,
+        BAILOUTS[code],
+        render_settings.max_iter,
+        detect_periodicity,
+        closed_form_interior,
+    )
+    return result.reshape(points.shape)
@@ -0,0 +1,105 @@
+"""Escape time loops compiled by Numba, only imported when Numba is installed, see jit.py"""
+
+import numpy as np
+from numba import njit, prange  # type: ignore
+
+from .fractals.fractal_base import FLOAT64_PERIODICITY_TOLERANCE
+
+# Codes of the fractals in the compiled loops
+MANDELBROT = 0
+JULIA = 1
+BURNING_SHIP = 2
+
+
+@njit(cache=True, inline="always")
+def power(z: complex, n: int) -> complex:
+    """Same multiplications as fractal_base.power_by_squaring()"""
+    result = z
+    first = True
+    while True:
+        if n & 1:
+            if first:
+                result = z
+                first = False
+            else:
+                result = result * z
+        n >>= 1
+        if n == 0:
+            return result
+        z = z * z
+
+
+@njit(cache=True)
+def escape_time_point(
+    z: complex,
+    c: complex,
+    fractal: int,
+    exponent: int,
+    bailout: float,
+    max_iter: int,
+    detect_periodicity: bool,
+) -> int:
+    """Same semantics as fractal_base.escape_time() for a single point"""
+    bailout_squared = bailout * bailout
+    tolerance_squared = FLOAT64_PERIODICITY_TOLERANCE * FLOAT64_PERIODICITY_TOLERANCE
+    saved = z
+    next_save = 1
+
+    for i in range(max_iter):
+        # Written this way so that nan values are considered as escaped
+        if not (z.real * z.real + z.imag * z.imag < bailout_squared):
+            return i
+
+        if detect_periodicity and i > 0:
+            difference = z - saved
+            if difference.real * difference.real + difference.imag * difference.imag <= tolerance_squared:
+                return -1
+
+        if detect_periodicity and i == next_save:
+            saved = z
+            next_save *= 2
+
+        if fractal == MANDELBROT:
+            z = power(z, exponent) + c
+        elif fractal == JULIA:
+            z = power(z, exponent) - c
+        else:
+            z = power(complex(abs(z.real), abs(z.imag)), exponent) - c
+
+    return -1
+
+
+@njit(cache=True)
+def in_main_cardioid_or_bulb(point: complex) -> bool:
+    """Same as mandelbrot.in_main_cardioid_or_bulb()"""
+    real = point.real
+    imag = point.imag
+    q = (real - 0.25) ** 2 + imag**2
+    return q * (q + real - 0.25) <= imag**2 / 4 or (real + 1) ** 2 + imag**2 <= 1 / 16
+
+
+@njit(cache=True, parallel=True)
+def escape_time_array(
+    points: np.ndarray,
+    start: complex,
+    constant: complex,
+    fractal: int,
+    exponent: int,
+    bailout: float,
+    max_iter: int,
+    detect_periodicity: bool,
+    closed_form_interior: bool,
+) -> np.ndarray:
+    """Returns the iteration counts of a 1D array of points, split between the threads"""
+    result = np.empty(points.size, dtype=np.int32)
+
+    for i in prange(points.size):
+        point = points[i]
+        if closed_form_interior and in_main_cardioid_or_bulb(point):
+            result[i] = -1
+        elif fractal == JULIA:
+            result[i] = escape_time_point(point, constant, fractal, exponent, bailout, max_iter, detect_periodicity)
+        else:
+            result[i] = escape_time_point(start, point, fractal, exponent, bailout, max_iter, detect_periodicity)
+
+    return result
@@ -0,0 +1,102 @@
+"""Measures of the renders of the canvas, to see where the time of a frame goes and tune the number of threads
+and max_iter from data. The measures of the last frames are kept in a rolling history shown by the `stats` command,
+and can be appended to a JSON lines file to be analysed afterwards."""
+
+import json
+from collections import deque
+
+import numpy as np
+
+METRICS_HISTORY = 100
+"""Number of frames whose measures are kept in memory"""
+
+
+def get_iteration_counts(values: np.ndarray, max_iter: int) -> tuple[int, int]:
+    """Returns the number of iterations computed for the given iteration counts, and the number of pixels that
+    reached max_iter. The points that don't diverge are counted as max_iter iterations, so this is an upper bound
+    when their orbit was found to be periodic earlier, or when they were filled by subdivision."""
+    max_iter_pixels = int(np.count_nonzero(values == -1))
+    iterations = int(values[values >= 0].sum(dtype=np.int64)) + max_iter_pixels * max_iter
+    return iterations, max_iter_pixels
+
+
+class FrameMetrics:
+    """Measures of a complete render of the canvas"""
+
+    timestamp: float
+    """Unix time at which the render ended"""
+
+    fractal: str
+    engine: str
+    """Engine used to render the frame, see utils.get_engine_name()"""
+
+    max_iter: int
+    processes: int
+
+    pixels: int
+    """Number of pixels of the canvas"""
+
+    rendered_pixels: int = 0
+    """Number of pixels computed by the render processes, the others were reused from the last frame or the cache"""
+
+    iterations: int = 0
+    """Number of iterations computed for the rendered pixels, see get_iteration_counts()"""
+
+    max_iter_pixels: int = 0
+    """Number of rendered pixels that reached max_iter"""
+
+    render_time: float = 0
+    """Duration of the whole render, in seconds"""
+
+    compute_time: list[float]
+    """Time, in seconds, each process spent rendering tiles, from the busiest to the least busy"""
+
+    ipc_wait: float = 0
+    """Time, in seconds, the busiest process was not rendering during the render of the tiles:
+    publishing the render context, dispatching the tiles and waiting for the notices to be read"""
+
+    color_time: float = 0
+    """Time, in seconds, spent coloring the iteration counts with the palette"""
+
+    paint_time: float = 0
+    """Time, in seconds, spent drawing the colors on the canvas"""
+
+    utilisation: list[float]
+    """Fraction of the render of the tiles that each process spent rendering, see RenderPool.utilisation"""
+
+    def __init__(self, fractal: str, engine: str, max_iter: int, processes: int, pixels: int) -> None:
+        self.timestamp = 0
+        self.fractal = fractal
+        self.engine = engine
+        self.max_iter = max_iter
+        self.processes = processes
+        self.pixels = pixels
+        self.compute_time = []
+        self.utilisation = []
+
+    def to_dict(self) -> dict[str, object]:
+        return {name: getattr(self, name) for name in FrameMetrics.__annotations__}
+
+
+class MetricsHistory:
+    """Measures of the last METRICS_HISTORY frames"""
+
+    frames: deque[FrameMetrics]
+
+    def __init__(self) -> None:
+        self.frames = deque(maxlen=METRICS_HISTORY)
+
+    def add(self, metrics: FrameMetrics, metrics_file: str | None = None) -> None:
+        """Add the measures of a frame to the history, and append them as a JSON line to the metrics file if given"""
+        self.frames.append(metrics)
+
+        if metrics_file is not None:
+            with open(metrics_file, "a") as f:
+                f.write(json.dumps(metrics.to_dict()) + "\n")
+
+    def clear(self) -> None:
+        self.frames.clear()
+
+    def get_mean(self, name: str) -> float:
+        """Returns the mean of a measure over the frames of the history"""
+        return float(np.mean([getattr(frame, name) for frame in self.frames])) if self.frames else 0
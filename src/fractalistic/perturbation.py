@@ -0,0 +1,252 @@
+"""Deep zoom rendering using perturbation theory.
+
+A single reference orbit is computed with arbitrary precision at the center of the screen,
+and every pixel only iterates its float64 difference (delta) with this reference orbit.
+
+With Zn the reference orbit, and zn = Zn + dn the orbit of a pixel, for an integer exponent p:
+    dn+1 = (Zn + dn)^p - Zn^p + dc
+         = sum(binomial(p, k) * Zn^(p-k) * dn^k for k in [1, p]) + dc
+
+When the full value of a pixel gets closer to the critical point (0) than to the reference orbit,
+or when the reference orbit escapes before the pixel, the delta is rebased on the orbit of the critical point,
+which prevents the precision loss (glitches) of the classic perturbation algorithm.
+
+Since the deltas of nearby pixels evolve almost identically during the first iterations, dn is also approximated
+by a polynomial of the offset of the pixel from the center of the screen (series approximation),
+which allows whole tiles to skip the iterations during which this approximation is accurate.
+"""
+
+from math import ceil, comb
+from typing import Callable
+
+import numpy as np
+from gmpy2 import mpc  # type: ignore
+
+PERTURBATION_MIN_CELL_SIZE = 1e-290
+"""Below this cell size, deltas cannot be stored in float64 anymore"""
+
+SERIES_TOLERANCE = 2**-30
+"""Maximum ratio between the truncation error of the series approximation and the approximated delta"""
+
+SERIES_TILE_SIZE = 16
+"""Width and height of the tiles of pixels that skip the same number of iterations"""
+
+
+def polynomial_mul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Multiply two polynomials given by their coefficients, truncated to the length of `a`"""
+    return np.convolve(a, b)[: a.size]
+
+
+class SeriesApproximation:
+    coefficients: np.ndarray
+    """coefficients[n, k] is the coefficient of u^k in the approximation of the delta after n iterations,
+    where u is the offset of the pixel divided by `radius`"""
+
+    validity: np.ndarray
+    """validity[n] is the largest value of |u| for which the approximation is accurate for all iterations up to n"""
+
+    radius: float
+    """Largest offset of a pixel from the center of the screen, used to scale the coefficients and avoid overflows"""
+
+    def __init__(
+        self,
+        orbit: np.ndarray,
+        exponent: int,
+        terms: int,
+        radius: float,
+        bailout: float,
+        offset_is_constant: bool,
+    ) -> None:
+        """`offset_is_constant` is True when the offset of a pixel is applied to the constant of the formula
+        (Mandelbrot), and False when it is applied to the starting value (Julia)."""
+        self.radius = radius
+
+        # The last coefficient is never used to approximate the deltas, only to estimate the truncation error
+        delta = np.zeros(terms + 2, dtype=np.complex128)
+        offset = np.zeros(terms + 2, dtype=np.complex128)
+        offset[1] = radius
+        if not offset_is_constant:
+            delta += offset
+
+        coefficients = [delta]
+        with np.errstate(all="ignore"):
+            for reference in orbit[:-1]:
+                # Same as perturbed_step(), but with polynomials of u
+                result = np.zeros_like(delta)
+                delta_power = delta
+                for k in range(1, exponent + 1):
+                    result += comb(exponent, k) * reference ** (exponent - k) * delta_power
+                    delta_power = polynomial_mul(delta_power, delta)
+
+                delta = result + offset if offset_is_constant else result
+                if not np.isfinite(delta).all():
+                    break
+
+                coefficients.append(delta)
+
+        self.coefficients = np.array(coefficients)
+
+        with np.errstate(all="ignore"):
+            magnitudes = np.abs(self.coefficients)
+            # The truncation error must stay small compared to the first order term
+            error_validity = (SERIES_TOLERANCE * magnitudes[:, 1] / magnitudes[:, -1]) ** (1 / terms)
+            # The approximated points must not escape before the reference
+            bailout_distance = bailout - np.abs(orbit[: self.coefficients.shape[0]])
+            bailout_validity = np.minimum(1, bailout_distance / (2 * magnitudes[:, :-1].sum(axis=1)))
+
+        validity = np.fmin(error_validity, bailout_validity)
+        # Nothing is skipped when the starting point itself is used
+        validity[0] = np.inf
+        self.validity = np.minimum.accumulate(np.nan_to_num(validity, nan=0))
+
+    def skip_iterations(self, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the number of iterations each point can skip, and the approximated deltas after these iterations.
+        The points of a tile of SERIES_TILE_SIZE² pixels all skip the same number of iterations."""
+        u = offsets / self.radius
+        u_magnitude = np.abs(u)
+
+        rows, cols = u.shape
+        tile_rows = ceil(rows / SERIES_TILE_SIZE)
+        tile_cols = ceil(cols / SERIES_TILE_SIZE)
+        padded = np.zeros((tile_rows * SERIES_TILE_SIZE, tile_cols * SERIES_TILE_SIZE))
+        padded[:rows, :cols] = u_magnitude
+        tile_u = padded.reshape(tile_rows, SERIES_TILE_SIZE, tile_cols, SERIES_TILE_SIZE).max(axis=(1, 3))
+
+        # validity is decreasing, so the number of valid iterations of a tile
+        # is the number of values of validity that are greater or equal to its largest |u|
+        tile_skipped = np.searchsorted(-self.validity, -tile_u, side="right") - 1
+        skipped = np.repeat(np.repeat(tile_skipped, SERIES_TILE_SIZE, 0), SERIES_TILE_SIZE, 1)[:rows, :cols]
+
+        # Horner's method, the coefficient for u^0 is always 0 and the last one is never used
+        coefficients = self.coefficients[skipped]
+        delta = np.zeros_like(u)
+        for k in range(coefficients.shape[-1] - 2, 0, -1):
+            delta = (delta + coefficients[..., k]) * u
+
+        return skipped, delta
+
+
+class ReferenceOrbit:
+    center: np.ndarray
+    """Orbit of the center of the screen, that every pixel follows at first"""
+
+    critical: np.ndarray
+    """Orbit of the critical point (0) with the same constant, on which pixels are rebased"""
+
+    series: SeriesApproximation | None
+    """Series approximation of the deltas along the orbit of the center, None when disabled"""
+
+    skipped_iterations: int = 0
+    """Total number of iterations skipped using the series approximation"""
+
+    def __init__(self, center: np.ndarray, critical: np.ndarray, series: SeriesApproximation | None = None) -> None:
+        self.center = center
+        self.critical = critical
+        self.series = series
+
+    def skip_iterations(self, offsets: np.ndarray, delta_z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the number of iterations each point can skip, and its delta after these iterations.
+        `delta_z` is the delta of each point before any iteration."""
+        if self.series is None:
+            return np.zeros(offsets.shape, dtype=np.intp), delta_z
+
+        skipped, approximated = self.series.skip_iterations(offsets)
+        self.skipped_iterations += int(skipped.sum())
+
+        return skipped, np.where(skipped > 0, approximated, delta_z)
+
+
+def get_orbit(z: mpc, c: mpc, step: Callable[[mpc, mpc], mpc], bailout: float, max_iter: int) -> np.ndarray:
+    """Iterate `step` with arbitrary precision, and return the orbit rounded to complex128.
+    The orbit stops after the first value that escapes, or after max_iter iterations."""
+    orbit = [complex(z)]
+
+    for _ in range(max_iter):
+        if not abs(z) < bailout:
+            break
+
+        z = step(z, c)
+        orbit.append(complex(z))
+
+    return np.array(orbit, dtype=np.complex128)
+
+
+def perturbed_step(reference: np.ndarray, delta: np.ndarray, exponent: int) -> np.ndarray:
+    """Returns (reference + delta)^exponent - reference^exponent, without cancellation"""
+    # Horner's method on the binomial expansion
+    result = np.ones_like(delta)
+    for k in range(exponent - 1, 0, -1):
+        result = result * delta + comb(exponent, k) * reference ** (exponent - k)
+
+    return result * delta
+
+
+def perturbed_escape_time(
+    reference_orbit: ReferenceOrbit,
+    delta_z: np.ndarray,
+    delta_c: np.ndarray,
+    exponent: int,
+    bailout: float,
+    max_iter: int,
+    skipped: np.ndarray | None = None,
+) -> np.ndarray:
+    """Same as fractal_base.escape_time(), but iterates the deltas against a reference orbit.
+
+    `delta_z` is the difference between the current values of the points and the reference,
+    `delta_c` the difference between their constants, and `skipped` the number of iterations
+    each point has already skipped, which is also its position in the reference orbit."""
+
+    shape = np.broadcast_shapes(delta_z.shape, delta_c.shape)
+    delta_z = np.broadcast_to(delta_z, shape).ravel().copy()
+    delta_c = np.broadcast_to(delta_c, shape).ravel().copy()
+    skipped = np.zeros(delta_z.size, dtype=np.intp) if skipped is None else skipped.ravel().copy()
+
+    result = np.full(delta_z.size, -1, dtype=np.int32)
+    active = np.arange(delta_z.size)
+    # Both orbits are stored in the same array, so that each point can follow either of them
+    orbits = np.concatenate((reference_orbit.center, reference_orbit.critical))
+    critical_start = reference_orbit.center.size
+
+    # Index in the orbits of each active point, and index of the end of the orbit it is following
+    ref_index = skipped.copy()
+    ref_end = np.full(delta_z.size, critical_start - 1, dtype=np.intp)
+
+    with np.errstate(all="ignore"):
+        for i in range(max_iter - int(skipped.min(initial=max_iter))):
+            # Iteration count of each active point
+            iteration = skipped + i
+            reference = orbits[ref_index]
+            z = reference + delta_z
+
+            # Points that reach max_iter are left to -1
+            finished = iteration >= max_iter
+            escaped = ~(np.abs(z) < bailout) & ~finished
+            done = escaped | finished
+            if done.any():
+                result[active[escaped]] = iteration[escaped]
+                still_active = ~done
+                active = active[still_active]
+                delta_z = delta_z[still_active]
+                delta_c = delta_c[still_active]
+                skipped = skipped[still_active]
+                ref_index = ref_index[still_active]
+                ref_end = ref_end[still_active]
+                reference = reference[still_active]
+                z = z[still_active]
+
+                if active.size == 0:
+                    break
+
+            # Rebase the points that got closer to the critical point than to the reference,
+            # and the ones that outlived the orbit they were following
+            rebase = (np.abs(z) < np.abs(delta_z)) | (ref_index == ref_end)
+            if rebase.any():
+                delta_z[rebase] = z[rebase]
+                ref_index[rebase] = critical_start
+                ref_end[rebase] = orbits.size - 1
+                reference[rebase] = 0
+
+            delta_z = perturbed_step(reference, delta_z, exponent) + delta_c
+            ref_index += 1
+
+    return result.reshape(shape)
@@ -0,0 +1,26 @@
+from .tile import Tile
+
+
+class RenderedTile:
+    """Notice sent by a worker every time some pixels of the frame buffer are rendered"""
+
+    tile: Tile
+    skipped_iterations: int
+
+    def __init__(self, tile: Tile, skipped_iterations: int = 0) -> None:
+        self.tile = tile
+        self.skipped_iterations = skipped_iterations
+
+
+class FinishedTile:
+    """Notice sent by a worker when it finished rendering a tile, after all its RenderedTile notices"""
+
+    worker: int
+    """Process id of the worker"""
+
+    busy_time: float
+    """Time spent rendering the tile, in seconds"""
+
+    def __init__(self, worker: int, busy_time: float) -> None:
+        self.worker = worker
+        self.busy_time = busy_time
@@ -0,0 +1,679 @@
+"""Long-lived pool of render processes, shared by all the renders of the app.
+
+Starting processes and a manager for every render costs tens of milliseconds per frame,
+so the worker processes are started once, and only restarted when their number changes
+or when a render is cancelled.
+
+The render context of a frame (render settings, size, reference orbit) is pickled once
+and published in a shared memory block, that each worker only unpickles once per frame.
+
+The workers write the iteration counts directly into a frame buffer, an int32 array in shared memory,
+and only send small RenderedTile notices to the app, so that the results are never pickled.
+
+Frames are split into many small tiles that the workers take from the task queue of the pool
+as soon as they are idle, so that a worker stuck in the interior of a set doesn't delay the whole frame.
+A render can use fewer processes than the pool has, by only queueing a new tile when one is finished.
+
+When a render is cancelled, the workers skip its remaining tiles, and only the tiles being rendered
+are waited for, so that the processes only have to be restarted when these tiles take too long.
+
+Progressive renders queue the tiles of all their passes at once, from the coarsest to the finest,
+so that the first pass is shown as soon as possible without waiting between the passes.
+
+The tiles of screenshots can also be sent to render nodes on other hosts, see distributed.py.
+
+Sequences of frames (animations) queue the tiles of the next frames while a frame is being rendered,
+so that the processes that finished the tiles of a frame start on the next one instead of waiting
+for the last tiles, and the main process prepares and writes frames while the workers render.
+"""
+
+import multiprocessing
+import os
+import pickle
+from collections import deque
+from math import ceil
+from multiprocessing import resource_tracker
+from multiprocessing.pool import AsyncResult, Pool
+from multiprocessing.queues import Queue
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.sharedctypes import Synchronized
+from queue import Empty
+from threading import Event
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Generator, Iterable
+
+import numpy as np
+
+from . import jit
+from .engines import get_divergence_matrix, get_divergence_matrix_points, select_engine
+from .perturbation import ReferenceOrbit
+from .render_notices import FinishedTile, RenderedTile
+from .settings import RenderSettings
+from .tile import Tile
+from .utils import UNRENDERED
+from .vec import Vec
+
+if TYPE_CHECKING:
+    from .distributed import NodeCluster
+
+QUEUE_POLL_INTERVAL = 0.05
+"""How often, in seconds, cancellation and worker errors are checked while waiting for results"""
+
+CANCEL_TIMEOUT = 0.1
+"""How long, in seconds, the tiles being rendered when a render is cancelled are waited for,
+before restarting the worker processes instead"""
+
+TILE_MIN_PIXELS = 2**14
+"""Minimum number of pixels of a tile, the cost of each iteration of the vectorized engines
+is dominated by the numpy overhead for smaller arrays"""
+
+TILES_PER_PROCESS = 4
+"""The remaining lines are split in about this many tiles per process, so that tiles get smaller towards the end"""
+
+PROGRESSIVE_FIRST_STEP = 8
+"""Spacing between the pixels of the first pass of a progressive render, when the render speed is not known yet"""
+
+PROGRESSIVE_MAX_STEP = 32
+"""Largest spacing between the pixels of the first pass of a progressive render"""
+
+FRAMES_IN_FLIGHT = 3
+"""Number of frames of a sequence whose tiles are queued at the same time"""
+
+POINTS_PER_LINE = 1024
+"""Width of the frame buffer the points rendered by RenderPool.render_points() are written to"""
+
+
+class RenderContext:
+    """Everything the workers need to render a frame"""
+
+    render_settings: RenderSettings
+    size: Vec[int]
+
+    engine_name: str
+    """Name of the engine the frame is rendered with, see engines.select_engine()"""
+
+    reference_orbit: ReferenceOrbit | None
+
+    points: np.ndarray | None = None
+    """Fractional (y, x) coordinates, in pixels of the frame, of the points to render instead of the pixels
+    of the frame, as a float64 array of shape (2, lines, POINTS_PER_LINE). Used for supersampling."""
+
+    def __init__(
+        self, render_settings: RenderSettings, size: Vec[int], engine_name: str, reference_orbit: ReferenceOrbit | None
+    ) -> None:
+        self.render_settings = render_settings
+        self.size = size
+        self.engine_name = engine_name
+        self.reference_orbit = reference_orbit
+
+    @property
+    def buffer_size(self) -> Vec[int]:
+        """Size of the frame buffer the workers write to"""
+        if self.points is None:
+            return self.size
+        return Vec(self.points.shape[2], self.points.shape[1])
+
+
+def get_render_context(
+    render_settings: RenderSettings, size: Vec[int], demoted: set[str] | None = None
+) -> RenderContext:
+    """Everything the workers need is computed and sent only once per frame,
+    the engine is chosen among the ones that aren't demoted"""
+    engine = select_engine(render_settings, size, demoted)
+    return RenderContext(render_settings, size, engine.name, engine.get_reference_orbit(render_settings, size))
+
+
+def read_shared_memory(shared_memory: SharedMemory) -> bytes:
+    if shared_memory.buf is None:
+        raise Exception("Cannot read a closed shared memory block")
+    return bytes(shared_memory.buf)
+
+
+def write_shared_memory(shared_memory: SharedMemory, data: bytes) -> None:
+    if shared_memory.buf is None:
+        raise Exception("Cannot write to a closed shared memory block")
+    shared_memory.buf[: len(data)] = data
+
+
+class SharedArray:
+    """Exposes an array stored in a shared memory block through the numpy array interface.
+    The arrays created from it reference it, so the block stays open as long as they are used."""
+
+    shared_memory: SharedMemory
+
+    def __init__(self, shared_memory: SharedMemory, array: np.ndarray) -> None:
+        self.shared_memory = shared_memory
+        self.__array_interface__ = array.__array_interface__
+
+
+class FrameBuffer:
+    """Int32 array of iteration counts of shape (size.y, size.x), stored in a shared memory block"""
+
+    shared_memory: SharedMemory
+    array: np.ndarray
+
+    def __init__(self, size: Vec[int], name: str | None = None) -> None:
+        """Creates a new frame buffer, or attaches to an existing one if `name` is given"""
+        shape = (size.y, size.x)
+        if name is None:
+            nbytes = max(1, size.x * size.y * np.dtype(np.int32).itemsize)
+            self.shared_memory = SharedMemory(create=True, size=nbytes)
+        else:
+            self.shared_memory = SharedMemory(name)
+
+        self.array = np.ndarray(shape, dtype=np.int32, buffer=self.shared_memory.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def close(self) -> None:
+        # The shared memory cannot be closed while the array still references it
+        del self.array
+        self.shared_memory.close()
+
+    def detach(self) -> np.ndarray:
+        """Returns the array of the frame buffer, that keeps the shared memory block open until it is garbage
+        collected instead of being closed with the frame buffer. The frame buffer must not be used anymore."""
+        array = np.asarray(SharedArray(self.shared_memory, self.array))
+        del self.array
+        return array
+
+
+# ---------- WORKER SIDE
+
+
+class WorkerState:
+    """State of a worker process, each process has its own copy of these class attributes"""
+
+    queue: Queue | None = None
+    """Queue used to send rendered lines to the app"""
+
+    current_render: Synchronized | None = None
+    """Id of the render in progress, the tiles of the other renders were cancelled"""
+
+    context: RenderContext | None = None
+    """Context of the frame currently being rendered"""
+
+    context_name: str | None = None
+    """Name of the shared memory block the context was loaded from"""
+
+    frame: FrameBuffer | None = None
+    """Frame buffer the lines are written to"""
+
+
+def init_worker(queue: Queue, current_render: Synchronized, jit_threads: int) -> None:
+    WorkerState.queue = queue
+    WorkerState.current_render = current_render
+    jit.set_threads(jit_threads)
+
+
+def load_context(name: str) -> RenderContext:
+    """Returns the context published in the given shared memory block, only unpickled once per frame"""
+    context = WorkerState.context
+    if context is None or WorkerState.context_name != name:
+        shared_memory = SharedMemory(name)
+        context = pickle.loads(read_shared_memory(shared_memory))
+        shared_memory.close()
+        WorkerState.context = context
+        WorkerState.context_name = name
+
+    return context
+
+
+def load_frame(name: str, size: Vec[int]) -> FrameBuffer:
+    """Returns the frame buffer with the given name, only attached once per frame buffer"""
+    frame = WorkerState.frame
+    if frame is None or frame.name != name:
+        if frame is not None:
+            frame.close()
+        frame = FrameBuffer(size, name)
+        WorkerState.frame = frame
+
+    return frame
+
+
+def render_tile(render_id: int, context_name: str, frame_name: str, tile: Tile) -> None:
+    if WorkerState.queue is None or WorkerState.current_render is None:
+        raise Exception("render_tile() must be called from a RenderPool worker")
+
+    # The tiles of cancelled renders are still counted by the app
+    if WorkerState.current_render.value != render_id:
+        WorkerState.queue.put(FinishedTile(os.getpid(), 0))
+        return
+
+    started = monotonic()
+    context = load_context(context_name)
+    frame = load_frame(frame_name, context.buffer_size)
+    if context.points is None:
+        get_divergence_matrix(
+            tile,
+            context.render_settings,
+            context.size,
+            frame.array,
+            WorkerState.queue,
+            context.reference_orbit,
+            context.engine_name,
+        )
+    else:
+        get_divergence_matrix_points(
+            tile,
+            context.points,
+            context.render_settings,
+            context.size,
+            frame.array,
+            WorkerState.queue,
+            context.reference_orbit,
+            context.engine_name,
+        )
+    WorkerState.queue.put(FinishedTile(os.getpid(), monotonic() - started))
+
+
+def get_tiles(regions: list[Tile], processes: int) -> list[Tile]:
+    """Split regions of a frame in tiles of lines, using guided scheduling:
+    each tile takes a fraction of the remaining pixels, so the first tiles are large to limit the overhead,
+    and the last ones are small so that all the processes finish at about the same time."""
+    remaining = sum(region.pixel_count for region in regions)
+    # Small regions are still split between all the processes
+    min_pixels = min(TILE_MIN_PIXELS, ceil(remaining / processes))
+    tiles = []
+
+    for region in regions:
+        if region.width == 0:
+            continue
+
+        start = 0
+        while start < region.height:
+            pixels = max(min_pixels, ceil(remaining / (TILES_PER_PROCESS * processes)))
+            tile = region.get_lines(start, start + ceil(pixels / region.width))
+            tiles.append(tile)
+            remaining -= tile.pixel_count
+            start += tile.height
+
+    return tiles
+
+
+def get_progressive_tiles(
+    regions: list[Tile], processes: int, start_step: int, skip_rendered: bool = False
+) -> list[Tile]:
+    """Returns the tiles of the passes of a progressive render, from the coarsest to the finest:
+    the first pass renders one pixel every `start_step` pixels, and each following pass halves the spacing
+    and only computes the pixels that were not rendered by the previous ones, until every pixel is rendered.
+    With `skip_rendered`, the first pass also skips the pixels that are already rendered."""
+    tiles = []
+    step = start_step
+    while step >= 1:
+        refined = skip_rendered or step != start_step
+        pass_regions = [Tile(r.y_start, r.y_stop, r.x_start, r.x_stop, step, refined) for r in regions]
+        tiles.extend(get_tiles(pass_regions, processes))
+        step //= 2
+
+    return tiles
+
+
+# ---------- APP SIDE
+
+
+class RenderPool:
+    pool: Pool | None = None
+    queue: Queue | None = None
+
+    processes: int = 0
+    """Number of processes currently running"""
+
+    wanted_processes: int = 0
+    """Number of processes to use, the pool is restarted before the next render if it differs from `processes`"""
+
+    started: Event
+    """Set once the pool is started for the first time"""
+
+    frame: FrameBuffer | None = None
+    """Frame buffer of the last render, reused by the next renders of the same size"""
+
+    busy_time: list[float]
+    """Time, in seconds, each process spent rendering during the last render, from the busiest to the least busy"""
+
+    render_duration: float = 0
+    """Time, in seconds, between the start of the last render and its last tile"""
+
+    render_processes: int = 0
+    """Number of processes the last render was split between"""
+
+    utilisation: list[float]
+    """Fraction of the last render that each process spent rendering, from the busiest to the least busy"""
+
+    current_render: Synchronized
+    """Id of the render in progress, shared with the workers so that they skip the tiles of cancelled renders"""
+
+    demoted_engines: set[str]
+    """Names of the engines that are not used anymore because they disagreed with the reference engine"""
+
+    cluster: "NodeCluster | None" = None
+    """Render nodes the tiles are sent to instead of the processes, if set"""
+
+    def __init__(self) -> None:
+        self.started = Event()
+        self.demoted_engines = set()
+        self.busy_time = []
+        self.utilisation = []
+        self.current_render = multiprocessing.Value("q", 0)
+
+        # The resource tracker cleans up the shared memory blocks, it must be started before Textual
+        # takes over the standard streams, and before the workers are forked so that they all share it
+        resource_tracker.ensure_running()
+
+    def start(self, processes: int) -> None:
+        """(Re)start the worker processes. Can be called from another thread to overlap startup with other work."""
+        self.terminate()
+
+        self.queue = multiprocessing.Queue()
+        # The compiled loops of each process are split between threads, the cores are shared between the processes
+        jit_threads = max(1, (os.cpu_count() or 1) // processes)
+        self.pool = multiprocessing.Pool(
+            processes, initializer=init_worker, initargs=(self.queue, self.current_render, jit_threads)
+        )
+        self.processes = processes
+        self.wanted_processes = processes
+
+        self.started.set()
+
+    def resize(self, processes: int) -> None:
+        """Change the number of processes, applied before the next render to avoid interrupting the current one"""
+        self.wanted_processes = processes
+
+    def terminate(self) -> None:
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+        if self.queue is not None:
+            self.queue.close()
+            self.queue = None
+
+    def release_frame(self) -> None:
+        """Free the frame buffer, the arrays of the frame buffers returned by get_frame() must not be used anymore"""
+        if self.frame is not None:
+            self.frame.close()
+            self.frame.shared_memory.unlink()
+            self.frame = None
+
+    def get_frame(self, size: Vec[int]) -> FrameBuffer:
+        """Returns the frame buffer for the given size, only reallocated when the size changes"""
+        if self.frame is None or self.frame.array.shape != (size.y, size.x):
+            self.release_frame()
+            self.frame = FrameBuffer(size)
+
+        return self.frame
+
+    def detach_frame(self) -> np.ndarray:
+        """Returns the array of the frame buffer of the last render without copying it,
+        the next render allocates a new frame buffer so that the array is never overwritten"""
+        if self.frame is None:
+            raise Exception("There is no frame to detach")
+
+        frame = self.frame
+        self.frame = None
+        # The workers keep their own mapping of the block until they attach to the next frame buffer
+        frame.shared_memory.unlink()
+        return frame.detach()
+
+    def render_frame(
+        self,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        processes: int,
+        cancelled: Callable[[], bool],
+        regions: list[Tile] | None = None,
+        start_step: int = 1,
+        skip_rendered: bool = False,
+    ) -> Generator[tuple[RenderedTile, np.ndarray], None, None]:
+        """Render a frame, or only the given regions of it, split in tiles for the given number of processes,
+        and yield the notices of the rendered tiles with the corresponding pixels of the frame buffer.
+        If `start_step` is greater than 1, the frame is rendered progressively, see get_progressive_tiles().
+        With `skip_rendered`, only the pixels of the regions that are UNRENDERED in the frame buffer are rendered."""
+        if regions is None:
+            regions = [Tile(0, size.y, 0, size.x)]
+        tile_processes = processes if self.cluster is None else max(processes, self.cluster.processes)
+        tiles = get_progressive_tiles(regions, tile_processes, start_step, skip_rendered)
+
+        context = get_render_context(render_settings, size, self.get_demoted_engines())
+
+        frame = self.get_frame(size)
+        if start_step > 1 and not skip_rendered:
+            for region in regions:
+                frame.array[region.slices] = UNRENDERED
+
+        for notice in self.render(context, tiles, cancelled, processes):
+            yield notice, frame.array[notice.tile.slices]
+
+    def render_points(
+        self,
+        render_settings: RenderSettings,
+        size: Vec[int],
+        ys: np.ndarray,
+        xs: np.ndarray,
+        processes: int,
+        cancelled: Callable[[], bool],
+    ) -> np.ndarray | None:
+        """Render the points with the given fractional coordinates, in pixels of a frame of the given size,
+        split in tiles for the given number of processes. Returns their iteration counts,
+        or None if the render was cancelled."""
+        lines = ceil(ys.size / POINTS_PER_LINE)
+        # The end of the last line is padded with the first pixel of the frame
+        points = np.zeros((2, lines * POINTS_PER_LINE))
+        points[0, : ys.size] = ys
+        points[1, : xs.size] = xs
+
+        tile_processes = processes if self.cluster is None else max(processes, self.cluster.processes)
+        context = get_render_context(render_settings, size, self.get_demoted_engines())
+        context.points = points.reshape(2, lines, POINTS_PER_LINE)
+        tiles = get_tiles([Tile(0, lines, 0, POINTS_PER_LINE)], tile_processes)
+
+        rendered_pixels = 0
+        for notice in self.render(context, tiles, cancelled, processes):
+            rendered_pixels += notice.tile.pixel_count
+
+        if rendered_pixels != lines * POINTS_PER_LINE:
+            return None
+
+        return self.get_frame(context.buffer_size).array.ravel()[: ys.size].copy()
+
+    def render(
+        self,
+        context: RenderContext,
+        tiles: list[Tile],
+        cancelled: Callable[[], bool],
+        processes: int | None = None,
+    ) -> Generator[RenderedTile, None, None]:
+        """Render the given tiles into the frame buffer returned by get_frame(context.size),
+        and yield a notice as soon as some pixels are rendered.
+        If `processes` is lower than the number of processes of the pool, only this many tiles are rendered at a time.
+        If `cancelled` returns True, the workers are restarted and the generator stops.
+        With a cluster, the tiles are rendered by its nodes, and by the processes only if every node is lost."""
+        # The nodes don't have the pixels that skip_rendered tiles keep
+        if self.cluster is not None and not any(tile.skip_rendered for tile in tiles):
+            tiles = yield from self.cluster.render(context, tiles, cancelled, self.get_frame(context.buffer_size).array)
+            if not tiles:
+                return
+
+        self.started.wait()
+
+        if self.wanted_processes != self.processes:
+            self.start(self.wanted_processes)
+
+        pool = self.pool
+        queue = self.queue
+        if pool is None or queue is None:
+            # The pool was terminated, most likely the program is exiting
+            return
+
+        frame = self.get_frame(context.buffer_size)
+        self.current_render.value += 1
+        render_id = self.current_render.value
+        started = monotonic()
+        busy_time: dict[int, float] = {}
+        render_processes = self.processes if processes is None else min(processes, self.processes)
+        data = pickle.dumps(context)
+        shared_memory = SharedMemory(create=True, size=len(data))
+        write_shared_memory(shared_memory, data)
+
+        try:
+            args = [(render_id, shared_memory.name, frame.name, tile) for tile in tiles]
+            # The tiles are all queued at once when the render uses every process, otherwise a tile is queued
+            # every time one is finished, so that the other processes stay idle
+            in_flight = len(tiles) if render_processes == self.processes else render_processes
+            results = [pool.starmap_async(render_tile, args[:in_flight], chunksize=1)]
+            queued_tiles = min(in_flight, len(tiles))
+
+            finished_tiles = 0
+            while finished_tiles != len(tiles):
+                if cancelled():
+                    self.cancel(queue, queued_tiles - finished_tiles)
+                    return
+
+                try:
+                    # A notice is added to the queue everytime some pixels are rendered
+                    notice = queue.get(timeout=QUEUE_POLL_INTERVAL)
+                except Empty:
+                    # Raise the exception of a worker instead of waiting forever
+                    for result in results:
+                        if result.ready() and not result.successful():
+                            result.get()
+                    if self.pool is not pool:
+                        return
+                    continue
+
+                if isinstance(notice, FinishedTile):
+                    finished_tiles += 1
+                    busy_time[notice.worker] = busy_time.get(notice.worker, 0) + notice.busy_time
+                    if queued_tiles < len(tiles):
+                        results.append(pool.starmap_async(render_tile, [args[queued_tiles]], chunksize=1))
+                        queued_tiles += 1
+                    continue
+
+                yield notice
+
+            self.set_busy_time(busy_time, monotonic() - started, render_processes)
+        finally:
+            shared_memory.close()
+            shared_memory.unlink()
+
+    def render_sequence(
+        self, contexts: Iterable[RenderContext], processes: int, frames_in_flight: int = FRAMES_IN_FLIGHT
+    ) -> Generator[np.ndarray, None, None]:
+        """Render a sequence of frames, each split in tiles for the given number of processes,
+        and yield their iteration counts in order. The array of a frame is only valid until the next one is yielded.
+        The contexts are only taken from the iterable when their frame is queued."""
+        self.started.wait()
+
+        if self.wanted_processes != self.processes:
+            self.start(self.wanted_processes)
+
+        pool = self.pool
+        queue = self.queue
+        if pool is None or queue is None:
+            return
+
+        self.current_render.value += 1
+        render_id = self.current_render.value
+        started = monotonic()
+        busy_time: dict[int, float] = {}
+        queued_tiles = 0
+        finished_tiles = 0
+        pending: deque[tuple[AsyncResult, SharedMemory, FrameBuffer]] = deque()
+        contexts = iter(contexts)
+
+        def release(shared_memory: SharedMemory, frame: FrameBuffer) -> None:
+            shared_memory.close()
+            shared_memory.unlink()
+            frame.close()
+            frame.shared_memory.unlink()
+
+        try:
+            while True:
+                while len(pending) < frames_in_flight:
+                    context = next(contexts, None)
+                    if context is None:
+                        break
+
+                    data = pickle.dumps(context)
+                    shared_memory = SharedMemory(create=True, size=len(data))
+                    write_shared_memory(shared_memory, data)
+                    frame = FrameBuffer(context.size)
+                    tiles = get_tiles([Tile(0, context.size.y, 0, context.size.x)], processes)
+                    result = pool.starmap_async(
+                        render_tile, [(render_id, shared_memory.name, frame.name, tile) for tile in tiles], chunksize=1
+                    )
+                    pending.append((result, shared_memory, frame))
+                    queued_tiles += len(tiles)
+
+                if not pending:
+                    break
+
+                # The tiles of a frame are done once the result of its tasks is ready,
+                # the notices are only read to measure the utilisation of the processes
+                result, shared_memory, frame = pending[0]
+                while not result.ready():
+                    try:
+                        notice = queue.get(timeout=QUEUE_POLL_INTERVAL)
+                    except Empty:
+                        continue
+
+                    if isinstance(notice, FinishedTile):
+                        finished_tiles += 1
+                        busy_time[notice.worker] = busy_time.get(notice.worker, 0) + notice.busy_time
+
+                # Raise the exception of a worker
+                result.get()
+                pending.popleft()
+                try:
+                    yield frame.array
+                finally:
+                    release(shared_memory, frame)
+
+            self.set_busy_time(busy_time, monotonic() - started, self.processes)
+        finally:
+            # Skip the remaining tiles if the sequence is interrupted, and read the notices still in the queue
+            # so that they are not counted by the next render
+            if self.pool is pool:
+                self.cancel(queue, queued_tiles - finished_tiles)
+            for _, shared_memory, frame in pending:
+                release(shared_memory, frame)
+
+    def get_demoted_engines(self) -> set[str]:
+        """Names of the engines the frames must not be rendered with"""
+        if self.cluster is None:
+            return self.demoted_engines
+        return self.demoted_engines | self.cluster.get_unsupported_engines()
+
+    def set_busy_time(self, busy_time: dict[int, float], duration: float, processes: int) -> None:
+        """Record the time each process spent rendering tiles during a render of the given duration,
+        that was split between the given number of processes"""
+        # Processes that didn't get any tile were idle during the whole render
+        times = sorted(busy_time.values(), reverse=True)
+        self.busy_time = times[:processes] + [0] * (processes - len(times))
+        # The tiles of a render using fewer processes than the pool can be taken by any of them, but at most
+        # `processes` at a time, the time of the other processes is added to the least busy ones
+        for time in times[processes:]:
+            self.busy_time[-1] += time
+            self.busy_time.sort(reverse=True)
+        self.render_duration = duration
+        self.render_processes = processes
+        self.utilisation = [time / duration for time in self.busy_time] if duration > 0 else []
+
+    def cancel(self, queue: Queue, pending_tiles: int) -> None:
+        """Cancel the render in progress, the workers skip its pending tiles, and the tiles being rendered
+        are waited for so that they don't write into the frame buffer during the next render.
+        If they take longer than CANCEL_TIMEOUT, the workers are restarted instead."""
+        self.current_render.value += 1
+        deadline = monotonic() + CANCEL_TIMEOUT
+
+        while pending_tiles > 0:
+            try:
+                notice = queue.get(timeout=max(0, deadline - monotonic()))
+            except Empty:
+                self.start(self.processes)
+                return
+
+            if isinstance(notice, FinishedTile):
+                pending_tiles -= 1
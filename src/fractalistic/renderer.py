@@ -0,0 +1,213 @@
+"""Rendering API that doesn't depend on the terminal user interface, to use fractalistic as a library:
+
+    import fractalistic
+
+    result = fractalistic.render((800, 600), max_iter=256, rgb=True)
+    result.iterations  # int32 array of shape (600, 800)
+    result.rgb  # uint8 array of shape (600, 800, 3)
+
+Frames are rendered by the same pool of render processes and the same engines as the app,
+and the iteration counts are returned in the shared memory frame buffer the processes wrote to, without copying it.
+Numpy arrays support the buffer protocol, so they can be passed to any library that accepts buffers.
+"""
+
+import atexit
+import os
+from collections import deque
+from copy import deepcopy
+from functools import lru_cache
+from time import monotonic
+from typing import Generator, Iterable
+
+import gmpy2
+import numpy as np
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from . import colors
+from .antialiasing import supersample_edges
+from .render_pool import RenderContext, RenderPool, get_render_context
+from .settings import RenderSettings
+from .vec import Vec
+
+
+class RenderResult:
+    """A rendered frame"""
+
+    iterations: np.ndarray
+    """Int32 array of shape (height, width) of the iteration counts of the pixels, -1 for the points that don't
+    diverge. This is the frame buffer the render processes wrote to, it stays valid as long as it is referenced."""
+
+    rgb: np.ndarray | None
+    """Uint8 array of shape (height, width, 3) of the colors of the pixels, None if they were not requested"""
+
+    render_settings: RenderSettings
+    """Settings the frame was rendered with"""
+
+    render_time: float
+    """Duration of the render, in seconds"""
+
+    skipped_iterations: int
+    """Number of iterations skipped with the series approximation"""
+
+    def __init__(
+        self,
+        iterations: np.ndarray,
+        rgb: np.ndarray | None,
+        render_settings: RenderSettings,
+        render_time: float,
+        skipped_iterations: int,
+    ) -> None:
+        self.iterations = iterations
+        self.rgb = rgb
+        self.render_settings = render_settings
+        self.render_time = render_time
+        self.skipped_iterations = skipped_iterations
+
+
+def get_render_settings(
+    render_settings: RenderSettings | None, size: Vec[int], settings: dict[str, object]
+) -> RenderSettings:
+    """Returns a copy of the render settings with the given settings changed.
+    Complex and real settings can be given as Python numbers or strings, they are converted to gmpy2 numbers.
+    The frame shows the same part of the plane as a new app when no cell size is given."""
+    render_settings = deepcopy(render_settings) if render_settings is not None else RenderSettings()
+
+    with gmpy2.local_context(gmpy2.get_context(), precision=render_settings.wanted_numeric_precision):  # type: ignore
+        for name, value in settings.items():
+            setting_type = RenderSettings.__annotations__.get(name)
+            if setting_type is None:
+                raise TypeError(f"Unknown render setting: {name}")
+
+            if setting_type is mpc:
+                setattr(render_settings, name, mpc(value))
+            elif setting_type is mpfr:
+                setattr(render_settings, name, mpfr(value))
+            else:
+                setattr(render_settings, name, value)
+
+    if not hasattr(render_settings, "cell_size"):
+        render_settings.cell_size = 4 / size.x
+
+    return render_settings
+
+
+class Renderer:
+    """Renders frames with its own pool of render processes. Can be used as a context manager,
+    to terminate the processes when leaving the context."""
+
+    processes: int
+    """Number of render processes"""
+
+    render_pool: RenderPool
+
+    def __init__(self, processes: int | None = None) -> None:
+        self.processes = processes if processes is not None else os.cpu_count() or 1
+        self.render_pool = RenderPool()
+
+    def __enter__(self) -> "Renderer":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Terminate the render processes, the arrays of the previous results stay valid"""
+        self.render_pool.terminate()
+        self.render_pool.release_frame()
+
+    def render(
+        self,
+        size: Vec[int] | tuple[int, int],
+        render_settings: RenderSettings | None = None,
+        rgb: bool = False,
+        antialiasing: int = 0,
+        **settings: object,
+    ) -> RenderResult:
+        """Render a frame of the given (width, height).
+        The render settings default to the ones of a new app, the keyword arguments change individual settings,
+        for example `max_iter=256` or `screen_pos_on_plane=complex(-0.75, 0.1)`.
+        With `rgb`, the pixels are also colored with the color renderer of the render settings.
+        With `antialiasing`, the colors of the pixels on the edges are averaged with the ones of this many
+        points inside of them, see antialiasing.py. The iteration counts are not changed."""
+        if not isinstance(size, Vec):
+            size = Vec(*size)
+
+        if size.x <= 0 or size.y <= 0:
+            raise ValueError(f"Invalid frame size: {size.x}x{size.y}")
+
+        render_settings = get_render_settings(render_settings, size, settings)
+
+        if not self.render_pool.started.is_set():
+            self.render_pool.start(self.processes)
+
+        started = monotonic()
+        skipped_iterations = 0
+        for notice, _ in self.render_pool.render_frame(render_settings, size, self.processes, lambda: False):
+            skipped_iterations += notice.skipped_iterations
+
+        render_time = monotonic() - started
+        iterations = self.render_pool.detach_frame()
+
+        pixels = None
+        if rgb or antialiasing > 0:
+            color_renderer = colors.color_renderers[render_settings.color_renderer_index]
+            palette = colors.get_palette(color_renderer, render_settings.max_iter)
+            pixels = colors.colorize(iterations, palette)
+            supersample_edges(
+                self.render_pool, render_settings, size, iterations, pixels, palette, antialiasing, self.processes
+            )
+            render_time = monotonic() - started
+
+        return RenderResult(iterations, pixels, render_settings, render_time, skipped_iterations)
+
+    def render_sequence(
+        self, size: Vec[int] | tuple[int, int], settings: Iterable[RenderSettings], rgb: bool = False
+    ) -> Generator[RenderResult, None, None]:
+        """Render a sequence of frames of the given (width, height), one for each of the render settings,
+        and yield them in order. Several frames are rendered at the same time, see RenderPool.render_sequence().
+        The arrays of a result are only valid until the next one is yielded, they must be copied to be kept.
+        The render time of a frame is the time since the previous one was yielded,
+        the iterations skipped with the series approximation are not counted."""
+        if not isinstance(size, Vec):
+            size = Vec(*size)
+
+        if not self.render_pool.started.is_set():
+            self.render_pool.start(self.processes)
+
+        frame_settings: deque[RenderSettings] = deque()
+
+        def get_contexts() -> Generator[RenderContext, None, None]:
+            for requested_settings in settings:
+                render_settings = get_render_settings(requested_settings, size, {})
+                frame_settings.append(render_settings)
+                yield get_render_context(render_settings, size, self.render_pool.demoted_engines)
+
+        started = monotonic()
+        for iterations in self.render_pool.render_sequence(get_contexts(), self.processes):
+            render_settings = frame_settings.popleft()
+            pixels = None
+            if rgb:
+                color_renderer = colors.color_renderers[render_settings.color_renderer_index]
+                pixels = colors.colorize(iterations, colors.get_palette(color_renderer, render_settings.max_iter))
+
+            yield RenderResult(iterations, pixels, render_settings, monotonic() - started, 0)
+            started = monotonic()
+
+
+@lru_cache(maxsize=1)
+def get_default_renderer() -> Renderer:
+    """Returns the renderer used by render(), started on the first call and closed when the program exits"""
+    renderer = Renderer()
+    atexit.register(renderer.close)
+    return renderer
+
+
+def render(
+    size: Vec[int] | tuple[int, int],
+    render_settings: RenderSettings | None = None,
+    rgb: bool = False,
+    antialiasing: int = 0,
+    **settings: object,
+) -> RenderResult:
+    """Render a frame with a renderer using one render process per CPU, see Renderer.render()"""
+    return get_default_renderer().render(size, render_settings, rgb, antialiasing, **settings)
@@ -59,6 +59,23 @@ class RenderSettings:
 
     max_iter: int = 128
 
+    series_approximation_terms: int = 4
+    """Number of terms of the series approximation used to skip iterations at deep zooms, 0 to disable it"""
+
+    subdivision: bool = False
+    """Render frames by recursively subdividing rectangles of pixels (Mariani-Silver), and filling the ones
+    with a uniform border instead of computing every pixel"""
+
+    subdivision_guard: bool = True
+    """With subdivision, only fill the rectangles whose center lines are also uniform, to not miss thin filaments"""
+
+    jit: bool = True
+    """Render float64 frames with the loops compiled by Numba when it is installed, see jit.py"""
+
+    interior_detection_disabled: tuple[str, ...] = ()
+    """Names of the fractals for which points are always iterated until max_iter to be classified as convergent,
+    instead of stopping as soon as their orbit is periodic"""
+
 
 class Settings:
     render_settings: RenderSettings = RenderSettings()
@@ -95,6 +112,16 @@ class Settings:
     screenshot_threads: int = 10
     """number of threads used for taking screenshots"""
 
+    auto_precision: bool = True
+    """Adjust the numeric precision to the zoom level before each render, see utils.get_auto_precision()"""
+
+    tile_cache: bool = True
+    """Reuse the tiles of the previous renders with the same settings, see tile_cache.py"""
+
+    render_latency: int = 250
+    """Time in milliseconds within which a first coarse pass of a render should be shown,
+    before refining it until every pixel is rendered. 0 disables progressive rendering."""
+
     state_file: str | None = None
     """If not none, the path of the file to load the state from"""
 
@@ -107,7 +134,27 @@ class Settings:
 
     fit_screenshots: bool = False
 
+    screenshot_format: str = "png"
+    """Name of the file format of the screenshots, see image_writers.IMAGE_WRITERS"""
+
+    antialiasing: int = 0
+    """Number of points computed inside of each pixel of the screenshots that lies on an edge,
+    see antialiasing.py. 0 disables antialiasing."""
+
+    render_nodes: tuple[str, ...] = ()
+    """Addresses of the render nodes the tiles of the screenshots are sent to, see distributed.py"""
+
+    metrics_file: str | None = None
+    """If not none, the path of the JSON lines file the measures of each canvas render are appended to"""
+
+    cross_check_samples: int = 0
+    """Number of random pixels of each canvas render compared with the reference engine, see engines.cross_check()"""
+
 
 class StateInfo:
     version = __version__
     render_settings: RenderSettings
+
+    canvas_width: int | None = None
+    """Width of the canvas when the state was saved, to show the same part of the plane at other sizes.
+    None for the states saved by older versions."""
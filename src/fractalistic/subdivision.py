@@ -0,0 +1,100 @@
+"""Mariani-Silver rendering: if all the pixels on the border of a rectangle have the same iteration count,
+all the pixels inside of it have it too, so they are filled without being computed.
+The other rectangles are split in four, until they are small enough to compute all their pixels.
+
+All the rectangles of a level are handled at once, so that their borders are computed in a single batch
+by the vectorized engines, instead of calling them for a few pixels at a time.
+"""
+
+from typing import Callable, TypeAlias
+
+import numpy as np
+
+SUBDIVISION_START_SIZE = 32
+"""Size of the squares the frame is divided in before any subdivision, which limits the number of levels,
+each level having a fixed cost for the vectorized engines"""
+
+SUBDIVISION_MIN_SIZE = 6
+"""Rectangles with a side smaller or equal to this are computed entirely instead of being split"""
+
+Rectangle: TypeAlias = tuple[int, int, int, int]
+"""(y_start, y_stop, x_start, x_stop) of a rectangle of pixels, stops are exclusive"""
+
+PixelFunction: TypeAlias = Callable[[np.ndarray, np.ndarray], np.ndarray]
+"""Takes the y and x coordinates of some pixels, and returns their iteration counts"""
+
+
+def get_border(frame: np.ndarray, rectangle: Rectangle, guard: bool) -> tuple[np.ndarray, ...]:
+    """Returns the lines of pixels that must be uniform for the rectangle to be filled.
+    With `guard`, the lines crossing the center of the rectangle must also be uniform,
+    so that thin filaments going through the rectangle without touching its border are less likely to be missed."""
+    y0, y1, x0, x1 = rectangle
+    border = (frame[y0, x0:x1], frame[y1 - 1, x0:x1], frame[y0:y1, x0], frame[y0:y1, x1 - 1])
+    if guard:
+        border += (frame[(y0 + y1) // 2, x0:x1], frame[y0:y1, (x0 + x1) // 2])
+
+    return border
+
+
+def split(rectangle: Rectangle) -> list[Rectangle]:
+    """Split a rectangle in four, the quarters share the lines crossing the center of the rectangle"""
+    y0, y1, x0, x1 = rectangle
+    y_middle = (y0 + y1) // 2
+    x_middle = (x0 + x1) // 2
+
+    return [
+        (y0, y_middle + 1, x0, x_middle + 1),
+        (y0, y_middle + 1, x_middle, x1),
+        (y_middle, y1, x0, x_middle + 1),
+        (y_middle, y1, x_middle, x1),
+    ]
+
+
+def render_subdivided(frame: np.ndarray, get_pixels: PixelFunction, guard: bool) -> int:
+    """Fill the 2D `frame` array with the iteration counts of its pixels, computing as few of them as possible.
+    Returns the number of pixels that were computed."""
+    height, width = frame.shape
+    known = np.zeros(frame.shape, dtype=bool)
+    computed_pixels = 0
+
+    # Neighbouring squares share their borders
+    rectangles: list[Rectangle] = [
+        (y, min(y + SUBDIVISION_START_SIZE + 1, height), x, min(x + SUBDIVISION_START_SIZE + 1, width))
+        for y in range(0, max(1, height - 1), SUBDIVISION_START_SIZE)
+        for x in range(0, max(1, width - 1), SUBDIVISION_START_SIZE)
+    ]
+    while rectangles:
+        # Mark the pixels needed to handle all the rectangles of this level
+        wanted = np.zeros(frame.shape, dtype=bool)
+        for rectangle in rectangles:
+            y0, y1, x0, x1 = rectangle
+            if min(y1 - y0, x1 - x0) <= SUBDIVISION_MIN_SIZE:
+                wanted[y0:y1, x0:x1] = True
+                continue
+
+            for line in get_border(wanted, rectangle, guard):
+                line[:] = True
+
+        # Pixels shared by several rectangles, or already computed at a previous level, are only computed once
+        wanted &= ~known
+        ys, xs = np.nonzero(wanted)
+        frame[ys, xs] = get_pixels(ys, xs)
+        known |= wanted
+        computed_pixels += ys.size
+
+        next_rectangles = []
+        for rectangle in rectangles:
+            y0, y1, x0, x1 = rectangle
+            if min(y1 - y0, x1 - x0) <= SUBDIVISION_MIN_SIZE:
+                continue
+
+            border = np.concatenate(get_border(frame, rectangle, guard))
+            if (border == border[0]).all():
+                frame[y0:y1, x0:x1] = border[0]
+                known[y0:y1, x0:x1] = True
+            else:
+                next_rectangles.extend(split(rectangle))
+
+        rectangles = next_rectangles
+
+    return computed_pixels
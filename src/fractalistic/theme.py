@@ -0,0 +1,16 @@
+"""Styles of the log messages, kept apart from the rendering code so that it doesn't import rich"""
+
+from rich.rule import Rule
+from rich.theme import Theme
+
+rule = Rule(style="#666666", characters="-")
+rich_theme = Theme(
+    {
+        "acc": "#a277ff",
+        "bg_acc": "white on #a277ff",
+        "red": "#ff6767",
+        "bg_red": "white on #ff6767",
+        "green": "#58e0b2",
+        "bg_green": "black on #58e0b2",
+    }
+)
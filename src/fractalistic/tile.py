@@ -0,0 +1,61 @@
+from math import ceil
+
+
+class Tile:
+    """Rectangle of pixels of a frame, stops are exclusive.
+    Coarse tiles only contain one pixel every `step` pixels, on each axis, starting from the first one."""
+
+    y_start: int
+    y_stop: int
+    x_start: int
+    x_stop: int
+
+    step: int = 1
+    """Spacing between the pixels of the tile"""
+
+    skip_rendered: bool = False
+    """Only compute the pixels that are still UNRENDERED in the frame buffer, to reuse the ones of coarser tiles"""
+
+    def __init__(
+        self, y_start: int, y_stop: int, x_start: int, x_stop: int, step: int = 1, skip_rendered: bool = False
+    ) -> None:
+        self.y_start = y_start
+        self.y_stop = y_stop
+        self.x_start = x_start
+        self.x_stop = x_stop
+        self.step = step
+        self.skip_rendered = skip_rendered
+
+    def __repr__(self) -> str:
+        step = "" if self.step == 1 else f", step={self.step}"
+        return f"Tile(y={self.y_start}:{self.y_stop}, x={self.x_start}:{self.x_stop}{step})"
+
+    @property
+    def width(self) -> int:
+        """Number of columns of pixels of the tile"""
+        return max(0, ceil((self.x_stop - self.x_start) / self.step))
+
+    @property
+    def height(self) -> int:
+        """Number of lines of pixels of the tile"""
+        return max(0, ceil((self.y_stop - self.y_start) / self.step))
+
+    @property
+    def pixel_count(self) -> int:
+        return self.width * self.height
+
+    @property
+    def slices(self) -> tuple[slice, slice]:
+        """Used to index the tile in a frame array"""
+        return slice(self.y_start, self.y_stop, self.step), slice(self.x_start, self.x_stop, self.step)
+
+    def get_lines(self, start: int, stop: int) -> "Tile":
+        """Returns the tile made of the lines of pixels between the given indices of this tile"""
+        return Tile(
+            self.y_start + start * self.step,
+            min(self.y_start + stop * self.step, self.y_stop),
+            self.x_start,
+            self.x_stop,
+            self.step,
+            self.skip_rendered,
+        )
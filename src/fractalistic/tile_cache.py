@@ -0,0 +1,305 @@
+"""Cache of the iteration counts of rendered tiles, so that going back to a view that was already rendered
+(zooming in and back out, resetting the view, switching back to a fractal) doesn't compute it again.
+
+The tiles are squares of CACHE_TILE_SIZE pixels of a grid fixed on the plane for a given cell size:
+frames with the same cell size, whose positions differ by a whole number of pixels, share the same grid.
+The grids are keyed by the power of two exponent and the mantissa of the cell size, rounded to CELL_SIZE_BITS bits
+so that the rounding errors of zooming in and back out don't change the grid, and by the position of the pixels
+of the grid inside of a cell. The frames are never resampled, tiles are only reused by frames with the same pixels.
+
+The tiles are kept in memory in a LRU with a byte budget, the least recently used ones are written compressed
+to a directory that persists between runs, with its own byte budget.
+"""
+
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+from math import floor
+from threading import Lock
+
+import gmpy2
+import numpy as np
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from . import __version__
+from .settings import RenderSettings
+from .tile import Tile
+from .utils import FRAME_SHIFT_TOLERANCE, VIEW_INDEPENDENT_SETTINGS
+from .vec import Vec
+
+CACHE_TILE_SIZE = 16
+"""Width and height of the cached tiles, in pixels"""
+
+CELL_SIZE_BITS = 40
+"""Number of bits of the mantissa of the cell size kept to identify the grid of a frame"""
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fractalistic", "tiles")
+"""Directory where the tiles are stored on disk"""
+
+
+def get_settings_key(render_settings: RenderSettings) -> tuple[tuple[str, str], ...]:
+    """Returns the render settings that change the iteration counts of the points of a grid"""
+    return tuple(
+        (name, repr(getattr(render_settings, name)))
+        for name in RenderSettings.__annotations__
+        if name not in VIEW_INDEPENDENT_SETTINGS and name != "cell_size"
+    )
+
+
+def split_grid_coordinate(value: mpfr) -> tuple[int, int]:
+    """Returns the integer part of a coordinate on the grid, and its fractional part rounded to FRAME_SHIFT_TOLERANCE"""
+    steps = round(1 / FRAME_SHIFT_TOLERANCE)
+    integer = floor(value)
+    phase = round(float(value - integer) * steps)
+
+    return int(integer) + phase // steps, phase % steps
+
+
+class CacheGrid:
+    """Position of a frame on the grid of cached tiles"""
+
+    key: tuple
+    """Identifies the grid, the render settings and the version of the program"""
+
+    origin: Vec[int]
+    """Coordinates on the grid of the pixel (0, 0) of the frame"""
+
+    size: Vec[int]
+    """Size of the frame"""
+
+    def __init__(self, render_settings: RenderSettings, size: Vec[int]) -> None:
+        cell_size = mpfr(render_settings.cell_size)
+        position = mpc(render_settings.screen_pos_on_plane)
+
+        # The coordinates of the center of the frame on the grid need more bits than the position at deep zooms
+        precision = max(position.real.precision, cell_size.precision) + 64
+        with gmpy2.local_context(gmpy2.get_context(), precision=precision):  # type: ignore
+            column, column_phase = split_grid_coordinate(position.real / cell_size)
+            # The y axis of the frame goes down while the imaginary axis goes up
+            row, row_phase = split_grid_coordinate(-position.imag / cell_size)
+
+        mantissa, exponent = mpfr(cell_size, CELL_SIZE_BITS).as_mantissa_exp()
+        settings_key = get_settings_key(render_settings)
+        self.key = (__version__, settings_key, int(exponent), int(mantissa), column_phase, row_phase)
+        self.origin = Vec(column - size.x // 2, row - size.y // 2)
+        self.size = size
+
+    def get_tile_name(self, column: int, row: int) -> str:
+        """Returns the name of the tile at the given tile coordinates of the grid"""
+        return hashlib.sha1(repr((self.key, column, row)).encode()).hexdigest()
+
+    def get_tiles(self, region: Tile) -> list[tuple[int, int]]:
+        """Returns the tile coordinates of the tiles overlapping a region of the frame"""
+        x_start = self.origin.x + region.x_start
+        y_start = self.origin.y + region.y_start
+        columns = range(x_start // CACHE_TILE_SIZE, (x_start + region.width - 1) // CACHE_TILE_SIZE + 1)
+        rows = range(y_start // CACHE_TILE_SIZE, (y_start + region.height - 1) // CACHE_TILE_SIZE + 1)
+        return [(column, row) for row in rows for column in columns]
+
+    def get_frame_tile(self, column: int, row: int) -> Tile:
+        """Returns the pixels of the frame covered by a tile of the grid, they can be outside of the frame"""
+        x_start = column * CACHE_TILE_SIZE - self.origin.x
+        y_start = row * CACHE_TILE_SIZE - self.origin.y
+        return Tile(y_start, y_start + CACHE_TILE_SIZE, x_start, x_start + CACHE_TILE_SIZE)
+
+
+def get_intersection(a: Tile, b: Tile) -> Tile | None:
+    tile = Tile(max(a.y_start, b.y_start), min(a.y_stop, b.y_stop), max(a.x_start, b.x_start), min(a.x_stop, b.x_stop))
+    return tile if tile.pixel_count > 0 else None
+
+
+class TileCache:
+    memory_budget: int = 64 * 2**20
+    """Maximum number of bytes of the tiles kept in memory"""
+
+    disk_budget: int = 256 * 2**20
+    """Maximum number of bytes of the compressed tiles stored on disk, 0 to disable the disk cache"""
+
+    directory: str = CACHE_DIR
+
+    tiles: OrderedDict[str, np.ndarray]
+    """Tiles kept in memory, from the least to the most recently used"""
+
+    memory_bytes: int = 0
+    """Number of bytes of the tiles kept in memory"""
+
+    disk_bytes: int | None = None
+    """Number of bytes of the files of the disk cache, None until the directory is scanned"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    lock: Lock
+    """Tiles can be saved to disk when the program exits, while a render is running"""
+
+    def __init__(self) -> None:
+        self.tiles = OrderedDict()
+        self.lock = Lock()
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory, name[:2], name)
+
+    def get(self, name: str) -> np.ndarray | None:
+        """Returns the tile with the given name from memory or from disk, None if it is not cached"""
+        with self.lock:
+            tile = self.tiles.get(name)
+            if tile is not None:
+                self.tiles.move_to_end(name)
+                self.memory_hits += 1
+                return tile
+
+            tile = self.read(name)
+            if tile is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self.add(name, tile)
+            return tile
+
+    def put(self, name: str, tile: np.ndarray) -> None:
+        with self.lock:
+            if name in self.tiles:
+                self.tiles.move_to_end(name)
+            else:
+                self.add(name, tile)
+
+    def add(self, name: str, tile: np.ndarray) -> None:
+        """Add a tile to the memory cache, and move the least recently used tiles to disk if it is full"""
+        self.tiles[name] = tile
+        self.memory_bytes += tile.nbytes
+
+        while self.memory_bytes > self.memory_budget:
+            name, tile = self.tiles.popitem(last=False)
+            self.memory_bytes -= tile.nbytes
+            self.write(name, tile)
+
+    def read(self, name: str) -> np.ndarray | None:
+        if self.disk_budget == 0:
+            return None
+
+        path = self.get_path(name)
+        try:
+            with open(path, "rb") as file:
+                data = zlib.decompress(file.read())
+            # Mark the file as recently used so that it is not removed when the disk cache is full
+            os.utime(path)
+        except (OSError, zlib.error):
+            return None
+
+        return np.frombuffer(data, dtype=np.int32).reshape(CACHE_TILE_SIZE, CACHE_TILE_SIZE).copy()
+
+    def write(self, name: str, tile: np.ndarray) -> None:
+        if self.disk_budget == 0:
+            return
+
+        path = self.get_path(name)
+        if os.path.exists(path):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = zlib.compress(tile.tobytes(), 1)
+            # Written to a temporary file first so that an interrupted write doesn't leave a corrupted tile
+            with open(path + ".tmp", "wb") as file:
+                file.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            return
+
+        if self.disk_bytes is None:
+            self.disk_bytes = self.get_disk_usage()[0]
+        else:
+            self.disk_bytes += len(data)
+
+        if self.disk_bytes > self.disk_budget:
+            self.prune()
+
+    def get_disk_usage(self) -> tuple[int, list[tuple[float, int, str]]]:
+        """Returns the number of bytes of the disk cache, and the (modification time, size, path) of its files"""
+        files = []
+        for directory, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        return sum(size for _, size, _ in files), files
+
+    def prune(self) -> None:
+        """Remove the least recently used files of the disk cache, until it uses less than 3/4 of its budget"""
+        disk_bytes, files = self.get_disk_usage()
+        for _, size, path in sorted(files):
+            if disk_bytes <= self.disk_budget * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            disk_bytes -= size
+
+        self.disk_bytes = disk_bytes
+
+    def flush(self) -> None:
+        """Write the tiles kept in memory to disk, so that they are available the next time the program is run"""
+        with self.lock:
+            for name, tile in list(self.tiles.items()):
+                self.write(name, tile)
+
+    def clear(self) -> None:
+        """Remove all the tiles from memory and from disk"""
+        with self.lock:
+            self.tiles.clear()
+            self.memory_bytes = 0
+            for _, _, path in self.get_disk_usage()[1]:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+            self.disk_bytes = 0
+
+    def load(self, frame: np.ndarray, grid: CacheGrid, regions: list[Tile]) -> tuple[list[Tile], int, int]:
+        """Copy the cached pixels of the regions to the frame.
+        Returns the tiles of the frame that were copied, the number of tiles looked up and the number of hits."""
+        loaded = []
+        lookups = 0
+        hits = 0
+
+        for region in regions:
+            for column, row in grid.get_tiles(region):
+                lookups += 1
+                cached = self.get(grid.get_tile_name(column, row))
+                if cached is None:
+                    continue
+
+                hits += 1
+                frame_tile = grid.get_frame_tile(column, row)
+                tile = get_intersection(frame_tile, region)
+                if tile is None:
+                    continue
+
+                frame[tile.slices] = cached[
+                    tile.y_start - frame_tile.y_start : tile.y_stop - frame_tile.y_start,
+                    tile.x_start - frame_tile.x_start : tile.x_stop - frame_tile.x_start,
+                ]
+                loaded.append(tile)
+
+        return loaded, lookups, hits
+
+    def save(self, frame: np.ndarray, grid: CacheGrid) -> None:
+        """Cache the tiles of the grid that are entirely inside of the frame"""
+        for column, row in grid.get_tiles(Tile(0, grid.size.y, 0, grid.size.x)):
+            tile = grid.get_frame_tile(column, row)
+            if tile.y_start < 0 or tile.x_start < 0 or tile.y_stop > grid.size.y or tile.x_stop > grid.size.x:
+                continue
+
+            self.put(grid.get_tile_name(column, row), frame[tile.slices].copy())
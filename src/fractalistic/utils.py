@@ -1,30 +1,45 @@
 import os
-from multiprocessing import Queue
+from copy import deepcopy
+from math import ceil, hypot
+from typing import Generator
 
 import gmpy2
+import numpy as np
 from gmpy2 import mpc, mpfr  # type: ignore
-from rich.rule import Rule
-from rich.theme import Theme
 
 from .colors import color_renderers
 from .fractals import fractal_list
-from .line_divergence_result import LineDivergenceResult
 from .settings import RenderSettings
+from .tile import Tile
 from .vec import Vec
 
 SRC_DIR = os.path.dirname(os.path.abspath(__file__))
 
-rule = Rule(style="#666666", characters="-")
-rich_theme = Theme(
-    {
-        "acc": "#a277ff",
-        "bg_acc": "white on #a277ff",
-        "red": "#ff6767",
-        "bg_red": "white on #ff6767",
-        "green": "#58e0b2",
-        "bg_green": "black on #58e0b2",
-    }
-)
+FLOAT64_MAX_VIEW_PRECISION = 42
+"""Largest precision needed by a view, see get_view_precision(), for which float64 renders are accurate.
+Float64 has a 53 bits mantissa, the remaining bits are kept as a margin for the rounding errors of the iterations."""
+
+PRECISION_GUARD_BITS = 32
+"""Bits added by the automatic precision to the ones needed to tell the pixels apart,
+as a margin for the rounding errors that accumulate during the iterations"""
+
+PRECISION_STEP = 32
+"""The automatic precision is rounded up to a multiple of this many bits, so that it doesn't change at every zoom"""
+
+MIN_AUTO_PRECISION = 64
+"""Precision of the automatic precision mode for shallow views"""
+
+FLOAT64_PIXELS_PER_BATCH = 2**16
+"""Approximate number of pixels computed at once by the float64 engine"""
+
+FRAME_SHIFT_TOLERANCE = 1e-6
+"""Maximum distance, in pixels, between the pixels of two frames for them to be considered as the same points"""
+
+UNRENDERED = -2
+"""Value of the pixels of the frame buffer that were not rendered yet, iteration counts are always >= -1"""
+
+VIEW_INDEPENDENT_SETTINGS = ("screen_pos_on_plane", "color_renderer_index")
+"""Render settings that don't change the iteration count of a given point of the plane"""
 
 
 def get_fractal_index_from_name(name: str) -> int | None:
@@ -50,21 +65,113 @@ def pos_to_c(pos: Vec, cell_size: mpfr, screen_pos_on_plane: mpc, screen_size: V
     return result
 
 
+def get_band_settings(render_settings: RenderSettings, size: Vec[int], y_start: int, y_stop: int) -> RenderSettings:
+    """Returns the render settings of a frame made of the lines y_start to y_stop of a frame of the given size,
+    so that a large frame can be rendered one band of lines at a time"""
+    band_settings = deepcopy(render_settings)
+    band_settings.screen_pos_on_plane = pos_to_c(
+        Vec(size.x // 2, y_start + (y_stop - y_start) // 2),
+        render_settings.cell_size,
+        render_settings.screen_pos_on_plane,
+        size,
+    )
+    return band_settings
+
+
 def set_precision(value: int) -> None:
     gmpy2.get_context().precision = value  # type: ignore
 
 
-def get_divergence_matrix(start: int, stop: int, render_settings: RenderSettings, size: Vec, queue: Queue) -> None:
-    set_precision(render_settings.wanted_numeric_precision)
-    lines_to_render = stop - start
-    pos_on_plane = render_settings.screen_pos_on_plane
+def get_view_precision(render_settings: RenderSettings) -> float:
+    """Returns the number of bits needed to tell apart the points of neighbouring pixels at the center of a view"""
+    magnitude = max(abs(render_settings.screen_pos_on_plane), 1)
+    # The cell size can be smaller than the smallest float64
+    return float(gmpy2.log2(magnitude / render_settings.cell_size))  # type: ignore
+
+
+def get_auto_precision(render_settings: RenderSettings, size: Vec[int]) -> int:
+    """Returns the lowest numeric precision, in bits, that can tell apart the points of neighbouring pixels
+    anywhere in a frame of the given size, with PRECISION_GUARD_BITS of margin"""
+    magnitude = max(abs(render_settings.screen_pos_on_plane) + get_frame_radius(render_settings, size), 1)
+    # The cell size can be smaller than the smallest float64
+    bits = float(gmpy2.log2(magnitude / render_settings.cell_size)) + PRECISION_GUARD_BITS  # type: ignore
+    return max(MIN_AUTO_PRECISION, ceil(bits / PRECISION_STEP) * PRECISION_STEP)
+
+
+def get_frame_radius(render_settings: RenderSettings, size: Vec[int]) -> float:
+    """Returns the distance between the center of the screen and the furthest corner"""
+    return float(render_settings.cell_size) * hypot(size.x // 2 + 1, size.y // 2 + 1)
+
+
+def get_frame_shift(
+    previous_settings: RenderSettings, previous_size: Vec[int], render_settings: RenderSettings, size: Vec[int]
+) -> Vec[int] | None:
+    """Returns the shift such that the pixel (x + shift.x, y + shift.y) of the previous frame
+    is the same point as the pixel (x, y) of the new one, or None if the previous frame cannot be reused"""
+    for name in RenderSettings.__annotations__:
+        if name not in VIEW_INDEPENDENT_SETTINGS and getattr(previous_settings, name) != getattr(render_settings, name):
+            return None
+
+    move = (render_settings.screen_pos_on_plane - previous_settings.screen_pos_on_plane) / render_settings.cell_size
+    move_x = round(float(move.real))
+    move_y = round(float(move.imag))
+    if abs(move.real - move_x) > FRAME_SHIFT_TOLERANCE or abs(move.imag - move_y) > FRAME_SHIFT_TOLERANCE:
+        return None
+
+    # The imaginary axis goes up while the y axis of the frame goes down
+    return Vec(previous_size.x // 2 - size.x // 2 + move_x, previous_size.y // 2 - size.y // 2 - move_y)
+
+
+def get_frame_overlap(shift: Vec[int], previous_size: Vec[int], size: Vec[int]) -> tuple[Tile, Tile] | None:
+    """Returns the tiles of the new and the previous frames that contain the same points, None if they don't overlap"""
+    new = Tile(
+        max(0, -shift.y),
+        min(size.y, previous_size.y - shift.y),
+        max(0, -shift.x),
+        min(size.x, previous_size.x - shift.x),
+    )
+    if new.pixel_count == 0:
+        return None
+
+    previous = Tile(new.y_start + shift.y, new.y_stop + shift.y, new.x_start + shift.x, new.x_stop + shift.x)
+    return new, previous
+
+
+def get_exposed_regions(overlap: Tile, size: Vec[int]) -> list[Tile]:
+    """Returns the regions of a frame of the given size that are outside of the overlap tile"""
+    regions = [
+        Tile(0, overlap.y_start, 0, size.x),
+        Tile(overlap.y_stop, size.y, 0, size.x),
+        Tile(overlap.y_start, overlap.y_stop, 0, overlap.x_start),
+        Tile(overlap.y_start, overlap.y_stop, overlap.x_stop, size.x),
+    ]
+    return [region for region in regions if region.pixel_count > 0]
+
+
+def get_offsets_array(tile: Tile, render_settings: RenderSettings, size: Vec[int]) -> np.ndarray:
+    """Returns the complex128 offsets from the center of the screen, of the points of the tile"""
+    cell_size = float(render_settings.cell_size)
+
+    real = (np.arange(tile.x_start, tile.x_stop, tile.step) - size.x // 2) * cell_size
+    imag = (np.arange(tile.y_start, tile.y_stop, tile.step) - size.y // 2) * -cell_size
+
+    return real[np.newaxis, :] + 1j * imag[:, np.newaxis]
+
+
+def get_pixel_offsets(ys: np.ndarray, xs: np.ndarray, render_settings: RenderSettings, size: Vec[int]) -> np.ndarray:
+    """Same as get_offsets_array(), but for the pixels with the given coordinates"""
+    cell_size = float(render_settings.cell_size)
+    return (xs - size.x // 2) * cell_size + 1j * ((ys - size.y // 2) * -cell_size)
+
+
+def get_points_array(tile: Tile, render_settings: RenderSettings, size: Vec[int]) -> np.ndarray:
+    """Vectorized version of pos_to_c(), returns the complex128 points of the tile"""
+    return get_offsets_array(tile, render_settings, size) + complex(render_settings.screen_pos_on_plane)
+
 
-    for y in range(lines_to_render):
-        result = [0] * size.x
-        for x in range(size.x):
-            pos = Vec(x, y + start)
-            c_num = pos_to_c(pos, render_settings.cell_size, pos_on_plane, size)
-            result[x] = fractal_list[render_settings.fractal_index].get(c_num, render_settings)
-        queue.put(LineDivergenceResult(y + start, result))
+def get_batches(tile: Tile, pixels_per_batch: int = FLOAT64_PIXELS_PER_BATCH) -> Generator[Tile, None, None]:
+    """Split a tile in batches of lines of about `pixels_per_batch` pixels, at least one line per batch"""
+    lines_per_batch = max(1, pixels_per_batch // max(1, tile.width))
 
-    queue.put(None)
+    for batch_start in range(0, tile.height, lines_per_batch):
+        yield tile.get_lines(batch_start, batch_start + lines_per_batch)
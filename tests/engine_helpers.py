@@ -0,0 +1,27 @@
+"""Helpers to compare the engines with the reference engine"""
+
+import numpy as np
+
+from fractalistic.engines import REFERENCE_ENGINE, Engine, pixels_agree
+from fractalistic.settings import RenderSettings
+from fractalistic.tile import Tile
+from fractalistic.vec import Vec
+
+MAX_MISMATCHES = 0.01
+"""Largest fraction of the pixels of a view that can differ from the reference engine by more than one iteration,
+the orbits of the points close to the boundary of the fractals are chaotic"""
+
+
+def render(engine: type[Engine], render_settings: RenderSettings, size: Vec[int]) -> np.ndarray:
+    """Returns the iteration counts of a whole frame rendered with the given engine"""
+    engine.prepare(render_settings)
+    reference_orbit = engine.get_reference_orbit(render_settings, size)
+    return engine.get_tile(Tile(0, size.y, 0, size.x), render_settings, size, reference_orbit)
+
+
+def get_mismatches(engine: type[Engine], render_settings: RenderSettings, size: Vec[int]) -> float:
+    """Returns the fraction of the pixels of a frame rendered with the given engine that disagree
+    with the reference engine"""
+    values = render(engine, render_settings, size)
+    reference = render(REFERENCE_ENGINE, render_settings, size)
+    return float(np.mean(~pixels_agree(values, reference)))
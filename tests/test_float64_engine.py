@@ -0,0 +1,32 @@
+from engine_helpers import MAX_MISMATCHES, get_mismatches
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from fractalistic.engines import Float64Engine
+from fractalistic.fractals import fractal_list
+from fractalistic.settings import RenderSettings
+from fractalistic.vec import Vec
+
+SIZE = Vec(48, 32)
+
+
+def test_same_as_reference_engine() -> None:
+    """The float64 engine must give the same iteration counts as the arbitrary precision engine,
+    for every fractal with exponents 2 and 3"""
+    for fractal_index, fractal in enumerate(fractal_list):
+        for exponent in (2, 3):
+            render_settings = RenderSettings()
+            render_settings.fractal_index = fractal_index
+            render_settings.cell_size = mpfr(4) / SIZE.x
+            render_settings.mandelbrot_exponent = render_settings.julia_exponent = exponent
+            render_settings.burning_ship_exponent = exponent
+
+            assert get_mismatches(Float64Engine, render_settings, SIZE) <= MAX_MISMATCHES, (fractal.__name__, exponent)
+
+
+def test_zoomed_view() -> None:
+    render_settings = RenderSettings()
+    render_settings.cell_size = mpfr("1e-4")
+    render_settings.screen_pos_on_plane = mpc("-0.75+0.1j")
+    render_settings.max_iter = 500
+
+    assert get_mismatches(Float64Engine, render_settings, SIZE) <= MAX_MISMATCHES
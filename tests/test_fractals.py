@@ -0,0 +1,86 @@
+from typing import Callable
+
+from gmpy2 import get_context, mpc, mpfr  # type: ignore
+
+from fractalistic.fractals import BurningShip, InverseMandelbrot, Julia, Mandelbrot, fractal_list
+from fractalistic.fractals.fractal_base import FractalBase
+from fractalistic.settings import RenderSettings
+from fractalistic.utils import pos_to_c
+from fractalistic.vec import Vec
+
+VIEW_SIZE = Vec(80, 40)
+PRECISION = 64
+
+# Points of the Burning Ship with long chaotic orbits, whose counts change with the rounding of each iteration
+CHAOTIC_POINTS = (
+    mpc("0.606601988535997893592+0.54216856532574286831j"),
+    mpc("0.808577471792803148531+0.412290808476082570877j"),
+    mpc("0.756884506401515722018-0.119814366806425542933j"),
+)
+
+
+def baseline_count(step: Callable[[mpc], mpc], z: mpc, bailout: int, max_iter: int) -> int:
+    """Iteration count of the loops of the original formulas, with the generic power of gmpy2"""
+    i = 0
+    while abs(z) < bailout and i < max_iter:
+        z = step(z)
+        i += 1
+    if i == max_iter:
+        return -1
+    return i
+
+
+def baseline_get(fractal: type[FractalBase], point: mpc, settings: RenderSettings) -> int:
+    if fractal is Mandelbrot:
+        exponent = settings.mandelbrot_exponent
+        return baseline_count(lambda z: z**exponent + point, settings.mandelbrot_starting_value, 2, settings.max_iter)
+    if fractal is BurningShip:
+        exponent = settings.burning_ship_exponent
+        return baseline_count(
+            lambda z: mpc(abs(z.real), abs(z.imag)) ** exponent - point, mpc(0, 0), 5, settings.max_iter
+        )
+    if fractal is Julia:
+        exponent = settings.julia_exponent
+        return baseline_count(lambda z: z**exponent - settings.julia_click, point, 4, settings.max_iter)
+    assert fractal is InverseMandelbrot
+    exponent = settings.mandelbrot_exponent
+    return baseline_count(
+        lambda z: settings.inv_mandel_numerator / (z**exponent + point),
+        settings.mandelbrot_starting_value,
+        2,
+        settings.max_iter,
+    )
+
+
+def test_same_counts_as_baseline_formulas() -> None:
+    """With exponents 2 and 3, the arbitrary precision loops must give exactly the same counts as the original
+    formulas on the default view, the interior detection being disabled since it stops the loops earlier"""
+    get_context().precision = PRECISION
+    settings = RenderSettings()
+    settings.cell_size = mpfr(4) / VIEW_SIZE.x
+    settings.interior_detection_disabled = tuple(fractal.__name__ for fractal in fractal_list)
+
+    for exponent in (2, 3):
+        settings.mandelbrot_exponent = settings.julia_exponent = settings.burning_ship_exponent = exponent
+        for fractal in fractal_list:
+            for y in range(VIEW_SIZE.y):
+                for x in range(VIEW_SIZE.x):
+                    point = pos_to_c(Vec(x, y), settings.cell_size, settings.screen_pos_on_plane, VIEW_SIZE)
+                    assert fractal.get(point, settings) == baseline_get(fractal, point, settings), (
+                        fractal.__name__,
+                        exponent,
+                        point,
+                    )
+
+
+def test_correctly_rounded_powers() -> None:
+    """Powers above 2 must be correctly rounded like the original formulas, even on orbits amplifying the slightest
+    rounding difference"""
+    get_context().precision = PRECISION
+    settings = RenderSettings()
+    settings.max_iter = 1000
+    settings.burning_ship_exponent = 3
+    settings.interior_detection_disabled = (BurningShip.__name__,)
+
+    for point in CHAOTIC_POINTS:
+        assert BurningShip.get(point, settings) == baseline_get(BurningShip, point, settings), point
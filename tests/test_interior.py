@@ -0,0 +1,95 @@
+import numpy as np
+from engine_helpers import MAX_MISMATCHES, render
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from fractalistic.engines import REFERENCE_ENGINE, Float64Engine, pixels_agree
+from fractalistic.fractals import Julia, Mandelbrot, fractal_list
+from fractalistic.fractals.fractal_base import PeriodicityChecker
+from fractalistic.fractals.mandelbrot import in_main_cardioid_or_bulb
+from fractalistic.settings import RenderSettings
+from fractalistic.utils import set_precision
+from fractalistic.vec import Vec
+
+SIZE = Vec(48, 32)
+
+INSIDE = (0j, 0.2 + 0.2j, -0.5 + 0j, 0.2 - 0.5j, -1 + 0j, -1.2 + 0.01j)
+"""Points of the main cardioid and of the period-2 bulb"""
+
+OUTSIDE = (0.3 + 0j, 1 + 0j, -2 + 0j, -1.3 + 0j, -0.75 + 0.1j, 0.3 + 0.5j, 1j)
+"""Points outside of the main cardioid and the period-2 bulb"""
+
+
+def get_interior_settings(fractal_index: int, detection: bool) -> RenderSettings:
+    render_settings = RenderSettings()
+    render_settings.fractal_index = fractal_index
+    render_settings.cell_size = mpfr(4) / SIZE.x
+    render_settings.max_iter = 500
+    if not detection:
+        render_settings.interior_detection_disabled = tuple(fractal.__name__ for fractal in fractal_list)
+    return render_settings
+
+
+def orbit_is_periodic(c: mpc, max_iter: int = 1000) -> bool:
+    """Whether the PeriodicityChecker finds a cycle in the orbit of 0 of the Mandelbrot set before it escapes"""
+    checker = PeriodicityChecker()
+    z = mpc(0)
+    for i in range(max_iter):
+        if checker.is_periodic(z, i):
+            return True
+        if abs(z) >= 2:
+            return False
+        z = z * z + c
+    return False
+
+
+def test_in_main_cardioid_or_bulb() -> None:
+    for point in INSIDE:
+        assert in_main_cardioid_or_bulb(mpfr(point.real), mpfr(point.imag)), point
+    for point in OUTSIDE:
+        assert not in_main_cardioid_or_bulb(mpfr(point.real), mpfr(point.imag)), point
+
+
+def test_in_main_cardioid_or_bulb_array() -> None:
+    """The points in the main cardioid or the bulb never escape, and the array version gives the same results"""
+    ys, xs = np.mgrid[-1.2:1.2:97j, -2.1:0.6:109j]
+    points = xs + 1j * ys
+    inside = in_main_cardioid_or_bulb(np.real(points), np.imag(points))
+    assert isinstance(inside, np.ndarray)
+    assert inside.any()
+
+    render_settings = get_interior_settings(fractal_list.index(Mandelbrot), False)
+    assert np.all(Mandelbrot.get_array(points[inside], render_settings) == -1)
+
+    for point, expected in zip(points.ravel()[::37], inside.ravel()[::37]):
+        assert in_main_cardioid_or_bulb(mpfr(point.real), mpfr(point.imag)) == expected, point
+
+
+def test_periodicity_checker() -> None:
+    set_precision(64)
+    # Fixed point, cycle of period 2, attracting fixed point, attracting cycle of period 3,
+    # and preperiodic orbit ending in a cycle of period 2
+    for c in (mpc(0), mpc(-1), mpc(0.2, 0.2), mpc(-0.12, 0.75), mpc(0, 1)):
+        assert orbit_is_periodic(c), c
+    # Orbits escaping after 12, 1, 315 and 33 iterations
+    for c in (mpc(0.3), mpc(-2.1), mpc(-0.75, 0.01), mpc(-0.75, 0.1)):
+        assert not orbit_is_periodic(c), c
+
+
+def test_same_counts_as_without_detection() -> None:
+    """The interior detection only stops the iterations of the points of the interior earlier"""
+    for fractal_index in range(len(fractal_list)):
+        for engine in (REFERENCE_ENGINE, Float64Engine):
+            expected = render(engine, get_interior_settings(fractal_index, False), SIZE)
+            values = render(engine, get_interior_settings(fractal_index, True), SIZE)
+            assert np.mean(~pixels_agree(values, expected)) <= MAX_MISMATCHES, (fractal_index, engine.name)
+
+
+def test_julia_interior() -> None:
+    """The interior of a Julia set, which has no closed form, is found by the periodicity detection"""
+    render_settings = get_interior_settings(fractal_list.index(Julia), True)
+    render_settings.julia_click = mpc("0.123-0.745j")
+    values = render(REFERENCE_ENGINE, render_settings, SIZE)
+    assert np.any(values == -1)
+
+    render_settings.interior_detection_disabled = ("Julia",)
+    assert np.array_equal(values, render(REFERENCE_ENGINE, render_settings, SIZE))
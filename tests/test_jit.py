@@ -0,0 +1,59 @@
+"""The compiled loops are only tested when Numba is installed"""
+
+import numpy as np
+from engine_helpers import MAX_MISMATCHES, get_mismatches, render
+from gmpy2 import mpfr  # type: ignore
+
+from fractalistic import jit
+from fractalistic.engines import Float64Engine, JitEngine, pixels_agree
+from fractalistic.fractals import InverseMandelbrot, fractal_list
+from fractalistic.settings import RenderSettings
+from fractalistic.vec import Vec
+
+SIZE = Vec(48, 32)
+
+
+def get_settings(fractal_index: int, exponent: float | int) -> RenderSettings:
+    render_settings = RenderSettings()
+    render_settings.fractal_index = fractal_index
+    render_settings.cell_size = mpfr(4) / SIZE.x
+    render_settings.mandelbrot_exponent = render_settings.julia_exponent = exponent
+    render_settings.burning_ship_exponent = exponent
+    return render_settings
+
+
+def test_same_as_reference_engine() -> None:
+    if not jit.JIT_AVAILABLE:
+        return
+
+    for fractal_name in jit.FRACTAL_CODES:
+        fractal_index = [fractal.__name__ for fractal in fractal_list].index(fractal_name)
+        for exponent in (2, 3):
+            render_settings = get_settings(fractal_index, exponent)
+            assert JitEngine.supports(render_settings)
+            assert get_mismatches(JitEngine, render_settings, SIZE) <= MAX_MISMATCHES, (fractal_name, exponent)
+
+
+def test_same_as_float64_engine() -> None:
+    """The compiled loops must give the same counts as the numpy loops, with and without interior detection"""
+    if not jit.JIT_AVAILABLE:
+        return
+
+    for fractal_name in jit.FRACTAL_CODES:
+        fractal_index = [fractal.__name__ for fractal in fractal_list].index(fractal_name)
+        for detection in ((), (fractal_name,)):
+            render_settings = get_settings(fractal_index, 2)
+            render_settings.interior_detection_disabled = detection
+            values = render(JitEngine, render_settings, SIZE)
+            expected = render(Float64Engine, render_settings, SIZE)
+            assert np.mean(~pixels_agree(values, expected)) <= MAX_MISMATCHES, (fractal_name, detection)
+
+
+def test_unsupported_settings() -> None:
+    """The inverse Mandelbrot set and the exponents that aren't integers are rendered with the numpy loops"""
+    assert not JitEngine.supports(get_settings(fractal_list.index(InverseMandelbrot), 2))
+    assert not JitEngine.supports(get_settings(0, 2.5))
+
+    render_settings = get_settings(0, 2)
+    render_settings.jit = False
+    assert not JitEngine.supports(render_settings)
@@ -0,0 +1,63 @@
+import numpy as np
+from engine_helpers import MAX_MISMATCHES, render
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from fractalistic.engines import REFERENCE_ENGINE, PerturbationEngine, pixels_agree, select_engine
+from fractalistic.fractals import Julia, Mandelbrot, fractal_list
+from fractalistic.settings import RenderSettings
+from fractalistic.utils import set_precision
+from fractalistic.vec import Vec
+
+SIZE = Vec(24, 16)
+PRECISION = 128
+CELL_SIZE = "1e-16"
+
+
+def get_deep_zoom(fractal_index: int, position: str, max_iter: int) -> RenderSettings:
+    set_precision(PRECISION)
+    render_settings = RenderSettings()
+    render_settings.fractal_index = fractal_index
+    render_settings.wanted_numeric_precision = PRECISION
+    render_settings.cell_size = mpfr(CELL_SIZE)
+    render_settings.screen_pos_on_plane = mpc(position)
+    render_settings.julia_click = mpc("0.123-0.745j")
+    render_settings.max_iter = max_iter
+    return render_settings
+
+
+def check_deep_zoom(render_settings: RenderSettings) -> None:
+    """The view must be rendered with perturbation, within the tolerance of the reference engine, and some of its
+    pixels must outlive the reference orbit, so that they are rebased on the orbit of the critical point"""
+    assert select_engine(render_settings, SIZE) is PerturbationEngine
+
+    values = render(PerturbationEngine, render_settings, SIZE)
+    reference = render(REFERENCE_ENGINE, render_settings, SIZE)
+    reference_orbit = PerturbationEngine.get_reference_orbit(render_settings, SIZE)
+    assert reference_orbit is not None
+
+    escaped_at = reference_orbit.center.size - 1
+    assert escaped_at < render_settings.max_iter
+    assert np.any((reference == -1) | (reference > escaped_at))
+    assert np.mean(~pixels_agree(values, reference)) <= MAX_MISMATCHES
+
+
+def test_mandelbrot() -> None:
+    """Deep zoom on the boundary of the Mandelbrot set, next to a point that escapes after 999 iterations"""
+    render_settings = get_deep_zoom(fractal_list.index(Mandelbrot), "-0.1+0.878060139343093775396789646415j", 1200)
+    check_deep_zoom(render_settings)
+
+
+def test_julia() -> None:
+    """Deep zoom on the boundary of the Douady rabbit, next to a point that escapes after 125 iterations"""
+    render_settings = get_deep_zoom(
+        fractal_list.index(Julia), "0.360158178295177881528960073254+0.120052726098392627176320024418j", 1000
+    )
+    check_deep_zoom(render_settings)
+
+
+def test_without_series_approximation() -> None:
+    render_settings = get_deep_zoom(
+        fractal_list.index(Julia), "0.360158178295177881528960073254+0.120052726098392627176320024418j", 1000
+    )
+    render_settings.series_approximation_terms = 0
+    check_deep_zoom(render_settings)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from fractalistic.render_pool import RenderPool
+from fractalistic.settings import RenderSettings
+from fractalistic.vec import Vec
+
+SIZE = Vec(160, 120)
+
+
+def render(render_pool: RenderPool, processes: int) -> np.ndarray:
+    render_settings = RenderSettings()
+    render_settings.cell_size = 4 / SIZE.x
+    for _ in render_pool.render_frame(render_settings, SIZE, processes, lambda: False):
+        pass
+    return render_pool.get_frame(SIZE).array.copy()
+
+
+def test_render_with_fewer_processes() -> None:
+    """A render can use fewer processes than the pool has, like the canvas when the pool is started
+    with the number of screenshot threads"""
+    render_pool = RenderPool()
+    render_pool.start(3)
+    try:
+        expected = render(render_pool, 3)
+        assert render_pool.render_processes == 3
+
+        for processes in (1, 2):
+            assert np.array_equal(render(render_pool, processes), expected)
+            assert render_pool.render_processes == processes
+            assert len(render_pool.busy_time) == processes
+            assert render_pool.processes == 3
+    finally:
+        render_pool.terminate()
+        render_pool.release_frame()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+from tempfile import TemporaryDirectory
+
+import numpy as np
+from PIL import Image
+from textual.events import Resize
+from textual.geometry import Size
+
+from fractalistic.app import FractalisticApp
+from fractalistic.vec import Vec
+
+SCREENSHOT_SIZE = Vec(400, 300)
+MAX_ITER = 2000
+
+
+async def wait_for(condition: object, timeout: float = 60) -> bool:
+    """Wait until the callable `condition` returns True, returns False after `timeout` seconds"""
+    for _ in range(int(timeout / 0.05)):
+        if condition():  # type: ignore
+            return True
+        await asyncio.sleep(0.05)
+    return False
+
+
+async def take_screenshot(app: FractalisticApp, directory: str) -> None:
+    """Start a screenshot saved in the given directory, and wait until it is started"""
+    os.chdir(directory)
+    app.action_capture(SCREENSHOT_SIZE)
+    assert await wait_for(lambda: app.progress_bar.progress > 0)
+
+
+def resize_terminal(app: FractalisticApp, width: int, height: int) -> None:
+    """Same as Pilot.resize_terminal() of the newer versions of Textual"""
+    if app._driver is not None:
+        app._driver._size = (width, height)
+    app.post_message(Resize(Size(width, height), Size(width, height)))
+
+
+def read_screenshot(directory: str) -> np.ndarray:
+    (name,) = os.listdir(directory)
+    with Image.open(os.path.join(directory, name)) as image:
+        return np.asarray(image)
+
+
+def test_resize_during_screenshot() -> None:
+    """A resize of the terminal during a screenshot must not render the canvas with the render pool
+    of the screenshot, the screenshot must be the same as without the resize"""
+
+    async def run() -> None:
+        app = FractalisticApp()
+        app.settings.tile_cache = False
+        cwd = os.getcwd()
+        with TemporaryDirectory() as first, TemporaryDirectory() as second:
+            try:
+                async with app.run_test(size=(100, 30)) as pilot:
+                    assert await wait_for(lambda: app.ready and app.canvas_idle.is_set() and app.renders > 0)
+                    app.render_settings.max_iter = MAX_ITER
+
+                    await take_screenshot(app, first)
+                    assert await wait_for(lambda: app.ready)
+
+                    await take_screenshot(app, second)
+                    renders = app.renders
+                    canv_size = (app.settings.canv_size.x, app.settings.canv_size.y)
+                    resize_terminal(app, 80, 24)
+                    await asyncio.sleep(0.5)
+                    assert app.screenshot_running
+                    assert not app.ready
+                    assert app.renders == renders
+                    # The canvas is hidden during the screenshot, it is only measured once it is shown again
+                    assert (app.settings.canv_size.x, app.settings.canv_size.y) == canv_size
+
+                    assert await wait_for(lambda: app.ready and app.canvas_idle.is_set())
+                    # The canvas is resized once the screenshot is finished
+                    assert await wait_for(lambda: app.settings.canv_size.x == app.canv.size.width)
+                    await pilot.press("ctrl+c")
+            finally:
+                os.chdir(cwd)
+
+            assert np.array_equal(read_screenshot(first), read_screenshot(second))
+
+    asyncio.run(run())
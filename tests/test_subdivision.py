@@ -0,0 +1,71 @@
+import multiprocessing
+
+import numpy as np
+from gmpy2 import mpc, mpfr  # type: ignore
+
+from fractalistic.engines import REFERENCE_ENGINE, Float64Engine, get_divergence_matrix
+from fractalistic.fractals import fractal_list
+from fractalistic.settings import RenderSettings
+from fractalistic.subdivision import render_subdivided
+from fractalistic.tile import Tile
+from fractalistic.vec import Vec
+
+SIZE = Vec(120, 80)
+
+VIEWS = (("0", 4 / SIZE.x), ("-0.75+0.1j", 1e-3))
+"""Position and cell size of the views, the whole fractals and a zoom on the filaments of the seahorse valley"""
+
+
+def render_frame(render_settings: RenderSettings, size: Vec[int], engine_name: str) -> np.ndarray:
+    frame = np.zeros((size.y, size.x), dtype=np.int32)
+    get_divergence_matrix(
+        Tile(0, size.y, 0, size.x), render_settings, size, frame, multiprocessing.Queue(), None, engine_name
+    )
+    return frame
+
+
+def get_view(fractal_index: int, position: str, cell_size: float) -> RenderSettings:
+    render_settings = RenderSettings()
+    render_settings.fractal_index = fractal_index
+    render_settings.screen_pos_on_plane = mpc(position)
+    render_settings.cell_size = mpfr(cell_size)
+    render_settings.max_iter = 256
+    return render_settings
+
+
+def test_same_as_full_render() -> None:
+    for fractal_index, fractal in enumerate(fractal_list):
+        for position, cell_size in VIEWS:
+            render_settings = get_view(fractal_index, position, cell_size)
+            expected = render_frame(render_settings, SIZE, Float64Engine.name)
+
+            render_settings.subdivision = True
+            for guard in (True, False):
+                render_settings.subdivision_guard = guard
+                values = render_frame(render_settings, SIZE, Float64Engine.name)
+                assert np.array_equal(values, expected), (fractal.__name__, position, guard)
+
+
+def test_reference_engine() -> None:
+    size = Vec(48, 32)
+    render_settings = get_view(0, "0", 4 / size.x)
+    expected = render_frame(render_settings, size, REFERENCE_ENGINE.name)
+
+    render_settings.subdivision = True
+    assert np.array_equal(render_frame(render_settings, size, REFERENCE_ENGINE.name), expected)
+
+
+def test_computed_pixels() -> None:
+    """The uniform rectangles are filled without computing their pixels, and no pixel is computed twice"""
+    expected = render_frame(get_view(0, *VIEWS[0]), SIZE, Float64Engine.name)
+    computed = np.zeros(expected.shape, dtype=bool)
+
+    def get_pixels(ys: np.ndarray, xs: np.ndarray) -> np.ndarray:
+        assert not computed[ys, xs].any()
+        computed[ys, xs] = True
+        return expected[ys, xs]
+
+    frame = np.zeros(expected.shape, dtype=np.int32)
+    computed_pixels = render_subdivided(frame, get_pixels, True)
+    assert np.array_equal(frame, expected)
+    assert computed_pixels == computed.sum() < expected.size